@@ -0,0 +1,74 @@
+"""Модуль с автоматом Ахо - Корасик для поиска множества подстрок за один проход по тексту"""
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Автомат Ахо - Корасик: бор шаблонов с суффиксными ссылками. Поиск всех шаблонов в тексте выполняется
+    за один проход по символам текста независимо от числа шаблонов
+
+    Attributes:
+        patterns (list[str]): Шаблоны
+        transitions (list[dict[str, int]]): Переходы бора для каждого узла
+        fail (list[int]): Суффиксные ссылки узлов
+        outputs (list[tuple[int, ...]]): Номера шаблонов, оканчивающихся в узле (с учётом суффиксных ссылок)
+    """
+    def __init__(self, patterns):
+        """
+        Инициализация объекта, построение бора и суффиксных ссылок
+
+        Args:
+            patterns (list[str]): Шаблоны. Пустой шаблон встречается в любом тексте
+        """
+        self.patterns = list(patterns)
+        self.transitions = [{}]
+        outputs = [[]]
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                next_node = self.transitions[node].get(char)
+                if next_node is None:
+                    next_node = self.transitions[node][char] = len(self.transitions)
+                    self.transitions.append({})
+                    outputs.append([])
+                node = next_node
+            outputs[node].append(index)
+
+        self.fail = [0] * len(self.transitions)
+        self.outputs = [tuple(x) for x in outputs]
+        queue = deque(self.transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.transitions[node].items():
+                fail = self.fail[node]
+                while fail and char not in self.transitions[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.transitions[fail].get(char, 0)
+                self.outputs[child] += self.outputs[self.fail[child]]
+                queue.append(child)
+
+    def find(self, text):
+        """
+        Находит шаблоны, встречающиеся в тексте
+
+        Args:
+            text (str): Текст
+
+        Returns:
+            set[int]: Номера найденных шаблонов
+
+        >>> sorted(AhoCorasick(['аналитик', 'тик', 'программист', 'python']).find('системный аналитик'))
+        [0, 1]
+        """
+        transitions = self.transitions
+        fail = self.fail
+        outputs = self.outputs
+        found = set(outputs[0])
+        node = 0
+        for char in text:
+            while node and char not in transitions[node]:
+                node = fail[node]
+            node = transitions[node].get(char, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
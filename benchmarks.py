@@ -0,0 +1,167 @@
+"""Модуль с замерами производительности загрузки и обработки вакансий на синтетических данных"""
+import csv
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from vacancies_parser import DataSet
+from year_shards import YearShards
+
+
+class Benchmarks:
+    """Класс, содержащий генератор синтетических данных и замеры производительности"""
+    labels = ['name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary_from',
+              'salary_to', 'salary_gross', 'salary_currency', 'area_name', 'published_at']
+    names = ['Программист Python', 'Аналитик данных', 'Системный администратор', 'Менеджер по продажам',
+             'Инженер-программист', 'Java Developer', 'Бухгалтер', 'Тестировщик ПО', 'DevOps-инженер', 'Дизайнер']
+    skills = ['Python', 'SQL', 'Git', 'Linux', 'Docker', 'Excel', 'HTML5', 'CSS3', 'Java', '1С', 'Английский язык']
+    experiences = ['noExperience', 'between1And3', 'between3And6', 'moreThan6']
+    currencies = ['RUR'] * 20 + ['USD', 'EUR', 'KZT', 'UAH', 'BYR']
+    areas = ['Москва'] * 10 + ['Санкт-Петербург'] * 4 + ['Екатеринбург', 'Новосибирск', 'Казань', 'Пермь', 'Сочи',
+                                                          'Нижний Новгород', 'Краснодар', 'Самара', 'Омск', 'Уфа']
+
+    @staticmethod
+    def generate_csv(file_name, rows, seed=0):
+        """
+        Создаёт csv-файл с синтетическими вакансиями в формате выгрузки hh.ru
+
+        Args:
+            file_name (str): Путь к создаваемому файлу
+            rows (int): Количество вакансий
+            seed (int): Начальное значение генератора случайных чисел
+        """
+        generator = random.Random(seed)
+        with open(file_name, 'w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(Benchmarks.labels)
+            for _ in range(rows):
+                salary_from = generator.randrange(10, 300) * 1000
+                writer.writerow([
+                    generator.choice(Benchmarks.names),
+                    '<p><strong>Обязанности:</strong></p>\n<ul> <li>разработка и поддержка сервисов;</li> '
+                    '<li>участие в code review.</li> </ul>\n<p>Требования: опыт работы от года</p>' * generator.randint(1, 3),
+                    '\n'.join(generator.sample(Benchmarks.skills, generator.randint(1, 5))),
+                    generator.choice(Benchmarks.experiences),
+                    generator.choice(['False', 'True']),
+                    f'Компания {generator.randrange(500)}',
+                    f'{salary_from}.0',
+                    f'{salary_from + generator.randrange(0, 100) * 1000}.0',
+                    generator.choice(['False', 'True']),
+                    generator.choice(Benchmarks.currencies),
+                    generator.choice(Benchmarks.areas),
+                    f'{generator.randint(2007, 2022)}-{generator.randint(1, 12):02}-{generator.randint(1, 28):02}'
+                    f'T{generator.randint(0, 23):02}:{generator.randint(0, 59):02}:{generator.randint(0, 59):02}+0300'
+                ])
+
+    @staticmethod
+    def measure(function):
+        """
+        Измеряет время выполнения функции
+
+        Args:
+            function (func): Функция без аргументов
+
+        Returns:
+            tuple[float, Any]: Время выполнения в секундах и результат функции
+        """
+        start = time.perf_counter()
+        result = function()
+        return time.perf_counter() - start, result
+
+    @staticmethod
+    def benchmark_cache(rows=100000):
+        """
+        Сравнивает время загрузки DataSet без кэша (холодный старт) и из кэша (тёплый старт)
+
+        Args:
+            rows (int): Количество вакансий в синтетическом файле
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            cache_dir = os.path.join(directory, 'cache')
+            Benchmarks.generate_csv(file_name, rows)
+            for storage in ['objects', 'columnar']:
+                no_cache, _ = Benchmarks.measure(lambda: DataSet(file_name, storage=storage))
+                cold, _ = Benchmarks.measure(lambda: DataSet(file_name, storage=storage, cache_dir=cache_dir))
+                warm, _ = Benchmarks.measure(lambda: DataSet(file_name, storage=storage, cache_dir=cache_dir))
+                print(f'{storage}, {rows} строк: без кэша {no_cache:.2f} с, '
+                      f'холодный кэш {cold:.2f} с, тёплый кэш {warm:.2f} с')
+        finally:
+            shutil.rmtree(directory)
+
+    @staticmethod
+    def benchmark_shards(rows=2000000):
+        """
+        Сравнивает время вычисления статистики по шардам по годам последовательно и в пуле процессов
+        разного размера (до числа ядер)
+
+        Args:
+            rows (int): Количество вакансий в синтетическом файле
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            shards_dir = os.path.join(directory, 'shards')
+            Benchmarks.generate_csv(file_name, rows)
+            split, _ = Benchmarks.measure(lambda: YearShards.get_manifest(file_name, shards_dir))
+            print(f'Разбиение по годам, {rows} строк: {split:.2f} с')
+            serial = None
+            workers = 1
+            while True:
+                elapsed, _ = Benchmarks.measure(lambda: YearShards.get_stats(file_name, 'Программист', shards_dir, workers))
+                serial = serial or elapsed
+                print(f'Процессов: {workers}, {elapsed:.2f} с, ускорение {serial / elapsed:.2f}')
+                if workers >= (os.cpu_count() or 1):
+                    break
+                workers = min(workers * 2, os.cpu_count())
+        finally:
+            shutil.rmtree(directory)
+
+    @staticmethod
+    def benchmark_salary_filter(rows=1000000):
+        """
+        Сравнивает время фильтрации по окладу (значение и диапазон) полным просмотром вакансий и по индексу
+        интервалов, а также время построения индекса
+
+        Args:
+            rows (int): Количество вакансий в синтетическом файле
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            Benchmarks.generate_csv(file_name, rows)
+            queries = ['Оклад: 50000', 'Оклад: 250000', 'Оклад: 100000 - 120000', 'Оклад: 350000 - 400000']
+            for storage in ['objects', 'columnar']:
+                data = DataSet(file_name, storage=storage)
+                build, _ = Benchmarks.measure(lambda: data.get_index('salary'))
+                print(f'{storage}, {rows} строк: построение индекса окладов {build:.2f} с')
+                for query in queries:
+                    criteria = DataSet.format_filter_criteria(query)
+                    low, high = DataSet.parse_salary_range(criteria['content'])
+                    if storage == 'columnar':
+                        scan, scanned = Benchmarks.measure(lambda: np.flatnonzero(data.get_filter_mask(criteria)))
+                    else:
+                        scan, scanned = Benchmarks.measure(lambda: [
+                            i for i, x in enumerate(data.vacancies_objects)
+                            if max(x.salary.salary_from_value, low) <= min(x.salary.salary_to_value, high)])
+                    indexed, found = Benchmarks.measure(lambda: data.find_indexed(criteria))
+                    assert len(found) == len(scanned)
+                    print(f'{query}: {len(found)} вакансий, просмотр {scan * 1000:.1f} мс, '
+                          f'индекс {indexed * 1000:.2f} мс')
+                del data
+        finally:
+            shutil.rmtree(directory)
+
+
+benchmarks = {'cache': Benchmarks.benchmark_cache,
+              'shards': Benchmarks.benchmark_shards,
+              'salary': Benchmarks.benchmark_salary_filter}
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(benchmarks)
+    for name in names:
+        benchmarks[name]()
@@ -0,0 +1,233 @@
+"""Модуль для чтения csv-файлов по частям с учётом полей в кавычках, содержащих переносы строк"""
+import csv
+import io
+import mmap
+import os
+import numpy as np
+
+
+class CsvReader:
+    """
+    Класс, содержащий функции разбиения csv-файла на байтовые диапазоны, выровненные по границам записей
+
+    Граница записи - перенос строки, перед которым в файле стоит чётное число кавычек. Предполагается,
+    что кавычки встречаются только в полях, заключённых в кавычки (так их записывает csv.writer)
+    """
+    block_size = 8 * 1024 * 1024
+
+    @staticmethod
+    def count_quotes(buffer, start, end):
+        """
+        Считает кавычки в диапазоне буфера, читая его блоками ограниченного размера
+
+        Args:
+            buffer (mmap.mmap): Отображённый в память файл
+            start (int): Начало диапазона
+            end (int): Конец диапазона (не включается)
+
+        Returns:
+            int: Количество символов '"' в диапазоне
+        """
+        count = 0
+        for block_start in range(start, end, CsvReader.block_size):
+            count += buffer[block_start: min(block_start + CsvReader.block_size, end)].count(b'"')
+        return count
+
+    @staticmethod
+    def skip_record(buffer, pos, quotes_before):
+        """
+        Находит начало записи, следующей за записью, которой принадлежит позиция pos
+
+        Args:
+            buffer (mmap.mmap): Отображённый в память файл
+            pos (int): Позиция внутри текущей записи
+            quotes_before (int): Количество кавычек в файле до позиции pos
+
+        Returns:
+            tuple[int, int]: Позиция начала следующей записи (или размер файла) и количество кавычек до неё
+        """
+        size = len(buffer)
+        while pos < size:
+            newline = buffer.find(b'\n', pos)
+            if newline == -1:
+                return size, quotes_before + CsvReader.count_quotes(buffer, pos, size)
+            quotes_before += buffer[pos: newline].count(b'"')
+            pos = newline + 1
+            if quotes_before % 2 == 0:
+                return pos, quotes_before
+        return size, quotes_before
+
+    @staticmethod
+    def next_record_start(buffer, pos, quotes_before):
+        """
+        Находит начало первой записи, начинающейся не раньше позиции pos
+
+        Args:
+            buffer (mmap.mmap): Отображённый в память файл
+            pos (int): Позиция, с которой начинается поиск
+            quotes_before (int): Количество кавычек в файле до позиции pos
+
+        Returns:
+            tuple[int, int]: Позиция начала записи и количество кавычек до неё
+        """
+        if quotes_before % 2 == 0 and (pos == 0 or buffer[pos - 1: pos] == b'\n'):
+            return pos, quotes_before
+        return CsvReader.skip_record(buffer, pos, quotes_before)
+
+    @staticmethod
+    def split(file_name, parts):
+        """
+        Разбивает файл без строки заголовков на не более чем parts байтовых диапазонов, выровненных по границам записей
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            parts (int): Желаемое число диапазонов
+
+        Returns:
+            list[tuple[int, int]]: Диапазоны (начало, конец) в порядке следования в файле
+
+        >>> CsvReader.split('sorting_test.csv', 1) == [(CsvReader.split('sorting_test.csv', 3)[0][0], os.path.getsize('sorting_test.csv'))]
+        True
+        """
+        size = os.path.getsize(file_name)
+        if size == 0:
+            return []
+        with open(file_name, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            header_end, quotes = CsvReader.skip_record(buffer, 0, 0)
+            bounds = [header_end]
+            scanned = header_end
+            for i in range(1, parts):
+                target = header_end + (size - header_end) * i // parts
+                if target <= bounds[-1]:
+                    continue
+                quotes += CsvReader.count_quotes(buffer, scanned, target)
+                start, quotes = CsvReader.next_record_start(buffer, target, quotes)
+                scanned = start
+                if start >= size:
+                    break
+                if start > bounds[-1]:
+                    bounds.append(start)
+        bounds.append(size)
+        return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+    @staticmethod
+    def read_header(file_name):
+        """
+        Читает строку заголовков csv-файла
+
+        Args:
+            file_name (str): Путь к csv-файлу
+
+        Returns:
+            list[str]: Заголовки столбцов (пустой список для пустого файла)
+        """
+        with open(file_name, encoding='utf-8-sig') as data:
+            return next(csv.reader(data, delimiter=','), [])
+
+    @staticmethod
+    def read_rows(file_name, start, end):
+        """
+        Читает записи csv-файла из байтового диапазона. Переносы строк обрабатываются так же, как при чтении
+        файла в текстовом режиме
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            start (int): Начало диапазона - начало записи
+            end (int): Конец диапазона - начало следующей записи или конец файла
+
+        Returns:
+            Iterator[list[str]]: Записи диапазона
+        """
+        with open(file_name, 'rb') as file:
+            file.seek(start)
+            chunk = file.read(end - start)
+        return csv.reader(io.TextIOWrapper(io.BytesIO(chunk), encoding='utf-8-sig'), delimiter=',')
+
+    @staticmethod
+    def get_record_bounds(file_name):
+        """
+        Находит байтовые границы всех записей файла после строки заголовков. Переносы строк и кавычки ищутся
+        векторно поблочно в отображённом в память файле, поэтому многострочные поля в кавычках не разбиваются
+
+        Args:
+            file_name (str): Путь к csv-файлу
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Начала и концы записей (int64), конец записи - начало следующей
+
+        >>> starts, ends = CsvReader.get_record_bounds('sorting_test.csv')
+        >>> len(starts), int(ends[-1]) == os.path.getsize('sorting_test.csv')
+        (5, True)
+        """
+        size = os.path.getsize(file_name)
+        if size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        with open(file_name, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            header_end, quotes = CsvReader.skip_record(buffer, 0, 0)
+            starts = [np.array([header_end], dtype=np.int64)]
+            for block_start in range(header_end, size, CsvReader.block_size):
+                block = np.frombuffer(buffer, dtype=np.uint8, count=min(CsvReader.block_size, size - block_start),
+                                      offset=block_start)
+                newlines = np.flatnonzero(block == ord('\n'))
+                quote_positions = np.flatnonzero(block == ord('"'))
+                del block
+                quotes_before = quotes + np.searchsorted(quote_positions, newlines)
+                starts.append(newlines[quotes_before % 2 == 0].astype(np.int64) + block_start + 1)
+                quotes += len(quote_positions)
+        starts = np.concatenate(starts)
+        starts = starts[starts < size]
+        return starts, np.append(starts[1:], np.int64(size))
+
+
+class RowIndex:
+    """
+    Индекс записей csv-файла: байтовые границы выбранных записей, позволяющие читать произвольный
+    диапазон записей без разбора остальной части файла
+
+    Attributes:
+        labels (list[str]): Заголовки столбцов файла
+        starts (np.ndarray): Начала записей (int64)
+        ends (np.ndarray): Концы записей (int64)
+    """
+    def __init__(self, labels, starts, ends):
+        """
+        Инициализация объекта
+
+        Args:
+            labels (list[str]): Заголовки столбцов файла
+            starts (np.ndarray): Начала записей
+            ends (np.ndarray): Концы записей
+        """
+        self.labels = labels
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self):
+        """
+        Возвращает количество записей в индексе
+
+        Returns:
+            int: Количество записей
+        """
+        return len(self.starts)
+
+    def read_rows(self, file_name, first, last):
+        """
+        Читает записи с номерами из диапазона [first, last) индекса. Записи файла, не вошедшие в индекс,
+        но лежащие между ними, тоже читаются - их отбрасывает вызывающий код
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            first (int): Номер первой записи
+            last (int): Номер записи, следующей за последней
+
+        Returns:
+            Iterator[list[str]]: Записи диапазона
+
+        >>> starts, ends = CsvReader.get_record_bounds('sorting_test.csv')
+        >>> [row[0] for row in RowIndex([], starts, ends).read_rows('sorting_test.csv', 3, 5)]
+        ['HTML-верстальщик (remote)', 'Information Security Policy Specialist (Methodology)']
+        """
+        if first >= last:
+            return iter([])
+        return CsvReader.read_rows(file_name, int(self.starts[first]), int(self.ends[last - 1]))
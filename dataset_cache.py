@@ -0,0 +1,128 @@
+"""Модуль, отвечающий за кэширование разобранных csv-файлов на диске"""
+import hashlib
+import os
+import pickle
+
+
+class DataSetCache:
+    """
+    Кэш разобранных данных csv-файлов. Данные сохраняются в двоичный файл в каталоге кэша и считаются
+    действительными, пока у исходного файла не изменились путь, размер, время изменения и хэш содержимого
+
+    Attributes:
+        cache_dir (str): Каталог, в котором хранятся файлы кэша
+    """
+    hash_block_size = 1024 * 1024
+
+    def __init__(self, cache_dir):
+        """
+        Инициализация объекта
+
+        Args:
+            cache_dir (str): Каталог кэша, создаётся при первой записи
+        """
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def get_fingerprint(file_name):
+        """
+        Вычисляет отпечаток файла: абсолютный путь, размер, время изменения и хэш содержимого
+
+        Args:
+            file_name (str): Путь к файлу
+
+        Returns:
+            dict: {'path': str, 'size': int, 'mtime': int, 'hash': str}
+        """
+        stat = os.stat(file_name)
+        return {'path': os.path.abspath(file_name),
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'hash': DataSetCache.get_content_hash(file_name)}
+
+    @staticmethod
+    def get_content_hash(file_name):
+        """
+        Вычисляет хэш содержимого файла, читая его блоками
+
+        Args:
+            file_name (str): Путь к файлу
+
+        Returns:
+            str: Хэш BLAKE2b в шестнадцатеричной записи
+        """
+        content_hash = hashlib.blake2b(digest_size=20)
+        with open(file_name, 'rb') as file:
+            for block in iter(lambda: file.read(DataSetCache.hash_block_size), b''):
+                content_hash.update(block)
+        return content_hash.hexdigest()
+
+    def get_path(self, file_name, variant):
+        """
+        Возвращает путь к файлу кэша для исходного файла и варианта разбора
+
+        Args:
+            file_name (str): Путь к исходному файлу
+            variant (str): Вариант разбора (например, способ хранения), для каждого варианта ведётся свой кэш
+
+        Returns:
+            str: Путь к файлу кэша
+        """
+        key = hashlib.sha1(f'{os.path.abspath(file_name)}|{variant}'.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'{os.path.basename(file_name)}.{key}.cache')
+
+    def load(self, file_name, variant):
+        """
+        Загружает данные из кэша, если кэш существует и соответствует текущему содержимому файла
+
+        Args:
+            file_name (str): Путь к исходному файлу
+            variant (str): Вариант разбора
+
+        Returns:
+            Any: Сохранённые данные или None, если кэш отсутствует или устарел
+        """
+        path = self.get_path(file_name, variant)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as cache:
+            try:
+                fingerprint = pickle.load(cache)
+                stat = os.stat(file_name)
+                if (fingerprint['path'], fingerprint['size'], fingerprint['mtime']) != \
+                        (os.path.abspath(file_name), stat.st_size, stat.st_mtime_ns):
+                    return None
+                if fingerprint['hash'] != self.get_content_hash(file_name):
+                    return None
+                return pickle.load(cache)
+            except (pickle.UnpicklingError, EOFError, KeyError, AttributeError, TypeError):
+                return None
+
+    def save(self, file_name, variant, payload):
+        """
+        Сохраняет данные в кэш. Запись атомарна: файл кэша заменяется только после полной записи
+
+        Args:
+            file_name (str): Путь к исходному файлу
+            variant (str): Вариант разбора
+            payload (Any): Сохраняемые данные
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.get_path(file_name, variant)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as cache:
+            pickle.dump(self.get_fingerprint(file_name), cache, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, cache, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def invalidate(self, file_name, variant):
+        """
+        Удаляет кэш исходного файла для варианта разбора
+
+        Args:
+            file_name (str): Путь к исходному файлу
+            variant (str): Вариант разбора
+        """
+        path = self.get_path(file_name, variant)
+        if os.path.exists(path):
+            os.remove(path)
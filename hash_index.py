@@ -0,0 +1,119 @@
+"""Модуль с хэш-индексом значений полей вакансий для быстрой фильтрации по равенству"""
+import numpy as np
+
+
+class HashIndex:
+    """
+    Хэш-индекс поля вакансий: для каждого значения хранится отсортированный массив номеров вакансий с этим
+    значением. Для многозначных полей (навыков) индекс инвертированный - номер вакансии входит в списки всех
+    её значений. Поиск по нескольким значениям сводится к пересечению или объединению списков, номера
+    в результате упорядочены по возрастанию, то есть в исходном порядке вакансий
+
+    Attributes:
+        postings (dict[Any, np.ndarray]): Номера вакансий (int64) для каждого значения
+        size (int): Число вакансий
+    """
+    def __init__(self, postings, size):
+        """
+        Инициализация объекта
+
+        Args:
+            postings (dict[Any, np.ndarray]): Отсортированные номера вакансий для каждого значения
+            size (int): Число вакансий
+        """
+        self.postings = postings
+        self.size = size
+
+    @classmethod
+    def from_values(cls, values, multi=False):
+        """
+        Строит индекс за один проход по значениям поля
+
+        Args:
+            values (Iterable): Значения поля в порядке вакансий
+            multi (bool): При значении True каждое значение - последовательность (например, список навыков),
+                вакансия добавляется в списки всех её элементов
+
+        Returns:
+            HashIndex: Индекс
+
+        >>> HashIndex.from_values([['Git', 'SQL'], ['SQL'], None], multi=True).find_all(['SQL', 'Git']).tolist()
+        [0]
+        """
+        postings = {}
+        size = 0
+        for position, value in enumerate(values):
+            size += 1
+            for key in (value or ()) if multi else (value,):
+                postings.setdefault(key, []).append(position)
+        return cls({key: np.array(x, dtype=np.int64) for key, x in postings.items()}, size)
+
+    @classmethod
+    def from_codes(cls, codes, categories):
+        """
+        Строит индекс категориального столбца колоночного представления одной устойчивой сортировкой кодов
+
+        Args:
+            codes (np.ndarray): Коды значений
+            categories (list): Значения, соответствующие кодам
+
+        Returns:
+            HashIndex: Индекс
+
+        >>> HashIndex.from_codes(np.array([1, 0, 1]), ['RUR', 'USD']).find('USD').tolist()
+        [0, 2]
+        """
+        order = np.argsort(codes, kind='stable')
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(categories)))))
+        return cls({key: order[bounds[i]: bounds[i + 1]] for i, key in enumerate(categories)}, len(codes))
+
+    def find(self, value):
+        """
+        Находит вакансии с заданным значением поля
+
+        Args:
+            value (Any): Значение
+
+        Returns:
+            np.ndarray: Номера вакансий в порядке возрастания
+        """
+        return self.postings.get(value, np.zeros(0, dtype=np.int64))
+
+    def find_any(self, values):
+        """
+        Находит вакансии, значение поля которых равно любому из заданных (объединение списков)
+
+        Args:
+            values (Iterable): Значения
+
+        Returns:
+            np.ndarray: Номера вакансий в порядке возрастания
+        """
+        found = [self.postings[x] for x in set(values) if x in self.postings]
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return found[0] if len(found) == 1 else np.unique(np.concatenate(found))
+
+    def find_all(self, values):
+        """
+        Находит вакансии, которым соответствуют все заданные значения (пересечение списков начиная с самого
+        короткого). Используется для многозначных полей
+
+        Args:
+            values (Iterable): Значения
+
+        Returns:
+            np.ndarray: Номера вакансий в порядке возрастания
+        """
+        values = set(values)
+        if any(x not in self.postings for x in values):
+            return np.zeros(0, dtype=np.int64)
+        if not values:
+            return np.arange(self.size, dtype=np.int64)
+        lists = sorted((self.postings[x] for x in values), key=len)
+        found = lists[0]
+        for posting in lists[1:]:
+            found = np.intersect1d(found, posting, assume_unique=True)
+            if len(found) == 0:
+                break
+        return found
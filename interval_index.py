@@ -0,0 +1,124 @@
+"""Модуль с индексом интервалов (дерево с центрами) для поиска вилок окладов, содержащих значение"""
+import numpy as np
+
+
+class IntervalIndex:
+    """
+    Статическое дерево интервалов с центрами. В узле хранятся интервалы, содержащие центр узла, упорядоченные
+    по началу и по концу; интервалы левее центра уходят в левое поддерево, правее - в правое. Центр - медиана
+    концов интервалов узла, поэтому глубина дерева O(log n)
+
+    Поиск интервалов, содержащих точку, проходит один путь от корня и в каждом узле берёт срез отсортированного
+    массива: O(log n + k). Интервалы, пересекающиеся с отрезком [low, high], - это интервалы, содержащие low,
+    и интервалы, начинающиеся в (low, high], которые находятся бинарным поиском по отсортированным началам
+
+    Интервалы с отсутствующей границей (NaN) или с началом больше конца в индекс не входят
+
+    Attributes:
+        size (int): Число интервалов, по которым построен индекс (включая невошедшие)
+        start_order (np.ndarray): Номера интервалов индекса по возрастанию начала
+        sorted_starts (np.ndarray): Начала интервалов в порядке start_order
+        centers (list[float]): Центры узлов
+        children (list[tuple[int, int]]): Номера левого и правого потомков узлов (-1 - потомка нет)
+        by_start (list[tuple[np.ndarray, np.ndarray]]): Номера интервалов узла по возрастанию начала и их начала
+        by_end (list[tuple[np.ndarray, np.ndarray]]): Номера интервалов узла по возрастанию конца и их концы
+    """
+    def __init__(self, starts, ends):
+        """
+        Инициализация объекта, построение дерева за O(n log n)
+
+        Args:
+            starts (np.ndarray | list): Начала интервалов
+            ends (np.ndarray | list): Концы интервалов (включаются в интервал)
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        self.size = len(starts)
+        ids = np.flatnonzero(~np.isnan(starts) & ~np.isnan(ends) & (starts <= ends))
+        self.start_order = ids[np.argsort(starts[ids], kind='stable')]
+        self.sorted_starts = starts[self.start_order]
+        self.centers = []
+        self.children = []
+        self.by_start = []
+        self.by_end = []
+        if len(ids):
+            self.build(ids, starts, ends)
+
+    def build(self, ids, starts, ends):
+        """
+        Строит поддерево для интервалов с указанными номерами
+
+        Args:
+            ids (np.ndarray): Номера интервалов (непустой массив)
+            starts (np.ndarray): Начала всех интервалов
+            ends (np.ndarray): Концы всех интервалов
+
+        Returns:
+            int: Номер корня поддерева
+        """
+        node_starts = starts[ids]
+        node_ends = ends[ids]
+        center = float(np.median(np.concatenate((node_starts, node_ends))))
+        here = (node_starts <= center) & (center <= node_ends)
+        node = len(self.centers)
+        self.centers.append(center)
+        self.children.append((-1, -1))
+        by_start = ids[here][np.argsort(node_starts[here], kind='stable')]
+        by_end = ids[here][np.argsort(node_ends[here], kind='stable')]
+        self.by_start.append((by_start, starts[by_start]))
+        self.by_end.append((by_end, ends[by_end]))
+        left = ids[node_ends < center]
+        right = ids[node_starts > center]
+        self.children[node] = (self.build(left, starts, ends) if len(left) else -1,
+                               self.build(right, starts, ends) if len(right) else -1)
+        return node
+
+    def find(self, value):
+        """
+        Находит интервалы, содержащие значение
+
+        Args:
+            value (int | float): Значение
+
+        Returns:
+            np.ndarray: Номера интервалов по возрастанию
+
+        >>> IntervalIndex([10, 20, 30, np.nan], [25, 40, 35, 50]).find(30).tolist()
+        [1, 2]
+        """
+        found = []
+        node = 0 if self.centers else -1
+        while node != -1:
+            center = self.centers[node]
+            if value < center:
+                ids, node_starts = self.by_start[node]
+                found.append(ids[:np.searchsorted(node_starts, value, side='right')])
+                node = self.children[node][0]
+            elif value > center:
+                ids, node_ends = self.by_end[node]
+                found.append(ids[np.searchsorted(node_ends, value, side='left'):])
+                node = self.children[node][1]
+            else:
+                found.append(self.by_start[node][0])
+                break
+        return np.sort(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def find_overlapping(self, low, high):
+        """
+        Находит интервалы, пересекающиеся с отрезком [low, high]
+
+        Args:
+            low (int | float): Начало отрезка
+            high (int | float): Конец отрезка
+
+        Returns:
+            np.ndarray: Номера интервалов по возрастанию
+
+        >>> IntervalIndex([10, 20, 30, 50], [25, 40, 35, 60]).find_overlapping(26, 45).tolist()
+        [1, 2]
+        """
+        if low > high:
+            return np.zeros(0, dtype=np.int64)
+        first = np.searchsorted(self.sorted_starts, low, side='right')
+        last = np.searchsorted(self.sorted_starts, high, side='right')
+        return np.sort(np.concatenate((self.find(low), self.start_order[first:last])))
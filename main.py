@@ -2,6 +2,8 @@ from utils import Dicts
 from vacancies_parser import DataSet
 from table_printer import TablePrinter
 from stats_processor import Stats, Report
+from year_shards import YearShards
+import os
 
 
 def print_vacancies_table(data):
@@ -15,14 +17,13 @@ def print_vacancies_table(data):
     printer.print_table(Dicts.dic_naming)
 
 
-def report_stats(data):
+def report_stats(stats):
     """
     Создаёт статистический отчёт о вакансиях
 
     Args:
-        data (DataSet): DataSet вакансий
+        stats (Stats): Статистика вакансий
     """
-    stats = Stats(data)
     stats.print_full_stats()
     report = Report(stats.profession,
                     stats.year_salary_dynamics,
@@ -30,7 +31,9 @@ def report_stats(data):
                     stats.year_salary_dynamics_for_prof,
                     stats.num_of_vacancies_per_year_for_prof,
                     stats.salary_levels_of_areas,
-                    stats.vacancy_fractions_of_areas)
+                    stats.vacancy_fractions_of_areas,
+                    stats.granularity,
+                    stats.window)
 
     Report.generate_excel(
         profession=report.profession,
@@ -39,7 +42,9 @@ def report_stats(data):
         year_salary_dynamics_for_prof=report.year_salary_dynamics_for_prof,
         num_of_vacancies_per_year_for_prof=report.num_of_vacancies_per_year_for_prof,
         salary_levels_of_areas=report.salary_levels_of_areas,
-        vacancy_fractions_of_areas=report.vacancy_fractions_of_areas
+        vacancy_fractions_of_areas=report.vacancy_fractions_of_areas,
+        granularity=report.granularity,
+        window=report.window
     )
 
     Report.generate_image(
@@ -49,7 +54,9 @@ def report_stats(data):
         year_salary_dynamics_for_prof=report.year_salary_dynamics_for_prof,
         num_of_vacancies_per_year_for_prof=report.num_of_vacancies_per_year_for_prof,
         salary_levels_of_areas=report.salary_levels_of_areas,
-        vacancy_fractions_of_areas=report.vacancy_fractions_of_areas
+        vacancy_fractions_of_areas=report.vacancy_fractions_of_areas,
+        granularity=report.granularity,
+        window=report.window
     )
 
     Report.generate_pdf(
@@ -64,11 +71,26 @@ def report_stats(data):
     )
 
 
-commands = {'Вакансии': lambda data: print_vacancies_table(data),
-            'Статистика': lambda data: report_stats(data)}
+cache_dir = '.dataset_cache'
+shards_dir = '.year_shards'
+memory_limit = Stats.memory_limit
+granularity = 'year'
+window = None
+commands = {
+    'Вакансии': lambda file_name: print_vacancies_table(DataSet(file_name, cache_dir=cache_dir, storage='indexed')),
+    'Статистика': lambda file_name: report_stats(Stats(DataSet(file_name, cache_dir=cache_dir,
+                                                               columns=Stats.required_columns),
+                                                       granularity=granularity, window=window)),
+    'Статистика по годам': lambda file_name: report_stats(YearShards.get_stats(
+        file_name, input('Введите название профессии: '), shards_dir, os.cpu_count() or 1, granularity=granularity,
+        window=window)),
+    'Статистика большого файла': lambda file_name: report_stats(Stats.from_file(file_name, memory_limit=memory_limit,
+                                                                                granularity=granularity, window=window))
+}
 
-command = input('Введите команду: ')
-if command not in list(commands.keys()):
-    print('Неизвестная команда!')
-else:
-    commands[command](DataSet(input('Введите данные для печати: ')))
+if __name__ == '__main__':
+    command = input('Введите команду: ')
+    if command not in list(commands.keys()):
+        print('Неизвестная команда!')
+    else:
+        commands[command](input('Введите данные для печати: '))
@@ -0,0 +1,117 @@
+"""Модуль с триграммным индексом названий вакансий для быстрого поиска подстрок"""
+import numpy as np
+
+
+class TrigramIndex:
+    """
+    Инвертированный триграммный индекс названий вакансий (без учёта регистра). Одинаковые названия хранятся
+    один раз; для каждой триграммы хранится отсортированный список номеров названий, содержащих её,
+    для каждого названия - номера вакансий с этим названием
+
+    Поиск подстроки пересекает списки триграмм запроса начиная с самого короткого и проверяет только
+    оставшихся кандидатов, поэтому затрагивает лишь подходящие названия и вакансии
+
+    Attributes:
+        names (list[str]): Различные названия в нижнем регистре
+        postings (dict[str, np.ndarray]): Списки номеров названий для каждой триграммы (int32)
+        vacancy_order (np.ndarray): Номера вакансий, упорядоченные по номеру названия
+        vacancy_bounds (np.ndarray): Границы вакансий каждого названия в vacancy_order
+        size (int): Число вакансий
+    """
+    def __init__(self, names):
+        """
+        Инициализация объекта, построение индекса за один проход по названиям
+
+        Args:
+            names (Iterable[str]): Названия вакансий в порядке следования вакансий
+        """
+        ids = {}
+        name_ids = []
+        postings = {}
+        for name in names:
+            lowered = name.lower()
+            name_id = ids.get(lowered)
+            if name_id is None:
+                name_id = ids[lowered] = len(ids)
+                for trigram in self.get_trigrams(lowered):
+                    postings.setdefault(trigram, []).append(name_id)
+            name_ids.append(name_id)
+        self.names = list(ids)
+        self.postings = {trigram: np.array(x, dtype=np.int32) for trigram, x in postings.items()}
+        name_ids = np.array(name_ids, dtype=np.int64)
+        self.size = len(name_ids)
+        self.vacancy_order = np.argsort(name_ids, kind='stable')
+        self.vacancy_bounds = np.concatenate(([0], np.cumsum(np.bincount(name_ids, minlength=len(self.names)))))
+
+    @staticmethod
+    def get_trigrams(string):
+        """
+        Возвращает множество триграмм строки
+
+        Args:
+            string (str): Строка
+
+        Returns:
+            set[str]: Триграммы (пустое множество для строк короче трёх символов)
+
+        >>> sorted(TrigramIndex.get_trigrams('java'))
+        ['ava', 'jav']
+        """
+        return {string[i: i + 3] for i in range(len(string) - 2)}
+
+    def find_names(self, substring):
+        """
+        Находит номера названий, содержащих подстроку
+
+        Args:
+            substring (str): Подстрока (регистр не учитывается)
+
+        Returns:
+            np.ndarray: Номера подходящих названий
+        """
+        substring = substring.lower()
+        trigrams = self.get_trigrams(substring)
+        if not trigrams:
+            return np.array([i for i, name in enumerate(self.names) if substring in name], dtype=np.int64)
+        if any(x not in self.postings for x in trigrams):
+            return np.zeros(0, dtype=np.int64)
+        lists = sorted((self.postings[x] for x in trigrams), key=len)
+        candidates = lists[0]
+        for posting in lists[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if len(candidates) == 0:
+                break
+        return np.array([i for i in candidates.tolist() if substring in self.names[i]], dtype=np.int64)
+
+    def find(self, substring):
+        """
+        Находит вакансии, название которых содержит подстроку
+
+        Args:
+            substring (str): Подстрока (регистр не учитывается)
+
+        Returns:
+            np.ndarray: Номера вакансий в порядке возрастания
+
+        >>> TrigramIndex(['Java Developer', 'Аналитик', 'Senior JAVA developer', 'Python']).find('java').tolist()
+        [0, 2]
+        """
+        name_ids = self.find_names(substring)
+        if len(name_ids) == 0:
+            return np.zeros(0, dtype=np.int64)
+        parts = [self.vacancy_order[self.vacancy_bounds[i]: self.vacancy_bounds[i + 1]] for i in name_ids.tolist()]
+        return np.sort(np.concatenate(parts))
+
+    def get_mask(self, substring):
+        """
+        Возвращает маску вакансий, название которых содержит подстроку
+
+        Args:
+            substring (str): Подстрока (регистр не учитывается)
+
+        Returns:
+            np.ndarray: Булев массив длины size
+        """
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.find(substring)] = True
+        return mask
@@ -0,0 +1,177 @@
+"""Модуль с потоковым скетчем квантилей ограниченного размера"""
+
+
+class QuantileSketch:
+    """
+    Детерминированный скетч квантилей из уровней-компакторов (схема Манку - Раджагопалана - Линдсея).
+    Значение на уровне h представляет 2**h исходных значений. Заполненный уровень сортируется, и каждое второе
+    значение переходит на следующий уровень, поэтому скетч хранит O(k * log(n / k)) значений
+
+    Каждое сжатие уровня h меняет ранг любого значения не более чем на 2**h. Сумма этих величин накапливается
+    в error и является гарантированной границей абсолютной ошибки ранга. Скетчи объединяются сложением
+    с сохранением границы, поэтому их можно строить по частям файла и в разных процессах
+
+    Attributes:
+        k (int): Вместимость уровня
+        levels (list[list]): Значения уровней
+        offsets (list[int]): Смещение, с которого берутся значения при следующем сжатии уровня (чередуется)
+        count (int): Число добавленных значений
+        error (int): Граница абсолютной ошибки ранга
+    """
+    default_k = 1024
+
+    def __init__(self, k=None):
+        """
+        Инициализация объекта
+
+        Args:
+            k (int | None): Вместимость уровня, по умолчанию QuantileSketch.default_k. Граница относительной
+                ошибки ранга имеет порядок 2 * log2(n / k) / k
+        """
+        self.k = k or QuantileSketch.default_k
+        self.levels = [[]]
+        self.offsets = [0]
+        self.count = 0
+        self.error = 0
+
+    def __len__(self):
+        """
+        Возвращает число значений, добавленных в скетч
+
+        Returns:
+            int: Число значений
+        """
+        return self.count
+
+    def update(self, value):
+        """
+        Добавляет значение
+
+        Args:
+            value (int | float): Значение
+        """
+        level = self.levels[0]
+        level.append(value)
+        self.count += 1
+        if len(level) >= self.k:
+            self.compress()
+
+    def extend(self, values):
+        """
+        Добавляет последовательность значений. Значения добавляются частями до заполнения нижнего уровня,
+        поэтому результат совпадает с поочерёдным вызовом update
+
+        Args:
+            values (list[int | float]): Значения
+        """
+        start = 0
+        while start < len(values):
+            part = values[start: start + self.k - len(self.levels[0])]
+            self.levels[0].extend(part)
+            self.count += len(part)
+            start += len(part)
+            if len(self.levels[0]) >= self.k:
+                self.compress()
+
+    def compress(self):
+        """Сжимает все уровни, в которых не меньше k значений"""
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) >= self.k:
+                self.compact(level)
+            level += 1
+
+    def compact(self, level):
+        """
+        Сжимает уровень: значения сортируются, каждое второе переходит на следующий уровень с удвоенным весом.
+        При нечётном числе значений наибольшее остаётся на уровне
+
+        Args:
+            level (int): Номер уровня
+        """
+        if level + 1 == len(self.levels):
+            self.levels.append([])
+            self.offsets.append(0)
+        items = sorted(self.levels[level])
+        kept = [items.pop()] if len(items) % 2 else []
+        self.levels[level + 1].extend(items[self.offsets[level]::2])
+        self.levels[level] = kept
+        self.offsets[level] ^= 1
+        self.error += 2 ** level
+
+    def __add__(self, other):
+        """
+        Объединяет два скетча в новый, исходные скетчи не изменяются
+
+        Args:
+            other (QuantileSketch): Скетч
+
+        Returns:
+            QuantileSketch: Скетч объединения значений. Граница ошибки - сумма границ и ошибок новых сжатий
+        """
+        merged = QuantileSketch(max(self.k, other.k))
+        size = max(len(self.levels), len(other.levels))
+        merged.levels = [(self.levels[i] if i < len(self.levels) else []) +
+                         (other.levels[i] if i < len(other.levels) else []) for i in range(size)]
+        merged.offsets = [self.offsets[i] if i < len(self.offsets) else 0 for i in range(size)]
+        merged.count = self.count + other.count
+        merged.error = self.error + other.error
+        merged.compress()
+        return merged
+
+    def get_weighted_items(self):
+        """
+        Возвращает хранимые значения с весами в порядке возрастания
+
+        Returns:
+            list[tuple[int | float, int]]: Пары 'значение - вес'
+        """
+        return sorted((value, 2 ** level) for level, items in enumerate(self.levels) for value in items)
+
+    def rank(self, value):
+        """
+        Оценивает число добавленных значений, не превосходящих value. Ошибка не больше error
+
+        Args:
+            value (int | float): Значение
+
+        Returns:
+            int: Оценка ранга
+        """
+        return sum(2 ** level for level, items in enumerate(self.levels) for x in items if x <= value)
+
+    def quantile(self, q):
+        """
+        Возвращает приближённый квантиль: наименьшее хранимое значение, оценка ранга которого не меньше q * count.
+        Истинный ранг результата отличается от q * count не больше чем на error
+
+        Args:
+            q (float): Уровень квантиля от 0 до 1
+
+        Returns:
+            int | float | None: Квантиль или None для пустого скетча
+
+        >>> sketch = QuantileSketch(16)
+        >>> sketch.extend(list(range(1, 1001)))
+        >>> abs(sketch.quantile(0.5) - 500) <= sketch.error
+        True
+        """
+        if self.count == 0:
+            return None
+        target = q * self.count
+        weight = 0
+        items = self.get_weighted_items()
+        for value, value_weight in items:
+            weight += value_weight
+            if weight >= target:
+                return value
+        return items[-1][0]
+
+    def get_error_bound(self):
+        """
+        Возвращает границу относительной ошибки ранга
+
+        Returns:
+            float: error / count (0 для пустого скетча)
+        """
+        return self.error / self.count if self.count else 0.0
@@ -1,12 +1,20 @@
 """Модуль, отвечающий за создание статистических отчётов"""
 import math
+import os
+import pickle
+from itertools import accumulate
 import numpy as np
 import matplotlib.pyplot as pyplot
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
 from openpyxl import Workbook
-from openpyxl.styles import Font, Border, Side
-from utils import Utils
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+from utils import Dicts, Utils
+from aho_corasick import AhoCorasick
+from csv_reader import CsvReader
+from vacancies_parser import DataSet
 
 
 class Stats:
@@ -15,123 +23,464 @@ class Stats:
 
     Attributes:
         profession (str): Профессия, по которой требуется статистика
+        granularity (str): Размер периодов динамики: 'year', 'quarter', 'month' или 'week' (см. Utils.get_period).
+            Для периодов меньше года словари динамики содержат пары 'период - значение' вместо 'год - значение',
+            периоды следуют в хронологическом порядке
+        window (int | None): Число периодов скользящего окна для динамики уровня зарплат (см.
+            Stats.get_year_salary_dynamics), None - средние по каждому периоду
         total_vacancies (int): Общее число вакансий
         year_salary_dynamics (dict[int, int]): Динамика уровня зарплат по годам
         num_of_vacancies_per_year (dict[int, int]): Динамика количества вакансий по годам
         year_salary_dynamics_for_prof (dict[int, int]): Динамика уровня зарплат по годам для выбранной профессии
         num_of_vacancies_per_year_for_prof (dict[int, int]): Динамика количества вакансий по годам для выбранной профессии
-        salary_levels_of_areas (dict[str, int]): Уровень зарплат по городам (в порядке убывания)
-        vacancy_fractions_of_areas (dict[str, float]): Доля вакансий по городам (в порядке убывания)
+        salary_levels_of_areas (dict[str, int]): Уровень зарплат по городам (первые Stats.top_areas в порядке
+            убывания)
+        vacancy_fractions_of_areas (dict[str, float]): Доля вакансий по городам (первые Stats.top_areas в порядке
+            убывания)
+        salary_quantiles_of_years (dict[int, dict[str, float]]): Квантили зарплат по годам ('p25', 'median', 'p75',
+            'p90') и граница относительной ошибки их ранга ('error'). Пустой словарь, если квантили не вычислялись
+        salary_quantiles_of_areas (dict[str, dict[str, float]]): Квантили зарплат по регионам в том же формате
+        aggregates (dict): Частичные агрегаты (результат Stats.aggregate), из которых вычисляются остальные атрибуты.
+            Агрегаты разных наборов вакансий объединяются сложением, поэтому статистику можно дополнять новыми данными
     """
-    def __init__(self, data):
+    required_columns = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+    salary_quantiles = {'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p90': 0.9}
+    top_areas = 10
+    memory_limit = 256 * 1024 * 1024
+    memory_per_byte = 8
+
+    def __init__(self, data, profession=None, quantiles=False, granularity='year', window=None):
+        """
+        Инициализация объекта класса. Получение статистических данных из DataSet за один проход по вакансиям
+
+        Args:
+            data (DataSet): Объект DataSet, содержащий данные о вакансиях
+            profession (str | None): Название профессии. При None запрашивается у пользователя
+            quantiles (bool): При значении True по годам и регионам строятся скетчи квантилей зарплат (QuantileSketch)
+            granularity (str): Размер периодов динамики: 'year', 'quarter', 'month' или 'week'
+            window (int | None): Число периодов скользящего окна для динамики уровня зарплат
+        """
+        self.profession = input('Введите название профессии: ') if profession is None else profession
+        self.window = window
+        self.set_aggregates(self.aggregate(data, self.profession, quantiles, granularity))
+
+    @classmethod
+    def from_aggregates(cls, profession, aggregates, window=None):
+        """
+        Создаёт объект статистики из готовых частичных агрегатов без обращения к вакансиям
+
+        Args:
+            profession (str): Название профессии
+            aggregates (dict): Частичные агрегаты в формате Stats.aggregate
+            window (int | None): Число периодов скользящего окна для динамики уровня зарплат
+
+        Returns:
+            Stats: Статистика
+        """
+        stats = cls.__new__(cls)
+        stats.profession = profession
+        stats.window = window
+        stats.set_aggregates(aggregates)
+        return stats
+
+    @classmethod
+    def from_file(cls, file_name, profession=None, memory_limit=None, quantiles=False, granularity='year',
+                  window=None):
+        """
+        Вычисляет статистику csv-файла с ограниченным расходом памяти: файл делится на фрагменты по границам
+        записей, каждый фрагмент загружается в колоночное представление (только Stats.required_columns),
+        его агрегаты добавляются к накопленным, после чего фрагмент освобождается. Список вакансий всего файла
+        не создаётся, а результат совпадает со Stats(DataSet(file_name), profession)
+
+        Размер фрагмента выбирается так, чтобы его разбор занимал не больше memory_limit байт: на байт файла
+        приходится не больше Stats.memory_per_byte байт памяти (оценка для файлов с узкими строками,
+        для файлов с описаниями вакансий расход заметно меньше)
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            profession (str | None): Название профессии. При None запрашивается у пользователя
+            memory_limit (int | None): Ограничение памяти на разбор фрагмента в байтах, по умолчанию Stats.memory_limit
+            quantiles (bool): При значении True строятся скетчи квантилей зарплат
+            granularity (str): Размер периодов динамики
+            window (int | None): Число периодов скользящего окна для динамики уровня зарплат
+
+        Returns:
+            Stats: Статистика
+        """
+        profession = input('Введите название профессии: ') if profession is None else profession
+        memory_limit = memory_limit or Stats.memory_limit
+        parts = max(1, math.ceil(os.path.getsize(file_name) * Stats.memory_per_byte / memory_limit))
+        aggregates = {'years': {}, 'areas': {}, 'total': 0, 'quantiles': quantiles, 'granularity': granularity}
+        for byte_range in CsvReader.split(file_name, parts):
+            chunk = DataSet(file_name, storage='columnar', columns=Stats.required_columns, byte_range=byte_range)
+            aggregates = Stats.merge_aggregates(aggregates, Stats.aggregate(chunk, profession, quantiles, granularity))
+        return cls.from_aggregates(profession, aggregates, window)
+
+    @classmethod
+    def merge(cls, first, second):
+        """
+        Объединяет статистику двух наборов вакансий. Результат совпадает со статистикой, вычисленной по вакансиям
+        первого набора, за которыми следуют вакансии второго. Скользящее окно берётся из первой статистики
+
+        Args:
+            first (Stats): Статистика первого набора
+            second (Stats): Статистика второго набора
+
+        Returns:
+            Stats: Статистика объединённого набора
+        """
+        if first.profession != second.profession:
+            raise ValueError(f'can not merge stats for {first.profession!r} and {second.profession!r}')
+        return cls.from_aggregates(first.profession, cls.merge_aggregates(first.aggregates, second.aggregates),
+                                   first.window)
+
+    def update(self, data):
+        """
+        Дополняет статистику вакансиями нового набора. Просматриваются только новые вакансии,
+        производные словари пересчитываются по объединённым агрегатам
+
+        Args:
+            data (DataSet): Объект DataSet с новыми вакансиями
+        """
+        new_aggregates = self.aggregate(data, self.profession, self.aggregates.get('quantiles', False),
+                                        self.granularity)
+        self.set_aggregates(self.merge_aggregates(self.aggregates, new_aggregates))
+
+    def save(self, file_name):
+        """
+        Сохраняет профессию, скользящее окно и частичные агрегаты в файл
+
+        Args:
+            file_name (str): Путь к файлу
+        """
+        with open(file_name, 'wb') as file:
+            pickle.dump({'profession': self.profession, 'aggregates': self.aggregates, 'window': self.window}, file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_name):
+        """
+        Загружает статистику, сохранённую методом save
+
+        Args:
+            file_name (str): Путь к файлу
+
+        Returns:
+            Stats: Статистика
+        """
+        with open(file_name, 'rb') as file:
+            saved = pickle.load(file)
+        return cls.from_aggregates(saved['profession'], saved['aggregates'], saved.get('window'))
+
+    @staticmethod
+    def merge_aggregates(first, second):
+        """
+        Складывает частичные агрегаты. Группы первого набора сохраняют свой порядок, новые группы второго
+        набора добавляются в конец в порядке их появления
+
+        Args:
+            first (dict): Агрегаты первого набора в формате Stats.aggregate
+            second (dict): Агрегаты второго набора
+
+        Returns:
+            dict: Объединённые агрегаты
+        """
+        if first.get('quantiles', False) != second.get('quantiles', False):
+            raise ValueError('can not merge aggregates with and without quantile sketches')
+        granularity = first.get('granularity', 'year')
+        if granularity != second.get('granularity', 'year'):
+            raise ValueError(f'can not merge {granularity} and {second.get("granularity", "year")} aggregates')
+        merged = {}
+        for groups in ('years', 'areas'):
+            merged[groups] = {key: dict(values) for key, values in first[groups].items()}
+            for key, values in second[groups].items():
+                if key not in merged[groups]:
+                    merged[groups][key] = dict(values)
+                    continue
+                for name, value in values.items():
+                    merged[groups][key][name] += value
+        merged['total'] = first['total'] + second['total']
+        merged['quantiles'] = first.get('quantiles', False)
+        merged['granularity'] = granularity
+        return merged
+
+    def set_aggregates(self, aggregates):
+        """
+        Заменяет частичные агрегаты и пересчитывает по ним все словари статистики за O(число групп).
+        Периоды меньше года упорядочиваются хронологически, поэтому порядок не зависит от порядка строк
+        файла и способа вычисления (шарды по годам, фрагменты файла)
+
+        Args:
+            aggregates (dict): Частичные агрегаты в формате Stats.aggregate
+        """
+        self.granularity = aggregates.get('granularity', 'year')
+        if self.granularity != 'year':
+            aggregates = {**aggregates, 'years': dict(sorted(aggregates['years'].items(), key=lambda x: str(x[0])))}
+        self.aggregates = aggregates
+        self.total_vacancies = aggregates['total']
+        self.year_salary_dynamics = self.get_year_salary_dynamics(aggregates, window=self.window)
+        self.num_of_vacancies_per_year = self.get_num_of_vacancies_per_year(aggregates)
+        self.year_salary_dynamics_for_prof = self.get_year_salary_dynamics(aggregates, for_profession=True,
+                                                                           window=self.window)
+        self.num_of_vacancies_per_year_for_prof = self.get_num_of_vacancies_per_year(aggregates, for_profession=True)
+        self.salary_levels_of_areas = self.get_salary_levels_of_areas(aggregates, Stats.top_areas)
+        self.vacancy_fractions_of_areas = self.get_vacancy_fractions_of_areas(aggregates, Stats.top_areas)
+        self.salary_quantiles_of_years = self.get_salary_quantiles(aggregates['years'])
+        self.salary_quantiles_of_areas = self.get_salary_quantiles(aggregates['areas'])
+
+    @staticmethod
+    def aggregate(data, profession, quantiles=False, granularity='year'):
+        """
+        Вычисляет за один проход по вакансиям (DataSet.group_by_sets) суммы средних зарплат и количества вакансий
+        по годам (всего и для профессии) и по регионам. Годы и регионы следуют в порядке первого появления.
+        Если у DataSet построен индекс названий (DataSet.get_name_index), вакансии профессии берутся из него
+
+        Вместо годов вакансии могут группироваться по кварталам, месяцам или неделям. Для колоночного
+        представления периоды вычисляются векторно (VacancyColumns.get_periods), для объектов Vacancy -
+        один раз для каждой различной даты публикации
+
+        Args:
+            data (DataSet): Объект DataSet, содержащий данные о вакансиях
+            profession (str): Название профессии
+            quantiles (bool): При значении True для каждого года и региона строится скетч зарплат ('sketch')
+            granularity (str): Размер периодов: 'year', 'quarter', 'month' или 'week'
+
+        Returns:
+            dict: {'years': {год или период: {'sum', 'count', 'prof_sum', 'prof_count'[, 'sketch']}},
+                   'areas': {регион: {'sum', 'count'[, 'sketch']}},
+                   'total': общее число вакансий,
+                   'quantiles': строились ли скетчи,
+                   'granularity': размер периодов}
         """
-        Инициализация объекта класса. Получение статистических данных из DataSet
+        salary = 'salary.mean_salary_in_rur'
+        if granularity not in Dicts.periods:
+            raise ValueError(f'unknown granularity: {granularity}')
+        if granularity == 'year':
+            period = 'published_year'
+        elif data.columnar is not None:
+            period = data.columnar.get_periods(granularity)
+        else:
+            periods = {}
+
+            def period(vacancy):
+                """
+                Возвращает период вакансии, вычисляя его один раз для каждой даты публикации
+
+                Args:
+                    vacancy (Vacancy): Вакансия
+
+                Returns:
+                    str | None: Период или None, если дата публикации отсутствует
+                """
+                if vacancy.published_date not in periods:
+                    periods[vacancy.published_date] = None if vacancy.published_at is None else \
+                        Utils.get_period(vacancy.published_at, granularity)
+                return periods[vacancy.published_date]
+        if data.name_index is not None:
+            is_profession = data.name_index.get_mask(profession)
+        elif data.columnar is not None:
+            is_profession = data.columnar.get_name_matches(profession)
+        else:
+            profession = profession.lower()
+            is_profession = lambda x: profession in x.name.lower()
+        sketch = {'sketch': ('sketch', salary)} if quantiles else {}
+        aggregates = data.group_by_sets({
+            'years': (period, {'sum': ('sum', salary),
+                               'count': ('count', None),
+                               'prof_sum': ('sum', salary, is_profession),
+                               'prof_count': ('count', None, is_profession),
+                               **sketch}),
+            'areas': ('area_name', {'sum': ('sum', salary),
+                                    'count': ('count', None),
+                                    **sketch})
+        })
+        aggregates['total'] = sum(x['count'] for x in aggregates['years'].values())
+        aggregates['quantiles'] = quantiles
+        aggregates['granularity'] = granularity
+        return aggregates
+
+    @staticmethod
+    def get_professions_stats(data, professions):
+        """
+        Вычисляет динамику зарплат и количества вакансий по годам сразу для списка профессий за один проход
+        по вакансиям: все профессии ищутся в названии вакансии автоматом Ахо - Корасик, для повторяющихся
+        названий результат поиска берётся из словаря
 
         Args:
             data (DataSet): Объект DataSet, содержащий данные о вакансиях
+            professions (list[str]): Названия профессий
+
+        Returns:
+            dict[str, dict[str, dict[int, int]]]: Словарь 'профессия - {'year_salary_dynamics_for_prof': ...,
+                'num_of_vacancies_per_year_for_prof': ...}' со словарями того же вида, что и атрибуты Stats
         """
-        self.profession = input('Введите название профессии: ')
-        self.total_vacancies = data.length()
-        self.year_salary_dynamics = self.get_year_salary_dynamics(data)
-        self.num_of_vacancies_per_year = self.get_num_of_vacancies_per_year(data)
-        self.year_salary_dynamics_for_prof = self.get_year_salary_dynamics(data, self.profession)
-        self.num_of_vacancies_per_year_for_prof = self.get_num_of_vacancies_per_year(data, self.profession)
-        self.salary_levels_of_areas = self.get_salary_levels_of_areas(data)
-        self.vacancy_fractions_of_areas = self.get_vacancy_fractions_of_areas(data)
+        patterns = list(dict.fromkeys(x.lower() for x in professions))
+        automaton = AhoCorasick(patterns)
+        matches = {}
+        years = {}
+        if data.columnar is not None:
+            columns = data.columnar
+            vacancies = ((name, int(year), int(salary)) for name, year, salary
+                         in zip(columns.get_text('name'), columns.year.tolist(), columns.mean_salary_in_rur.tolist()))
+        else:
+            vacancies = ((x.name, x.published_year, x.salary.mean_salary_in_rur) for x in data.vacancies_objects)
+        for name, year, salary in vacancies:
+            totals = years.get(year)
+            if totals is None:
+                totals = years[year] = ([0] * len(patterns), [0] * len(patterns))
+            found = matches.get(name)
+            if found is None:
+                found = matches[name] = tuple(automaton.find(name.lower()))
+            for index in found:
+                totals[0][index] += salary
+                totals[1][index] += 1
+        result = {}
+        for profession in professions:
+            index = patterns.index(profession.lower())
+            aggregates = {'years': {year: {'prof_sum': sums[index], 'prof_count': counts[index]}
+                                    for year, (sums, counts) in years.items()}}
+            result[profession] = {
+                'year_salary_dynamics_for_prof': Stats.get_year_salary_dynamics(aggregates, for_profession=True),
+                'num_of_vacancies_per_year_for_prof': Stats.get_num_of_vacancies_per_year(aggregates, for_profession=True)
+            }
+        return result
+
+    @staticmethod
+    def get_salary_quantiles(groups):
+        """
+        Возвращает квантили зарплат по скетчам групп
 
-    def get_year_salary_dynamics(self, data, profession=''):
+        Args:
+            groups (dict): Агрегаты групп ('years' или 'areas' из Stats.aggregate)
+
+        Returns:
+            dict[Any, dict[str, float]]: Словарь 'группа - {название квантиля: значение, 'error': граница ошибки}'
+        """
+        return {key: {**{name: values['sketch'].quantile(q) for name, q in Stats.salary_quantiles.items()},
+                      'error': values['sketch'].get_error_bound()}
+                for key, values in groups.items() if 'sketch' in values}
+
+    @staticmethod
+    def get_year_salary_dynamics(aggregates, for_profession=False, window=None):
         """
-        Возвращает словарь, состоящий из пар 'год - средняя зарплата' для всего DataSet или для указанной профессии
+        Возвращает словарь, состоящий из пар 'год - средняя зарплата' для всех вакансий или для профессии
+
+        При заданном window возвращаются скользящие средние: для каждого периода средняя зарплата вакансий
+        этого периода и window - 1 предыдущих. Периоды в этом случае следуют в хронологическом порядке, суммы
+        окон вычисляются по накопленным суммам за O(число периодов)
 
         Args:
-            data (DataSet): Объект DataSet, содержащий список вакансий
-            profession (str): Название профессии, для которой нужно составить статистику. При отсутствии этого аргумента возвращается статистика по всем вакансиям
+            aggregates (dict): Результат Stats.aggregate
+            for_profession (bool): При значении True возвращается статистика по вакансиям профессии
+            window (int | None): Число периодов скользящего окна, при значении None - средние по каждому периоду
 
         Return:
             dict[int, int]: словарь, состоящий из пар 'год - средняя зарплата'
-        """
-        vacancies = data.vacancies_objects
-        vacancies_of_years = Utils.split_list(vacancies, lambda x: Utils.get_year(x.published_at))
-        mean_salaries_of_years = {}
-        for year in vacancies_of_years:
-            sum = 0
-            count = 0
-            for vacancy in vacancies_of_years[year]:
-                if profession.lower() in vacancy.name.lower():
-                    count += 1
-                    sum += vacancy.salary.get_salary_in_rur().get_mean_salary()
-            mean_salaries_of_years[year] = 0 if count == 0 else math.floor(sum / count)
-        return mean_salaries_of_years
 
-    def get_num_of_vacancies_per_year(self, data, profession=''):
+        >>> aggregates = {'years': {2021: {'sum': 300, 'count': 3}, 2020: {'sum': 100, 'count': 1}}}
+        >>> Stats.get_year_salary_dynamics(aggregates), Stats.get_year_salary_dynamics(aggregates, window=2)
+        ({2021: 100, 2020: 100}, {2020: 100, 2021: 100})
+        """
+        prefix = 'prof_' if for_profession else ''
+        if window is None:
+            return {year: 0 if values[f'{prefix}count'] == 0 else math.floor(values[f'{prefix}sum'] / values[f'{prefix}count'])
+                    for year, values in aggregates['years'].items()}
+        if window < 1:
+            raise ValueError('window must be positive')
+        periods = sorted(aggregates['years'])
+        sums = [0, *accumulate(aggregates['years'][x][f'{prefix}sum'] for x in periods)]
+        counts = [0, *accumulate(aggregates['years'][x][f'{prefix}count'] for x in periods)]
+        dynamics = {}
+        for i, period in enumerate(periods, 1):
+            count = counts[i] - counts[max(0, i - window)]
+            dynamics[period] = 0 if count == 0 else math.floor((sums[i] - sums[max(0, i - window)]) / count)
+        return dynamics
+
+    @staticmethod
+    def get_num_of_vacancies_per_year(aggregates, for_profession=False):
         """
-        Возвращает словарь, состоящий из пар 'год - количество вакансий' для всего DataSet или для указанной профессии
+        Возвращает словарь, состоящий из пар 'год - количество вакансий' для всех вакансий или для профессии
 
         Args:
-            data (DataSet): Объект DataSet, содержащий список вакансий
-            profession (str): Название профессии, для которой нужно составить статистику. При отсутствии этого аргумента возвращается статистика по всем вакансиям
+            aggregates (dict): Результат Stats.aggregate
+            for_profession (bool): При значении True возвращается статистика по вакансиям профессии
 
         Return:
             dict[int, int]: словарь, состоящий из пар 'год - количество вакансий'
         """
-        vacancies = data.vacancies_objects
-        vacancies_of_years = Utils.split_list(vacancies, lambda x: Utils.get_year(x.published_at))
-        vacancies_num_of_years = {}
-        for year in vacancies_of_years:
-            count = 0
-            for vacancy in vacancies_of_years[year]:
-                if profession.lower() in vacancy.name.lower():
-                    count += 1
-            vacancies_num_of_years[year] = count
-        return vacancies_num_of_years
+        prefix = 'prof_' if for_profession else ''
+        return {year: values[f'{prefix}count'] for year, values in aggregates['years'].items()}
 
-    def get_salary_levels_of_areas(self, data):
+    @staticmethod
+    def get_areas_ranking(aggregates, value, k=None):
         """
-        Возвращает словарь, состоящий из пар 'регион - средняя зарплата' для всего DataSet или для указанной профессии
+        Возвращает рейтинг регионов, в которых не меньше 1% вакансий, по убыванию величины value. Отбор первых k
+        регионов выполняется кучей; регионы с равными значениями следуют в порядке первого появления
 
         Args:
-            data (DataSet): Объект DataSet, содержащий список вакансий
+            aggregates (dict): Результат Stats.aggregate
+            value (str | func): Название агрегата региона ('sum', 'count') или функция, вычисляющая величину
+                по агрегатам региона
+            k (int | None): Число регионов в рейтинге, при значении None - все регионы
+
+        Returns:
+            dict[str, Any]: словарь, состоящий из пар 'регион - величина' (в порядке убывания)
+        """
+        get_value = (lambda x: x[value]) if isinstance(value, str) else value
+        threshold = math.floor(aggregates['total'] * 0.01)
+        values_of_areas = {area: get_value(values)
+                           for area, values in aggregates['areas'].items() if values['count'] >= threshold}
+        return Utils.get_top_items(values_of_areas, k)
+
+    @staticmethod
+    def get_salary_levels_of_areas(aggregates, k=None):
+        """
+        Возвращает словарь, состоящий из пар 'регион - средняя зарплата' для регионов, в которых не меньше 1% вакансий
+
+        Args:
+            aggregates (dict): Результат Stats.aggregate
+            k (int | None): Число регионов с наибольшей зарплатой, при значении None - все регионы
 
         Return:
-            dict[str, int]: словарь, состоящий из пар 'регион - средняя зарплата'
+            dict[str, int]: словарь, состоящий из пар 'регион - средняя зарплата' (в порядке убывания)
         """
-        vacancies = data.vacancies_objects
-        vacancies_of_areas = Utils.split_list(vacancies, lambda x: x.area_name)
-        salary_levels_of_areas = {}
-        for area in vacancies_of_areas:
-            if len(vacancies_of_areas[area]) >= math.floor(self.total_vacancies * 0.01):
-                sum = 0
-                for vacancy in vacancies_of_areas[area]:
-                    sum += vacancy.salary.get_salary_in_rur().get_mean_salary()
-                salary_levels_of_areas[area] = math.floor(sum / len(vacancies_of_areas[area]))
-        return dict(sorted(salary_levels_of_areas.items(), key=lambda x: x[1], reverse=True))
+        return Stats.get_areas_ranking(aggregates, lambda x: math.floor(x['sum'] / x['count']), k)
 
-    def get_vacancy_fractions_of_areas(self, data):
+    @staticmethod
+    def get_vacancy_fractions_of_areas(aggregates, k=None):
         """
-        Возвращает словарь, состоящий из пар 'регион - доля вакансий' для всего DataSet или для указанной профессии
+        Возвращает словарь, состоящий из пар 'регион - доля вакансий' для регионов, в которых не меньше 1% вакансий
 
         Args:
-            data (DataSet): Объект DataSet, содержащий список вакансий
+            aggregates (dict): Результат Stats.aggregate
+            k (int | None): Число регионов с наибольшей долей вакансий, при значении None - все регионы
 
         Return:
-            dict[str, float]: словарь, состоящий из пар 'регион - доля вакансий'
-        """
-        vacancies = data.vacancies_objects
-        vacancies_of_areas = Utils.split_list(vacancies, lambda x: x.area_name)
-        fractions_for_areas = {}
-        for area in vacancies_of_areas:
-            if len(vacancies_of_areas[area]) >= math.floor(self.total_vacancies * 0.01):
-                fractions_for_areas[area] = float('{:.4f}'.format(len(vacancies_of_areas[area]) / self.total_vacancies))
-        return dict(sorted(fractions_for_areas.items(), key=lambda x: x[1], reverse=True))
-
-    def print_full_stats(self):
-        """Выводит в консоль статистические данные"""
-        print(f'Динамика уровня зарплат по годам: {self.year_salary_dynamics}')
-        print(f'Динамика количества вакансий по годам: {self.num_of_vacancies_per_year}')
-        print(f'Динамика уровня зарплат по годам для выбранной профессии: {self.year_salary_dynamics_for_prof}')
-        print(f'Динамика количества вакансий по годам для выбранной профессии: {self.num_of_vacancies_per_year_for_prof}')
-        print(f'Уровень зарплат по городам (в порядке убывания): {Utils.get_first_dict_elements(self.salary_levels_of_areas, 10)}')
-        print(f'Доля вакансий по городам (в порядке убывания): {Utils.get_first_dict_elements(self.vacancy_fractions_of_areas, 10)}')
+            dict[str, float]: словарь, состоящий из пар 'регион - доля вакансий' (в порядке убывания)
+        """
+        total = aggregates['total']
+        return Stats.get_areas_ranking(aggregates, lambda x: float('{:.4f}'.format(x['count'] / total)), k)
+
+    def print_full_stats(self, top_areas=None):
+        """
+        Выводит в консоль статистические данные
+
+        Args:
+            top_areas (int | None): Число регионов в рейтингах, по умолчанию Stats.top_areas
+        """
+        salary_levels_of_areas = self.salary_levels_of_areas
+        vacancy_fractions_of_areas = self.vacancy_fractions_of_areas
+        if top_areas is not None and top_areas != Stats.top_areas:
+            salary_levels_of_areas = self.get_salary_levels_of_areas(self.aggregates, top_areas)
+            vacancy_fractions_of_areas = self.get_vacancy_fractions_of_areas(self.aggregates, top_areas)
+        periods = Dicts.periods_dative[self.granularity]
+        salary_periods = periods if self.window is None else f'{periods} (скользящее среднее за {self.window})'
+        print(f'Динамика уровня зарплат по {salary_periods}: {self.year_salary_dynamics}')
+        print(f'Динамика количества вакансий по {periods}: {self.num_of_vacancies_per_year}')
+        print(f'Динамика уровня зарплат по {salary_periods} для выбранной профессии: {self.year_salary_dynamics_for_prof}')
+        print(f'Динамика количества вакансий по {periods} для выбранной профессии: {self.num_of_vacancies_per_year_for_prof}')
+        print(f'Уровень зарплат по городам (в порядке убывания): {salary_levels_of_areas}')
+        print(f'Доля вакансий по городам (в порядке убывания): {vacancy_fractions_of_areas}')
 
 
 class Report:
@@ -146,7 +495,10 @@ class Report:
         num_of_vacancies_per_year_for_prof (dict[int, int]): Динамика количества вакансий по годам для выбранной профессии
         salary_levels_of_areas (dict[str, int]): Уровень зарплат по городам (в порядке убывания)
         vacancy_fractions_of_areas (dict[str, float]): Доля вакансий по городам (в порядке убывания)
+        granularity (str): Размер периодов динамики
     """
+    max_bar_periods = 30
+    max_period_ticks = 20
     bold_font = Font(name='Cambria', size=11, bold=True)
     normal_font = Font(name='Calibri', size=11, bold=False)
     black_border = Border(
@@ -163,7 +515,9 @@ class Report:
             year_salary_dynamics_for_prof,
             num_of_vacancies_per_year_for_prof,
             salary_levels_of_areas,
-            vacancy_fractions_of_areas):
+            vacancy_fractions_of_areas,
+            granularity='year',
+            window=None):
         """
         Инициализация объекта класса
 
@@ -175,6 +529,8 @@ class Report:
             num_of_vacancies_per_year_for_prof (dict[int, int]): Динамика количества вакансий по годам для выбранной профессии
             salary_levels_of_areas (dict[str, int]): Уровень зарплат по городам (в порядке убывания)
             vacancy_fractions_of_areas (dict[str, float]): Доля вакансий по городам (в порядке убывания)
+            granularity (str): Размер периодов динамики
+            window (int | None): Число периодов скользящего окна, по которому вычислена динамика уровня зарплат
         """
         self.profession = profession
         self.year_salary_dynamics = year_salary_dynamics
@@ -183,6 +539,8 @@ class Report:
         self.num_of_vacancies_per_year_for_prof = num_of_vacancies_per_year_for_prof
         self.salary_levels_of_areas = salary_levels_of_areas
         self.vacancy_fractions_of_areas = vacancy_fractions_of_areas
+        self.granularity = granularity
+        self.window = window
 
     @classmethod
     def generate_excel(
@@ -193,7 +551,9 @@ class Report:
             year_salary_dynamics_for_prof,
             num_of_vacancies_per_year_for_prof,
             salary_levels_of_areas,
-            vacancy_fractions_of_areas
+            vacancy_fractions_of_areas,
+            granularity='year',
+            window=None
     ):
         """
         Создаёт Excel-таблицу статистики
@@ -206,115 +566,60 @@ class Report:
             num_of_vacancies_per_year_for_prof (dict[int, int]): Динамика количества вакансий по годам для выбранной профессии
             salary_levels_of_areas (dict[str, int]): Уровень зарплат по городам (в порядке убывания)
             vacancy_fractions_of_areas (dict[str, float]): Доля вакансий по городам (в порядке убывания)
+            granularity (str): Размер периодов динамики ('year', 'quarter', 'month' или 'week')
+            window (int | None): Число периодов скользящего окна, по которому вычислена динамика уровня зарплат
         """
-        def apply_label_style(cell):
+        def write_sheet(sheet, columns):
             """
-            Добавляет нужный стиль ячейке заголовков
+            Записывает таблицу на лист построчно. Стили ячеек регистрируются в книге один раз и назначаются
+            по имени, ширина столбцов вычисляется по значениям до записи, поэтому ячейки не перечитываются
 
             Args:
-                cell: Ячейка таблицы
+                sheet: Excel-лист в режиме только записи
+                columns (list[tuple[str, list, str]]): Заголовок, значения и стиль значений каждого столбца.
+                    Столбец с пустым заголовком остаётся пустым
             """
-            cell.font = Report.bold_font
-            cell.border = Report.black_border
-
-        def apply_data_style(cell):
-
-            """
-            Добавляет нужный стиль ячейке значений
-
-            Args:
-                cell: Ячейка таблицы
-            """
-            cell.font = Report.normal_font
-            cell.border = Report.black_border
-
-        def fill_column(sheet, data, column_number, label=''):
-            """
-            Заполняет столбец таблицы значениями
-
-            Args:
-                sheet: Excel-лист
-                data (list[Any]): Список, значениями элементов которого заполняется столбец
-                column_number (int): Номер столбца
-                label (str): Заголовок столбца. При непередаче этого авргумента, заголовок не добавляется
-            """
-            start_from = 1
-            if label != '':
-                start_from = 2
-                cell = sheet.cell(row=1, column=column_number)
-                cell.value = label
-                apply_label_style(cell)
-            for i in range(len(data)):
-                cell = sheet.cell(row=i + start_from, column=column_number)
-                cell.value = data[i]
-                apply_data_style(cell)
-
-        def connect_values_column(sheet, dictionary, key_column, target_column, label=''):
-            """
-            Добавляет в таблицу столбец значений аргумента-словаря в соответствие столбцу ключей
-
-            Args:
-                sheet: Excel-лист
-                dictionary (dict[]): Словарь, ключи которого соответствуют значениям key_column
-                key_column (int): Номер столбца ключей
-                target_column (int): Номер заполняемого значениями столбца
-                label (str): Заголовок столбца значений
-            """
-            start_from = 1
-            if label != '':
-                start_from = 2
-                cell = sheet.cell(row=1, column=target_column)
-                cell.value = label
-                apply_label_style(cell)
-            for i in range(len(dictionary)):
-                key_cell = sheet.cell(row=i + start_from, column=key_column)
-                value_cell = sheet.cell(row=i + start_from, column=target_column)
-                value_cell.value = dictionary[key_cell.value]
-                apply_data_style(value_cell)
-
-        def adjust_col_width(sheet):
-            """
-            Определяет ширину ячеек в соответствии с содержимым
-
-            Args:
-                sheet: Excel-лист
-            """
-            widths = {}
-            for row in sheet.rows:
-                for cell in row:
-                    if cell.value:
-                        widths[cell.column_letter] = max((widths.get(cell.column_letter, 0), len(str(cell.value))))
-            for col, value in widths.items():
-                sheet.column_dimensions[col].width = value + 3
-
-        book = Workbook()
-        year_stats = book.active
-        year_stats.title = 'Статистика по годам'
+            for number, (label, values, _) in enumerate(columns, 1):
+                if label != '':
+                    width = max([len(str(label))] + [len(str(value)) for value in values if value])
+                    sheet.column_dimensions[get_column_letter(number)].width = width + 3
+
+            def make_cell(value, style):
+                cell = WriteOnlyCell(sheet, value=value)
+                cell.style = style
+                return cell
+
+            sheet.append([make_cell(label, 'report_label') if label != '' else None for label, _, _ in columns])
+            for i in range(max(len(values) for _, values, _ in columns)):
+                sheet.append([make_cell(values[i], style) if i < len(values) else None for _, values, style in columns])
+
+        book = Workbook(write_only=True)
+        for name, font, number_format in [('report_label', Report.bold_font, 'General'),
+                                          ('report_data', Report.normal_font, 'General'),
+                                          ('report_percent', Report.normal_font, '0.00%')]:
+            book.add_named_style(NamedStyle(name=name, font=font, border=Report.black_border, number_format=number_format))
+        year_stats = book.create_sheet(f'Статистика по {Dicts.periods_dative[granularity]}')
         area_stats = book.create_sheet('Статистика по городам')
 
-        for col in area_stats.iter_cols(min_col=5, max_col=5, max_row=11):
-            for cell in col:
-                cell.number_format = '0.00%'
-
         is_prof_needed = profession != ''
-        years = list(year_salary_dynamics.keys())
-
-        fill_column(year_stats, years, 1, 'Год')
-        connect_values_column(year_stats, year_salary_dynamics, 1, 2, 'Средняя зарплата')
+        periods = list(year_salary_dynamics.keys())
+        salary_label = 'Средняя зарплата' if window is None else f'Скользящая средняя зарплата ({window})'
+        year_columns = [(Dicts.periods[granularity], periods, 'report_data'),
+                        (salary_label, [year_salary_dynamics[x] for x in periods], 'report_data')]
         if is_prof_needed:
-            connect_values_column(year_stats, year_salary_dynamics_for_prof, 1, 3, f'Средняя зарплата - {profession}')
-        connect_values_column(year_stats, num_of_vacancies_per_year, 1, 4 if is_prof_needed else 3, 'Количество вакансий')
+            year_columns.append((f'{salary_label} - {profession}', [year_salary_dynamics_for_prof[x] for x in periods],
+                                 'report_data'))
+        year_columns.append(('Количество вакансий', [num_of_vacancies_per_year[x] for x in periods], 'report_data'))
         if is_prof_needed:
-            connect_values_column(year_stats, num_of_vacancies_per_year_for_prof, 1, 5, f'Количество вакансий - {profession}')
-
-        fill_column(area_stats, list(salary_levels_of_areas.keys())[:10], 1, 'Город')
-        connect_values_column(area_stats, Utils.get_first_dict_elements(salary_levels_of_areas, 10), 1, 2, 'Уровень зарплат')
+            year_columns.append((f'Количество вакансий - {profession}',
+                                 [num_of_vacancies_per_year_for_prof[x] for x in periods], 'report_data'))
+        write_sheet(year_stats, year_columns)
 
-        fill_column(area_stats, list(vacancy_fractions_of_areas.keys())[:10], 4, 'Город')
-        connect_values_column(area_stats, Utils.get_first_dict_elements(vacancy_fractions_of_areas, 10), 4, 5, 'Доля вакансий')
-
-        adjust_col_width(year_stats)
-        adjust_col_width(area_stats)
+        write_sheet(area_stats, [('Город', list(salary_levels_of_areas.keys()), 'report_data'),
+                                 ('Уровень зарплат', list(salary_levels_of_areas.values()), 'report_data'),
+                                 ('', [], None),
+                                 ('Город', list(vacancy_fractions_of_areas.keys()), 'report_data'),
+                                 ('Доля вакансий', list(vacancy_fractions_of_areas.values()), 'report_percent')])
 
         book.save('report.xlsx')
 
@@ -327,7 +632,9 @@ class Report:
             year_salary_dynamics_for_prof,
             num_of_vacancies_per_year_for_prof,
             salary_levels_of_areas,
-            vacancy_fractions_of_areas
+            vacancy_fractions_of_areas,
+            granularity='year',
+            window=None
     ):
         """
         Создаёт png-файл с графиками статистики
@@ -340,6 +647,9 @@ class Report:
             num_of_vacancies_per_year_for_prof (dict[int, int]): Динамика количества вакансий по годам для выбранной профессии
             salary_levels_of_areas (dict[str, int]): Уровень зарплат по городам (в порядке убывания)
             vacancy_fractions_of_areas (dict[str, float]): Доля вакансий по городам (в порядке убывания)
+            granularity (str): Размер периодов динамики. При большом числе периодов динамика изображается
+                линиями, а подписи периодов прореживаются
+            window (int | None): Число периодов скользящего окна, по которому вычислена динамика уровня зарплат
         """
         fig = pyplot.figure()
 
@@ -349,25 +659,49 @@ class Report:
         city_frac_graph = fig.add_subplot(2, 2, 4)
 
         col_width = 0.4
-        x_axis = np.arange(len(year_salary_dynamics.keys()))
-        year_salary_graph.bar(x_axis - col_width / 2, year_salary_dynamics.values(), width=col_width, label='средняя з/п')
-        year_salary_graph.bar(x_axis + col_width / 2, year_salary_dynamics_for_prof.values(), width=col_width, label=f'з/п {profession}')
-        year_salary_graph.set(title='Уровень зарплат по годам', xticks=x_axis)
-        year_salary_graph.set_xticklabels(labels=year_salary_dynamics.keys(), rotation='vertical', va='top', ha='center')
-        year_salary_graph.tick_params(axis='both', labelsize=8)
-        year_salary_graph.grid(True, axis='y')
-        year_salary_graph.legend(fontsize=8)
-
-        year_count_graph.set_title('Количество вакансий по годам')
-        year_count_graph.bar(x_axis - col_width / 2, num_of_vacancies_per_year.values(), width=col_width, label='Количество вакансий')
-        year_count_graph.bar(x_axis + col_width / 2, num_of_vacancies_per_year_for_prof.values(), width=col_width, label=f'Количество вакансий\n{profession}')
-        year_count_graph.set_xticks(ticks=x_axis, labels=num_of_vacancies_per_year.keys())
-        year_count_graph.set_xticklabels(labels=num_of_vacancies_per_year.keys(), rotation='vertical', va='top', ha='center')
-        year_count_graph.tick_params(axis='both', labelsize=8)
-        year_count_graph.grid(True, axis='y')
-        year_count_graph.legend(fontsize=8)
-
-        result_dic = Utils.get_first_dict_elements(salary_levels_of_areas, 10)
+        periods = list(year_salary_dynamics.keys())
+        x_axis = np.arange(len(periods))
+        as_bars = len(periods) <= Report.max_bar_periods
+        ticks = x_axis if as_bars else x_axis[::math.ceil(len(periods) / Report.max_period_ticks)]
+
+        def draw_dynamics(graph, title, first, second, first_label, second_label):
+            """
+            Рисует динамику двух величин по периодам: столбцами, если периодов не больше Report.max_bar_periods,
+            иначе двумя линиями с подписями не более чем Report.max_period_ticks периодов
+
+            Args:
+                graph: Область графика
+                title (str): Заголовок графика
+                first (dict): Динамика первой величины
+                second (dict): Динамика второй величины
+                first_label (str): Подпись первой величины
+                second_label (str): Подпись второй величины
+            """
+            first = [first[x] for x in periods]
+            second = [second[x] for x in periods]
+            if as_bars:
+                graph.bar(x_axis - col_width / 2, first, width=col_width, label=first_label)
+                graph.bar(x_axis + col_width / 2, second, width=col_width, label=second_label)
+            else:
+                graph.plot(x_axis, first, linewidth=1, label=first_label)
+                graph.plot(x_axis, second, linewidth=1, label=second_label)
+            graph.set_title(title)
+            graph.set_xticks(ticks)
+            graph.set_xticklabels(labels=[periods[i] for i in ticks], rotation='vertical', va='top', ha='center')
+            graph.tick_params(axis='both', labelsize=8)
+            graph.grid(True, axis='y')
+            graph.legend(fontsize=8)
+
+        in_periods = Dicts.periods_dative[granularity]
+        salary_title = f'Уровень зарплат по {in_periods}'
+        if window is not None:
+            salary_title += f'\n(скользящее среднее за {window})'
+        draw_dynamics(year_salary_graph, salary_title, year_salary_dynamics,
+                      year_salary_dynamics_for_prof, 'средняя з/п', f'з/п {profession}')
+        draw_dynamics(year_count_graph, f'Количество вакансий по {in_periods}', num_of_vacancies_per_year,
+                      num_of_vacancies_per_year_for_prof, 'Количество вакансий', f'Количество вакансий\n{profession}')
+
+        result_dic = salary_levels_of_areas
         city_salary_graph.set_title("Уровень зарплат по городам")
         city_salary_graph.invert_yaxis()
         areas = list(result_dic.keys())
@@ -377,7 +711,7 @@ class Report:
         city_salary_graph.set_yticklabels(areas, fontsize=6, va='center', ha='right')
         city_salary_graph.grid(True, axis='x')
 
-        result_dic = Utils.get_first_dict_elements(vacancy_fractions_of_areas, 10)
+        result_dic = dict(vacancy_fractions_of_areas)
         others = 1 - sum((list(result_dic.values())))
         result_dic.update({'Другие': others})
         labels = list(result_dic.keys())
@@ -413,8 +747,6 @@ class Report:
             graph_path (str): путь к графику
         """
 
-        salary_levels_of_areas = Utils.get_first_dict_elements(salary_levels_of_areas, 10)
-        vacancy_fractions_of_areas = Utils.get_first_dict_elements(vacancy_fractions_of_areas, 10)
 
         vacancy_fractions_of_areas = vacancy_fractions_of_areas.items()
         vacancy_fractions_of_areas = {key: str(f'{value * 100:,.2f}%').replace('.', ',') for (key, value) in vacancy_fractions_of_areas}
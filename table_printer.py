@@ -1,5 +1,6 @@
 """Модуль, отвечающий за печать, фильтрацию и сортировку таблицы вакансий"""
 from utils import Utils
+from vacancies_parser import FilterQuery
 import os
 from prettytable import PrettyTable
 
@@ -10,7 +11,8 @@ class TablePrinter:
 
     Attributes:
         data (DataSet): объект DataSet с вакансиями для печати
-        filter_criteria (str): Критерий фильтрации - строка формата 'Название столбца: содержание ячейки'
+        filter_criteria (str): Запрос фильтрации - критерии формата 'Название столбца: содержание ячейки',
+            объединённые операторами AND, OR и NOT
         sorting_criteria (str): Критерий сортировки - название столбца - критерия
         sort_reversed (str): При значении true сортировка происходит по убыванию
         from_to (str): Диапазон вывода - строка 'номер строки - номер строки', первая строка включается, последняя - нет
@@ -41,10 +43,11 @@ class TablePrinter:
         Args:
             dictionary (dict{string: string}): Словарь для перевода названий столбцов и некоторых значений ячеек таблицы
         """
-        if self.filter_criteria != '' and not ':' in self.filter_criteria:
+        criteria = [x for group in FilterQuery.parse(self.filter_criteria) for x, _ in group]
+        if self.filter_criteria != '' and any(not ':' in x for x in criteria):
             print('Формат ввода некорректен')
             return
-        if self.filter_criteria.split(': ')[0] != '' and not self.filter_criteria.split(': ')[0] in self.possible_criteria:
+        if any(x.split(': ')[0] != '' and not x.split(': ')[0] in self.possible_criteria for x in criteria):
             print('Параметр поиска некорректен')
             return
         if self.sorting_criteria not in self.possible_criteria and self.sorting_criteria != '':
@@ -60,8 +63,6 @@ class TablePrinter:
         if self.data.length() == 0:
             print('Нет данных')
             return
-        if self.sorting_criteria != '':
-            self.data.sort(self.sorting_criteria, self.sort_reversed)
 
         def check_for_none(content, handler=lambda x: x, stub=''):
             """
@@ -74,8 +75,20 @@ class TablePrinter:
             """
             return handler(content) if content is not None else stub
 
-        vacancies = self.data.get_filtered_vacancies(self.filter_criteria)
-        if len(vacancies) == 0:
+        border_variant = Utils.get_split_count(self.from_to, ' ')
+        from_to = self.from_to.split(' ')
+        fields = self.fields
+
+        cut_borders_variants = {
+            0: lambda: (0, None),
+            1: lambda: (int(from_to[0]) - 1, None),
+            2: lambda: (int(from_to[0]) - 1, int(from_to[1]) - 1)
+        }
+        start, end = cut_borders_variants[border_variant]()
+
+        count, vacancies = self.data.get_sorted_window(self.filter_criteria, self.sorting_criteria, self.sort_reversed,
+                                                       start, end)
+        if count == 0:
             print('Ничего не найдено')
             return
         labels = ['№', 'Название', 'Описание', 'Навыки', 'Опыт работы', 'Премиум-вакансия',
@@ -86,8 +99,8 @@ class TablePrinter:
         table.max_width = 20
         table.align = 'l'
 
-        for i in range(len(vacancies)):
-            vacancy = vacancies[i]
+        rows = range(count)[start:end]
+        for i, vacancy in zip(rows, vacancies):
             salary = vacancy.salary
             table.add_row([
                 i + 1,
@@ -100,23 +113,12 @@ class TablePrinter:
                 check_for_none(salary, lambda x: f'{Utils.format_num_string(x.salary_from)} - {Utils.format_num_string(x.salary_to)} ({dictionary[x.salary_currency]}) ' + (
                     '(Без вычета налогов)' if (x.salary_gross == 'TRUE' or x.salary_gross == 'true' or x.salary_gross == 'True') else '(С вычетом налогов)')),
                 check_for_none(vacancy.area_name),
-                check_for_none(vacancy.published_at, lambda x: Utils.format_date(x)['output'])
+                check_for_none(vacancy.published_date)
             ])
 
-        border_variant = Utils.get_split_count(self.from_to, ' ')
-        from_to = self.from_to.split(' ')
-        fields = self.fields
-
-        cut_borders_variants = {
-            0: lambda: (0, len(vacancies)),
-            1: lambda: ((int(from_to[0]) - 1), len(vacancies)),
-            2: lambda: (int(from_to[0]) - 1, int(from_to[1]) - 1)
-        }
-        start = cut_borders_variants[border_variant]()[0]
-        end = cut_borders_variants[border_variant]()[1]
         if fields != '':
             fields = fields.split(', ')
             fields.insert(0, '№')
-            print(table.get_string(start=start, end=end, fields=fields))
+            print(table.get_string(fields=fields))
         else:
-            print(table.get_string(start=start, end=end))
\ No newline at end of file
+            print(table.get_string())
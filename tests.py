@@ -1,5 +1,21 @@
-from vacancies_parser import DataSet, Salary
+from vacancies_parser import DataSet, Salary, LazyText, FilterQuery, VacancyRows
+from utils import Utils
+from stats_processor import Stats
+from dataset_cache import DataSetCache
+from year_shards import YearShards
+from benchmarks import Benchmarks
+from quantile_sketch import QuantileSketch
+from aho_corasick import AhoCorasick
+from name_index import TrigramIndex
+from hash_index import HashIndex
+from interval_index import IntervalIndex
+import numpy as np
 from unittest import TestCase, main
+from unittest.mock import patch
+import csv
+import os
+import shutil
+import tempfile
 
 
 class GetFilteredVacanciesTests(TestCase):
@@ -51,6 +67,22 @@ class GetFilteredVacanciesTests(TestCase):
         self.assertEqual(len(self.data.get_filtered_vacancies('')), len(self.data.vacancies_objects))
 
 
+class FormatStringTests(TestCase):
+    def test_html_removed(self):
+        self.assertEqual(Utils.format_string('<p><strong>Обязанности:</strong></p> <p>код</p>'), 'Обязанности: код')
+
+    def test_newlines_marked(self):
+        self.assertEqual(Utils.format_string('HTML5\nCSS3'), 'HTML5!crutch!!CSS3')
+
+    def test_whitespace_collapsed(self):
+        self.assertEqual(Utils.format_string('  Москва \t\xa0 Сити '), 'Москва Сити')
+
+    def test_plain_fields_only_stripped(self):
+        cleaners = Utils.get_cleaners(['salary_from', 'published_at', 'area_name'])
+        self.assertEqual([clean(' 100.0 ') for clean in cleaners], ['100.0', '100.0', '100.0'])
+        self.assertEqual(cleaners[2]('<b>Сочи</b>'), 'Сочи')
+
+
 class SalaryTests(TestCase):
     def test_salary_type(self):
         self.assertEqual(type(Salary('10000', '20000', 'True', 'RUR')).__name__, 'Salary')
@@ -82,6 +114,36 @@ class GetSalaryInRurTests(TestCase):
         self.assertEqual(Salary('200', '300', 'True', 'EUR').get_salary_in_rur().salary_currency, 'RUR')
 
 
+class TypedSalaryTests(TestCase):
+    def test_numeric_bounds(self):
+        salary = Salary('10000.0', '20000.9', 'True', 'RUR')
+        self.assertEqual((salary.salary_from_value, salary.salary_to_value), (10000, 20000))
+
+    def test_currency_code(self):
+        self.assertEqual(Salary.currencies[Salary('1', '2', 'True', 'KZT').currency_code], 'KZT')
+
+    def test_mean_salary_in_rur(self):
+        for currency in Salary.currency_to_rub:
+            salary = Salary('12345.0', '67891.0', 'True', currency)
+            self.assertEqual(salary.get_mean_salary_in_rur(), salary.get_salary_in_rur().get_mean_salary())
+
+    def test_precomputed_mean_salary_in_rur(self):
+        self.assertEqual(Salary('10000.0', '20000.0', 'True', 'USD').mean_salary_in_rur,
+                         Salary('10000.0', '20000.0', 'True', 'USD').get_salary_in_rur().get_mean_salary())
+        self.assertIsNone(Salary('10000.0', '20000.0', 'True', 'XXX').mean_salary_in_rur)
+
+    def test_records_have_no_dict(self):
+        vacancy = DataSet('sorting_test.csv').vacancies_objects[0]
+        self.assertFalse(hasattr(vacancy, '__dict__'))
+        self.assertFalse(hasattr(vacancy.salary, '__dict__'))
+
+    def test_published_fields(self):
+        vacancy = DataSet('sorting_test.csv').vacancies_objects[0]
+        self.assertEqual(vacancy.published_at, '2022-07-17T18:23:06+0300')
+        self.assertEqual((vacancy.published_year, vacancy.published_date), (2022, '17.07.2022'))
+        self.assertEqual(vacancy.published_timestamp, 1658071386)
+
+
 class DataSetTests(TestCase):
     def test_dataset_type(self):
         self.assertEqual(type(DataSet('v.csv')).__name__, 'DataSet')
@@ -108,6 +170,681 @@ class DataSetTests(TestCase):
                                                                             'техническая грамотность'])
 
 
+class DataSetStreamingTests(TestCase):
+    def test_iter_vacancies_matches_dataset(self):
+        self.assertEqual([x.name for x in DataSet.iter_vacancies('filtration_test.csv')],
+                         [x.name for x in DataSet('filtration_test.csv').vacancies_objects])
+
+    def test_streaming_length(self):
+        self.assertEqual(DataSet('filtration_test.csv', streaming=True).length(), DataSet('filtration_test.csv').length())
+
+    def test_streaming_is_reiterable(self):
+        data = DataSet('sorting_test.csv', streaming=True)
+        self.assertEqual([x.name for x in data.vacancies_objects], [x.name for x in data.vacancies_objects])
+
+    def test_streaming_filter(self):
+        data = DataSet('filtration_test.csv', streaming=True)
+        self.assertEqual([x.name for x in data.get_filtered_vacancies('Идентификатор валюты оклада: BYR')],
+                         ['HTML-верстальщик', 'Инженер технической поддержки/HelpDesk'])
+
+    def test_streaming_sort(self):
+        data = DataSet('sorting_test.csv', streaming=True)
+        data.sort('Название', 'Нет')
+        self.assertEqual([x.name for x in data.vacancies_objects][0], 'HTML-верстальщик')
+
+
+class DataSetParallelTests(TestCase):
+    @staticmethod
+    def describe(data):
+        return [(x.name, x.description, x.key_skills, x.area_name, x.published_at, x.salary.salary_from, x.salary.salary_currency)
+                for x in data.vacancies_objects]
+
+    def test_parallel_matches_serial(self):
+        self.assertEqual(self.describe(DataSet('filtration_test.csv', workers=3)), self.describe(DataSet('filtration_test.csv')))
+
+    def test_parallel_partial_file(self):
+        self.assertEqual(self.describe(DataSet('test_partial.csv', workers=2)), self.describe(DataSet('test_partial.csv')))
+
+
+class DataSetColumnarTests(TestCase):
+    def test_columnar_vacancies(self):
+        self.assertEqual(DataSetParallelTests.describe(DataSet('filtration_test.csv', storage='columnar')),
+                         DataSetParallelTests.describe(DataSet('filtration_test.csv')))
+
+    def test_columnar_filters(self):
+        objects = DataSet('filtration_test.csv')
+        columnar = DataSet('filtration_test.csv', storage='columnar')
+        for criteria in ['Навыки: HTML5, CSS3', 'Опыт работы: Более 6 лет', 'Оклад: 130000', 'Компания: ПМЦ Авангард',
+                         'Идентификатор валюты оклада: BYR', 'Дата публикации вакансии: 17.07.2022', '']:
+            self.assertEqual([x.name for x in columnar.get_filtered_vacancies(criteria)],
+                             [x.name for x in objects.get_filtered_vacancies(criteria)])
+
+    def test_columnar_sorts(self):
+        for criteria in DataSet.sorting:
+            objects = DataSet('filtration_test.csv')
+            columnar = DataSet('filtration_test.csv', storage='columnar')
+            objects.sort(criteria, 'Да')
+            columnar.sort(criteria, 'Да')
+            self.assertEqual([x.name for x in columnar.vacancies_objects], [x.name for x in objects.vacancies_objects])
+
+    def test_columnar_mean_salary_in_rur(self):
+        objects = DataSet('filtration_test.csv')
+        columnar = DataSet('filtration_test.csv', storage='columnar')
+        self.assertEqual(columnar.columnar.mean_salary_in_rur.tolist(),
+                         [x.salary.mean_salary_in_rur for x in objects.vacancies_objects])
+
+    def test_columnar_stats(self):
+        with patch('builtins.input', return_value='аналитик'):
+            objects = Stats(DataSet('test_partial.csv'))
+            columnar = Stats(DataSet('test_partial.csv', storage='columnar'))
+        self.assertEqual(list(columnar.__dict__.items()), list(objects.__dict__.items()))
+        self.assertEqual(list(columnar.salary_levels_of_areas.items()), list(objects.salary_levels_of_areas.items()))
+
+
+class DataSetCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, 'sorting_test.csv')
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        shutil.copy('sorting_test.csv', self.file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_warm_load_matches_cold(self):
+        cold = DataSet(self.file_name, cache_dir=self.cache_dir)
+        self.assertIsNotNone(DataSetCache(self.cache_dir).load(self.file_name, 'objects'))
+        warm = DataSet(self.file_name, cache_dir=self.cache_dir)
+        self.assertEqual(DataSetParallelTests.describe(warm), DataSetParallelTests.describe(cold))
+
+    def test_cache_per_storage(self):
+        DataSet(self.file_name, cache_dir=self.cache_dir)
+        self.assertIsNone(DataSetCache(self.cache_dir).load(self.file_name, 'columnar'))
+        columnar = DataSet(self.file_name, storage='columnar', cache_dir=self.cache_dir)
+        self.assertEqual(columnar.length(), 5)
+
+    def test_cache_invalidated_on_change(self):
+        DataSet(self.file_name, cache_dir=self.cache_dir)
+        with open('filtration_test.csv', encoding='utf-8-sig') as source, open(self.file_name, 'w', encoding='utf-8-sig') as target:
+            target.write(source.read())
+        self.assertIsNone(DataSetCache(self.cache_dir).load(self.file_name, 'objects'))
+        self.assertEqual(DataSet(self.file_name, cache_dir=self.cache_dir).length(), 15)
+
+    def test_invalidate(self):
+        DataSet(self.file_name, cache_dir=self.cache_dir)
+        DataSetCache(self.cache_dir).invalidate(self.file_name, 'objects')
+        self.assertIsNone(DataSetCache(self.cache_dir).load(self.file_name, 'objects'))
+
+
+class DataSetProjectionTests(TestCase):
+    def test_description_is_lazy(self):
+        vacancy = DataSet('filtration_test.csv').vacancies_objects[0]
+        self.assertIsInstance(vacancy._description, LazyText)
+        self.assertEqual(vacancy.description[:12], 'Обязанности:')
+        self.assertIsInstance(vacancy._description, str)
+
+    def test_projection_drops_columns(self):
+        vacancy = DataSet('filtration_test.csv', columns=Stats.required_columns).vacancies_objects[0]
+        self.assertIsNone(vacancy.description)
+        self.assertIsNone(vacancy.key_skills)
+        self.assertEqual(vacancy.area_name, 'Санкт-Петербург')
+
+    def test_projection_keeps_validation(self):
+        self.assertEqual(DataSet('filtration_test.csv', columns=['name']).length(), DataSet('filtration_test.csv').length())
+
+    def test_projection_stats(self):
+        with patch('builtins.input', return_value='аналитик'):
+            full = Stats(DataSet('test_partial.csv'))
+            projected = Stats(DataSet('test_partial.csv', columns=Stats.required_columns, storage='columnar'))
+        self.assertEqual(projected.__dict__, full.__dict__)
+
+
+class DataSetIndexedTests(TestCase):
+    def test_indexed_vacancies(self):
+        for file_name in ['filtration_test.csv', 'test_partial.csv']:
+            self.assertEqual(DataSetParallelTests.describe(DataSet(file_name, storage='indexed')),
+                             DataSetParallelTests.describe(DataSet(file_name)))
+
+    def test_range_fetch(self):
+        objects = DataSet('test_partial.csv').vacancies_objects
+        indexed = DataSet('test_partial.csv', storage='indexed').vacancies_objects
+        self.assertEqual(len(indexed), len(objects))
+        for index in [slice(10, 20), slice(-5, None), slice(30, 10), slice(3, 40, 7)]:
+            self.assertEqual([x.name for x in indexed[index]], [x.name for x in objects[index]])
+        self.assertEqual(indexed[-1].published_at, objects[-1].published_at)
+
+    def test_multiline_fields(self):
+        vacancy = DataSet('filtration_test.csv', storage='indexed').vacancies_objects[2]
+        self.assertEqual(vacancy.key_skills, DataSet('filtration_test.csv').vacancies_objects[2].key_skills)
+        self.assertGreater(len(vacancy.key_skills), 1)
+
+    def test_index_is_cached(self):
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, 'sorting_test.csv')
+            shutil.copy('sorting_test.csv', file_name)
+            DataSet(file_name, storage='indexed', cache_dir=directory)
+            row_index = DataSetCache(directory).load(file_name, 'row_index')
+            self.assertEqual(len(row_index), 5)
+            self.assertEqual(DataSet(file_name, storage='indexed', cache_dir=directory).vacancies_objects[1].name,
+                             'Senior Python Developer (Crypto)')
+        finally:
+            shutil.rmtree(directory)
+
+    def test_sort_and_filter(self):
+        objects = DataSet('filtration_test.csv')
+        indexed = DataSet('filtration_test.csv', storage='indexed')
+        self.assertEqual([x.name for x in indexed.get_filtered_vacancies('Опыт работы: Более 6 лет')],
+                         [x.name for x in objects.get_filtered_vacancies('Опыт работы: Более 6 лет')])
+        objects.sort('Оклад', 'Да')
+        indexed.sort('Оклад', 'Да')
+        self.assertEqual([x.name for x in indexed.vacancies_objects], [x.name for x in objects.vacancies_objects])
+
+
+class StatsAggregationTests(TestCase):
+    def test_profession_argument(self):
+        with patch('builtins.input', return_value='аналитик'):
+            asked = Stats(DataSet('test_partial.csv'))
+        self.assertEqual(Stats(DataSet('test_partial.csv'), 'аналитик').__dict__, asked.__dict__)
+
+    def test_streaming_matches_list(self):
+        self.assertEqual(Stats(DataSet('test_partial.csv', streaming=True), 'аналитик').__dict__,
+                         Stats(DataSet('test_partial.csv'), 'аналитик').__dict__)
+
+    def test_aggregates(self):
+        aggregates = Stats.aggregate(DataSet('filtration_test.csv'), '')
+        self.assertEqual(aggregates['total'], 15)
+        self.assertEqual(sum(x['count'] for x in aggregates['years'].values()), 15)
+        self.assertEqual(sum(x['count'] for x in aggregates['areas'].values()), 15)
+        for values in aggregates['years'].values():
+            self.assertEqual((values['sum'], values['count']), (values['prof_sum'], values['prof_count']))
+
+    def test_columnar_aggregates(self):
+        self.assertEqual(Stats.aggregate(DataSet('test_partial.csv', storage='columnar'), 'аналитик'),
+                         Stats.aggregate(DataSet('test_partial.csv'), 'аналитик'))
+
+
+class AreasRankingTests(TestCase):
+    def test_top_items_matches_sorted_slice(self):
+        values = {str(i): i % 7 for i in range(50)}
+        for k in [0, 1, 3, 10, 60]:
+            self.assertEqual(list(Utils.get_top_items(values, k).items()),
+                             sorted(values.items(), key=lambda x: x[1], reverse=True)[:k])
+
+    def test_top_areas_match_full_ranking(self):
+        stats = Stats(DataSet('test_partial.csv'), 'аналитик')
+        for k in [1, 3, 10]:
+            self.assertEqual(list(Stats.get_salary_levels_of_areas(stats.aggregates, k).items()),
+                             list(stats.salary_levels_of_areas.items())[:k])
+            self.assertEqual(list(Stats.get_vacancy_fractions_of_areas(stats.aggregates, k).items()),
+                             list(stats.vacancy_fractions_of_areas.items())[:k])
+
+    def test_stats_keep_top_areas(self):
+        stats = Stats(DataSet('test_partial.csv'), 'аналитик')
+        self.assertEqual(len(stats.salary_levels_of_areas), Stats.top_areas)
+        with patch.object(Utils, 'get_top_items', wraps=Utils.get_top_items) as get_top_items:
+            Stats.from_aggregates(stats.profession, stats.aggregates)
+        self.assertEqual([x.args[1] for x in get_top_items.call_args_list], [Stats.top_areas, Stats.top_areas])
+
+    def test_ranking_by_aggregate(self):
+        aggregates = Stats.aggregate(DataSet('test_partial.csv'), '')
+        ranking = Stats.get_areas_ranking(aggregates, 'count', 3)
+        self.assertEqual(list(ranking), list(Stats.get_vacancy_fractions_of_areas(aggregates, 3)))
+        self.assertEqual(list(ranking.values()), sorted((x['count'] for x in aggregates['areas'].values()), reverse=True)[:3])
+
+
+class OutOfCoreStatsTests(TestCase):
+    def get_output(self, stats):
+        with patch('builtins.print') as printed:
+            stats.print_full_stats()
+        return printed.call_args_list
+
+    def test_matches_in_memory(self):
+        for profession in ['', 'аналитик', 'нет такой']:
+            expected = self.get_output(Stats(DataSet('test_partial.csv'), profession))
+            for memory_limit in [10000, 100000, None]:
+                self.assertEqual(self.get_output(Stats.from_file('test_partial.csv', profession, memory_limit)), expected)
+
+    def test_file_is_read_by_chunks(self):
+        with patch.object(DataSet, 'iter_vacancies', side_effect=AssertionError), \
+                patch('stats_processor.DataSet', wraps=DataSet) as chunk:
+            Stats.from_file('test_partial.csv', 'аналитик', 10000)
+        self.assertGreater(chunk.call_count, 1)
+        for call in chunk.call_args_list:
+            self.assertEqual(call.kwargs['storage'], 'columnar')
+
+    def test_byte_range_storage(self):
+        with self.assertRaises(ValueError):
+            DataSet('test_partial.csv', storage='indexed', byte_range=(0, 10))
+
+
+class PeriodStatsTests(TestCase):
+    def test_year_granularity(self):
+        self.assertEqual(Stats(DataSet('test_partial.csv'), 'аналитик', granularity='year').__dict__,
+                         Stats(DataSet('test_partial.csv'), 'аналитик').__dict__)
+
+    def test_columnar_periods(self):
+        for granularity in ['quarter', 'month', 'week']:
+            objects = Stats(DataSet('test_partial.csv'), 'аналитик', granularity=granularity)
+            columnar = Stats(DataSet('test_partial.csv', storage='columnar'), 'аналитик', granularity=granularity)
+            self.assertEqual(columnar.__dict__, objects.__dict__)
+            self.assertEqual(Stats.from_file('test_partial.csv', 'аналитик', 10000, granularity=granularity).__dict__,
+                             objects.__dict__)
+
+    def test_periods_sum_to_years(self):
+        years = Stats(DataSet('test_partial.csv'), '')
+        months = Stats(DataSet('test_partial.csv'), '', granularity='month')
+        for year, count in years.num_of_vacancies_per_year.items():
+            self.assertEqual(sum(x for month, x in months.num_of_vacancies_per_year.items() if month[:4] == str(year)),
+                             count)
+
+    def test_week_period(self):
+        self.assertEqual(Utils.get_period('2022-01-02T10:00:00+0300', 'week'), '2021-W52')
+        self.assertEqual(Utils.get_period('2022-12-31T10:00:00+0300', 'quarter'), '2022-Q4')
+        with self.assertRaises(ValueError):
+            Utils.get_period('2022-12-31T10:00:00+0300', 'day')
+
+    def test_rolling_means(self):
+        stats = Stats(DataSet('test_partial.csv'), '', granularity='month')
+        self.assertEqual(Stats.get_year_salary_dynamics(stats.aggregates, window=1),
+                         dict(sorted(stats.year_salary_dynamics.items())))
+        rolling = Stats.get_year_salary_dynamics(stats.aggregates, window=3)
+        periods = sorted(stats.aggregates['years'])
+        for i, period in enumerate(periods):
+            window = [stats.aggregates['years'][x] for x in periods[max(0, i - 2): i + 1]]
+            self.assertEqual(rolling[period], sum(x['sum'] for x in window) // sum(x['count'] for x in window))
+
+    def test_window(self):
+        stats = Stats(DataSet('test_partial.csv'), 'аналитик', granularity='month', window=3)
+        self.assertEqual(stats.year_salary_dynamics, Stats.get_year_salary_dynamics(stats.aggregates, window=3))
+        self.assertEqual(stats.year_salary_dynamics_for_prof,
+                         Stats.get_year_salary_dynamics(stats.aggregates, for_profession=True, window=3))
+        self.assertEqual(Stats.merge(stats, Stats(DataSet('test_partial.csv'), 'аналитик', granularity='month')).window, 3)
+
+    def test_merge_other_granularity(self):
+        with self.assertRaises(ValueError):
+            Stats.merge(Stats(DataSet('test_partial.csv'), ''), Stats(DataSet('test_partial.csv'), '', granularity='week'))
+
+
+class IncrementalStatsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open('test_partial.csv', encoding='utf-8-sig') as source:
+            rows = list(csv.reader(source))
+        self.parts = []
+        for i, part in enumerate([rows[1:100], rows[100:]]):
+            file_name = os.path.join(self.directory, f'part{i}.csv')
+            with open(file_name, 'w', encoding='utf-8-sig', newline='') as target:
+                csv.writer(target).writerows([rows[0]] + part)
+            self.parts.append(file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_merge_matches_full(self):
+        merged = Stats.merge(Stats(DataSet(self.parts[0]), 'аналитик'), Stats(DataSet(self.parts[1]), 'аналитик'))
+        full = Stats(DataSet('test_partial.csv'), 'аналитик')
+        self.assertEqual(list(merged.__dict__.items()), list(full.__dict__.items()))
+        self.assertEqual(list(merged.salary_levels_of_areas.items()), list(full.salary_levels_of_areas.items()))
+
+    def test_update(self):
+        stats = Stats(DataSet(self.parts[0]), 'аналитик')
+        stats.update(DataSet(self.parts[1], storage='columnar'))
+        self.assertEqual(stats.__dict__, Stats(DataSet('test_partial.csv'), 'аналитик').__dict__)
+
+    def test_save_and_load(self):
+        stats = Stats(DataSet(self.parts[0]), 'аналитик')
+        file_name = os.path.join(self.directory, 'stats.pickle')
+        stats.save(file_name)
+        loaded = Stats.load(file_name)
+        self.assertEqual(loaded.__dict__, stats.__dict__)
+        loaded.update(DataSet(self.parts[1]))
+        self.assertEqual(loaded.__dict__, Stats(DataSet('test_partial.csv'), 'аналитик').__dict__)
+
+    def test_load_without_quantiles_flag(self):
+        stats = Stats(DataSet(self.parts[0]), 'аналитик')
+        del stats.aggregates['quantiles']
+        file_name = os.path.join(self.directory, 'stats.pickle')
+        stats.save(file_name)
+        loaded = Stats.load(file_name)
+        loaded.update(DataSet(self.parts[1]))
+        self.assertEqual(loaded.__dict__, Stats(DataSet('test_partial.csv'), 'аналитик').__dict__)
+
+    def test_load_without_granularity(self):
+        stats = Stats(DataSet(self.parts[0]), 'аналитик')
+        del stats.aggregates['granularity']
+        file_name = os.path.join(self.directory, 'stats.pickle')
+        stats.save(file_name)
+        loaded = Stats.load(file_name)
+        loaded.update(DataSet(self.parts[1]))
+        self.assertEqual(loaded.__dict__, Stats(DataSet('test_partial.csv'), 'аналитик').__dict__)
+
+    def test_save_window(self):
+        stats = Stats(DataSet(self.parts[0]), 'аналитик', granularity='month', window=2)
+        file_name = os.path.join(self.directory, 'stats.pickle')
+        stats.save(file_name)
+        self.assertEqual(Stats.load(file_name).__dict__, stats.__dict__)
+
+    def test_merge_other_profession(self):
+        with self.assertRaises(ValueError):
+            Stats.merge(Stats(DataSet(self.parts[0]), 'аналитик'), Stats(DataSet(self.parts[1]), 'программист'))
+
+
+class YearShardsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shards_per_year(self):
+        manifest = YearShards.get_manifest('test_partial.csv', self.directory)
+        for year, shard in manifest['shards'].items():
+            self.assertEqual({x.published_year for x in DataSet(shard).vacancies_objects}, {year})
+        self.assertEqual(sum(DataSet(x).length() for x in manifest['shards'].values()), DataSet('test_partial.csv').length())
+
+    def test_split_once(self):
+        YearShards.get_manifest('test_partial.csv', self.directory)
+        with patch.object(YearShards, 'split') as split:
+            YearShards.get_manifest('test_partial.csv', self.directory)
+        split.assert_not_called()
+
+    def test_files_do_not_share_shards(self):
+        first = os.path.join(self.directory, 'first.csv')
+        second = os.path.join(self.directory, 'second.csv')
+        Benchmarks.generate_csv(first, 500, seed=1)
+        Benchmarks.generate_csv(second, 300, seed=2)
+        shards = os.path.join(self.directory, 'shards')
+        expected = Stats(DataSet(first), 'программист').__dict__
+        YearShards.get_stats(first, 'программист', shards)
+        YearShards.get_stats(second, 'программист', shards)
+        self.assertEqual(YearShards.get_stats(first, 'программист', shards).__dict__, expected)
+
+    def test_stats_match(self):
+        file_name = os.path.join(self.directory, 'vacancies.csv')
+        Benchmarks.generate_csv(file_name, 2000)
+        full = Stats(DataSet(file_name), 'программист')
+        for workers in [1, 2]:
+            sharded = YearShards.get_stats(file_name, 'программист', os.path.join(self.directory, 'shards'), workers)
+            self.assertEqual(list(sharded.__dict__.items()), list(full.__dict__.items()))
+            self.assertEqual(list(sharded.year_salary_dynamics.items()), list(full.year_salary_dynamics.items()))
+            self.assertEqual(list(sharded.salary_levels_of_areas.items()), list(full.salary_levels_of_areas.items()))
+
+
+    def test_periods_match(self):
+        file_name = os.path.join(self.directory, 'vacancies.csv')
+        Benchmarks.generate_csv(file_name, 2000)
+        for granularity in ['quarter', 'week']:
+            full = Stats(DataSet(file_name), 'программист', granularity=granularity, window=4)
+            sharded = YearShards.get_stats(file_name, 'программист', os.path.join(self.directory, 'shards'),
+                                           granularity=granularity, window=4)
+            self.assertEqual(list(sharded.year_salary_dynamics.items()), list(full.year_salary_dynamics.items()))
+            self.assertEqual(list(sharded.num_of_vacancies_per_year), sorted(full.num_of_vacancies_per_year))
+
+
+class QuantileSketchTests(TestCase):
+    def assertWithinBound(self, sketch, values):
+        values = np.sort(np.array(values))
+        bound = sketch.get_error_bound()
+        self.assertLess(bound, 0.02)
+        for name, q in Stats.salary_quantiles.items():
+            quantile = sketch.quantile(q)
+            self.assertGreaterEqual(quantile, np.percentile(values, max(0.0, q - bound) * 100, method='inverted_cdf'))
+            self.assertLessEqual(quantile, np.percentile(values, min(1.0, q + bound) * 100, method='higher'))
+
+    def setUp(self):
+        generator = np.random.default_rng(0)
+        self.values = np.floor(generator.lognormal(11, 0.7, 200000)).astype(np.int64)
+        self.values[generator.random(len(self.values)) < 0.01] *= 60
+        self.values = self.values.tolist()
+
+    def test_stream(self):
+        sketch = QuantileSketch()
+        for value in self.values:
+            sketch.update(value)
+        self.assertWithinBound(sketch, self.values)
+        self.assertLess(sum(len(x) for x in sketch.levels), sketch.k * len(sketch.levels))
+
+    def test_extend_matches_update(self):
+        updated = QuantileSketch(64)
+        for value in self.values[:5000]:
+            updated.update(value)
+        extended = QuantileSketch(64)
+        extended.extend(self.values[:5000])
+        self.assertEqual((extended.levels, extended.error), (updated.levels, updated.error))
+
+    def test_merge(self):
+        parts = [QuantileSketch() for _ in range(3)]
+        for i, part in enumerate(parts):
+            part.extend(self.values[i::3])
+        merged = parts[0] + parts[1] + parts[2]
+        self.assertEqual(len(merged), len(self.values))
+        self.assertWithinBound(merged, self.values)
+
+    def test_stats_quantiles(self):
+        file_name = os.path.join(tempfile.mkdtemp(), 'vacancies.csv')
+        try:
+            Benchmarks.generate_csv(file_name, 3000)
+            data = DataSet(file_name)
+            stats = Stats(data, 'программист', quantiles=True)
+            columnar = Stats(DataSet(file_name, storage='columnar'), 'программист', quantiles=True)
+            self.assertEqual(columnar.salary_quantiles_of_areas, stats.salary_quantiles_of_areas)
+            for year, quantiles in stats.salary_quantiles_of_years.items():
+                values = [x.salary.mean_salary_in_rur for x in data.vacancies_objects if x.published_year == year]
+                self.assertWithinBound(stats.aggregates['years'][year]['sketch'], values)
+                self.assertEqual(quantiles['median'], stats.aggregates['years'][year]['sketch'].quantile(0.5))
+            sharded = YearShards.get_stats(file_name, 'программист', os.path.join(os.path.dirname(file_name), 'shards'),
+                                           quantiles=True)
+            self.assertEqual(list(sharded.salary_quantiles_of_years), list(stats.salary_quantiles_of_years))
+            self.assertEqual(sharded.year_salary_dynamics, stats.year_salary_dynamics)
+        finally:
+            shutil.rmtree(os.path.dirname(file_name))
+
+    def test_quantiles_are_optional(self):
+        stats = Stats(DataSet('test_partial.csv'), 'аналитик')
+        self.assertEqual(stats.salary_quantiles_of_years, {})
+        with self.assertRaises(ValueError):
+            Stats.merge(stats, Stats(DataSet('test_partial.csv'), 'аналитик', quantiles=True))
+
+
+class ProfessionsStatsTests(TestCase):
+    professions = ['аналитик', 'Программист', 'программист', 'менеджер', 'java', 'нет такой профессии', '']
+
+    def test_matches_single_profession_stats(self):
+        for storage in ['objects', 'columnar']:
+            data = DataSet('test_partial.csv', storage=storage)
+            result = Stats.get_professions_stats(data, self.professions)
+            self.assertEqual(list(result), list(dict.fromkeys(self.professions)))
+            for profession in self.professions:
+                stats = Stats(data, profession)
+                self.assertEqual(list(result[profession]['year_salary_dynamics_for_prof'].items()),
+                                 list(stats.year_salary_dynamics_for_prof.items()))
+                self.assertEqual(list(result[profession]['num_of_vacancies_per_year_for_prof'].items()),
+                                 list(stats.num_of_vacancies_per_year_for_prof.items()))
+
+    def test_overlapping_patterns(self):
+        automaton = AhoCorasick(['аналитик', 'системный аналитик', 'тик', 'python'])
+        self.assertEqual(automaton.find('ведущий системный аналитик'), {0, 1, 2})
+        self.assertEqual(automaton.find('java developer'), set())
+
+
+class NameIndexTests(TestCase):
+    def test_matches_linear_scan(self):
+        data = DataSet('test_partial.csv')
+        index = data.get_name_index()
+        names = [x.name.lower() for x in data.vacancies_objects]
+        for query in ['аналитик', 'Программист', 'ja', 'a', '', 'нет такой', 'менеджер по продажам', 'Java']:
+            self.assertEqual(index.find(query).tolist(), [i for i, name in enumerate(names) if query.lower() in name])
+
+    def test_stats_use_index(self):
+        data = DataSet('test_partial.csv')
+        expected = Stats(data, 'аналитик').__dict__
+        data.get_name_index()
+        with patch.object(TrigramIndex, 'get_mask', wraps=data.name_index.get_mask) as get_mask:
+            self.assertEqual(Stats(data, 'аналитик').__dict__, expected)
+        get_mask.assert_called_once_with('аналитик')
+
+    def test_index_is_cached(self):
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, 'test_partial.csv')
+            shutil.copy('test_partial.csv', file_name)
+            DataSet(file_name, cache_dir=directory).get_name_index()
+            self.assertIsNotNone(DataSetCache(directory).load(file_name, 'name_index'))
+            with patch.object(TrigramIndex, '__init__') as build:
+                index = DataSet(file_name, storage='columnar', cache_dir=directory).get_name_index()
+            build.assert_not_called()
+            self.assertEqual(index.size, DataSet(file_name).length())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_sort_resets_index(self):
+        data = DataSet('sorting_test.csv', storage='columnar')
+        self.assertEqual(data.get_name_index().find('html').tolist(), [2, 3])
+        data.sort('Название', 'Нет')
+        self.assertIsNone(data.name_index)
+        self.assertEqual(data.get_name_index().find('html').tolist(), [0, 1])
+
+
+class IndexScanTests:
+    queries = []
+
+    def test_matches_scan(self):
+        for query in self.queries:
+            scanned = [x.name for x in DataSet('filtration_test.csv', storage='indexed').get_filtered_vacancies(query)]
+            for storage in ['objects', 'columnar']:
+                data = DataSet('filtration_test.csv', storage=storage)
+                self.assertEqual([x.name for x in data.get_filtered_vacancies(query)], scanned)
+                data.filter(query)
+                self.assertEqual([x.name for x in data.vacancies_objects], scanned)
+
+
+class HashIndexTests(IndexScanTests, TestCase):
+    queries = ['Название региона: Москва', 'Компания: EXNESS Global Limited', 'Навыки: CSS3, Vue', 'Навыки: Git',
+               'Опыт работы: Нет опыта', 'Премиум-вакансия: Нет', 'Идентификатор валюты оклада: Рубли',
+               'Оклад указан до вычета налогов: Да', 'Дата публикации вакансии: 05.07.2022', 'Название региона: Нигде']
+
+    def test_index_is_built_once(self):
+        data = DataSet('filtration_test.csv')
+        with patch.object(HashIndex, 'from_values', wraps=HashIndex.from_values) as build:
+            data.get_filtered_vacancies('Название региона: Москва')
+            data.get_filtered_vacancies('Название региона: Санкт-Петербург')
+        build.assert_called_once()
+        data.filter('Название региона: Москва')
+        self.assertEqual(data.indexes, {})
+
+    def test_skills_index(self):
+        index = HashIndex.from_values([['Git', 'SQL'], ['SQL'], None, ['Git']], multi=True)
+        self.assertEqual(index.find_all(['Git']).tolist(), [0, 3])
+        self.assertEqual(index.find_all(['Git', 'SQL']).tolist(), [0])
+        self.assertEqual(index.find_all(['Git', 'Java']).tolist(), [])
+        self.assertEqual(index.find_any(['SQL', 'Git']).tolist(), [0, 1, 3])
+
+
+class IntervalIndexTests(IndexScanTests, TestCase):
+    queries = ['Оклад: 50000', 'Оклад: 100000', 'Оклад: 1', 'Оклад: 40000 - 60000', 'Оклад: 150000-300000',
+               'Оклад: 90000 - 80000']
+
+    def test_matches_brute_force(self):
+        generator = np.random.default_rng(0)
+        starts = generator.integers(0, 1000, 2000).astype(float)
+        ends = starts + generator.integers(-10, 200, 2000)
+        starts[::97] = np.nan
+        index = IntervalIndex(starts, ends)
+        valid = ~np.isnan(starts)
+        for low, high in [(500, 500), (0, 0), (1200, 1200), (300, 350), (-5, 2000), (700, 600)]:
+            expected = np.flatnonzero(valid & (np.maximum(starts, low) <= np.minimum(ends, high))).tolist()
+            self.assertEqual(index.find_overlapping(low, high).tolist(), expected)
+            if low == high:
+                self.assertEqual(index.find(low).tolist(), expected)
+
+    def test_salary_range(self):
+        vacancies = DataSet('filtration_test.csv').get_filtered_vacancies('Оклад: 40000 - 60000')
+        self.assertTrue(vacancies)
+        for vacancy in vacancies:
+            self.assertTrue(vacancy.salary.salary_from_value <= 60000 and vacancy.salary.salary_to_value >= 40000)
+        with self.assertRaises(ValueError):
+            DataSet.parse_salary_range('1 - 2 - 3')
+
+
+class FilterQueryTests(TestCase):
+    queries = ['Название региона: Москва AND Опыт работы: От 1 года до 3 лет AND Оклад: 100000',
+               'Премиум-вакансия: Да OR Идентификатор валюты оклада: BYR',
+               'NOT Название региона: Москва AND Навыки: Git',
+               'NOT Оклад: 50000 - 150000 OR Название: HTML-верстальщик AND NOT NOT Навыки: HTML5',
+               'Оклад указан до вычета налогов: Да AND Название региона: Нигде OR NOT Опыт работы: Нет опыта']
+
+    def test_matches_single_criteria(self):
+        data = DataSet('filtration_test.csv')
+        for query in self.queries:
+            groups = [[({x.name for x in data.get_filtered_vacancies(criterion)}, negated) for criterion, negated in group]
+                      for group in FilterQuery.parse(query)]
+            expected = [x.name for x in data.vacancies_objects
+                        if any(all((x.name in names) != negated for names, negated in group) for group in groups)]
+            for storage, streaming in [('objects', False), ('objects', True), ('columnar', False), ('indexed', False)]:
+                filtered = DataSet('filtration_test.csv', storage=storage, streaming=streaming)
+                self.assertEqual([x.name for x in filtered.get_filtered_vacancies(query)], expected)
+                filtered.filter(query)
+                self.assertEqual([x.name for x in filtered.vacancies_objects], expected)
+
+    def test_clauses_ordered_by_cost(self):
+        query = FilterQuery('Навыки: Git AND Оклад: 100000 AND Название региона: Москва')
+        self.assertEqual([x['label'] for x in query.groups[0]], ['Название региона', 'Оклад', 'Навыки'])
+
+    def test_compiled_once(self):
+        self.assertIs(FilterQuery.compile('Премиум-вакансия: Да OR Навыки: Git'),
+                      FilterQuery.compile('Премиум-вакансия: Да OR Навыки: Git'))
+
+    def test_unknown_label(self):
+        with self.assertRaises(KeyError):
+            FilterQuery('Название региона: Москва AND Зарплата: 100')
+        with self.assertRaises(KeyError):
+            FilterQuery('Название региона: Москва AND опыт работы: Нет опыта')
+
+    def test_operators_inside_values(self):
+        self.assertEqual(FilterQuery.parse('Компания: ROGA AND KOPYTA'), [[('Компания: ROGA AND KOPYTA', False)]])
+        self.assertEqual(FilterQuery.parse('Название: Java OR Kotlin developer AND NOT Навыки: Git OR SQL'),
+                         [[('Название: Java OR Kotlin developer', False), ('Навыки: Git OR SQL', True)]])
+        query = FilterQuery('Компания: ROGA AND KOPYTA AND Оклад: 100000')
+        self.assertEqual([(x['label'], x['content']) for x in query.groups[0]],
+                         [('Компания', 'ROGA AND KOPYTA'), ('Оклад', '100000')])
+        data = DataSet('filtration_test.csv')
+        self.assertEqual([x.name for x in data.get_filtered_vacancies('Компания: ПМЦ Авангард OR Навыки: Git OR SQL')],
+                         [x.name for x in data.get_filtered_vacancies('Компания: ПМЦ Авангард')])
+
+
+class GroupByTests(TestCase):
+    aggregations = {'count': ('count', None),
+                    'sum': ('sum', 'salary.mean_salary_in_rur'),
+                    'mean': ('mean', 'salary.salary_from_value'),
+                    'min': ('min', 'published_timestamp'),
+                    'max': ('max', 'salary.salary_to_value'),
+                    'analysts': ('count', None, lambda x: 'аналитик' in x.name.lower())}
+
+    def test_first_seen_order(self):
+        groups = DataSet('test_partial.csv').group_by('area_name', {'count': ('count', None)})
+        self.assertEqual(list(groups), list(Utils.split_list(DataSet('test_partial.csv').vacancies_objects, lambda x: x.area_name)))
+
+    def test_aggregations(self):
+        vacancies = DataSet('filtration_test.csv').vacancies_objects
+        groups = DataSet('filtration_test.csv').group_by(lambda x: x.salary.salary_currency, self.aggregations)
+        rur = [x for x in vacancies if x.salary.salary_currency == 'RUR']
+        self.assertEqual(groups['RUR']['count'], len(rur))
+        self.assertEqual(groups['RUR']['sum'], sum(x.salary.mean_salary_in_rur for x in rur))
+        self.assertEqual(groups['RUR']['mean'], sum(x.salary.salary_from_value for x in rur) / len(rur))
+        self.assertEqual(groups['RUR']['min'], min(x.published_timestamp for x in rur))
+        self.assertEqual(groups['RUR']['max'], max(x.salary.salary_to_value for x in rur))
+
+    def test_columnar_group_by(self):
+        for key in ['area_name', 'published_year', 'employer_name', 'name', lambda x: x.premium]:
+            self.assertEqual(list(DataSet('test_partial.csv', storage='columnar').group_by(key, self.aggregations).items()),
+                             list(DataSet('test_partial.csv').group_by(key, self.aggregations).items()))
+
+    def test_unknown_aggregation(self):
+        with self.assertRaises(ValueError):
+            DataSet('sorting_test.csv').group_by('area_name', {'median': ('median', 'published_year')})
+
+
 class DataSetSortTests(TestCase):
     def test_lexicographic_sort(self):
         data = DataSet('sorting_test.csv')
@@ -163,6 +900,80 @@ class DataSetSortTests(TestCase):
                           'HTML-верстальщик (remote)', 'HTML-верстальщик']
                          )
 
+    def test_indexed_sort_reads_sequentially(self):
+        expected = DataSet('filtration_test.csv')
+        expected.sort('Оклад', 'Да')
+        data = DataSet('filtration_test.csv', storage='indexed')
+        with patch.object(VacancyRows, '__getitem__', autospec=True, side_effect=VacancyRows.__getitem__) as get:
+            data.sort('Оклад', 'Да')
+        get.assert_not_called()
+        self.assertEqual([x.name for x in data.vacancies_objects], [x.name for x in expected.vacancies_objects])
+
+
+class SortedVacanciesTests(TestCase):
+    criteria = ['Название', 'Навыки', 'Опыт работы', 'Премиум-вакансия', 'Оклад', 'Название региона',
+                'Дата публикации вакансии', 'Идентификатор валюты оклада']
+
+    def test_matches_in_place_sort(self):
+        for storage in ['objects', 'columnar', 'indexed']:
+            data = DataSet('filtration_test.csv', storage=storage)
+            original = [x.name for x in data.vacancies_objects]
+            for criterion in self.criteria:
+                for is_reversed in ['Да', 'Нет']:
+                    sorted_in_place = DataSet('filtration_test.csv', storage=storage)
+                    sorted_in_place.sort(criterion, is_reversed)
+                    self.assertEqual([x.name for x in data.get_sorted_vacancies(criterion, is_reversed)],
+                                     [x.name for x in sorted_in_place.vacancies_objects])
+            self.assertEqual([x.name for x in data.vacancies_objects], original)
+
+    def test_multi_key_sort(self):
+        vacancies = DataSet('filtration_test.csv').vacancies_objects
+        expected = [x.name for x in sorted(vacancies, key=lambda x: (x.area_name, -x.salary.mean_salary_in_rur))]
+        for storage in ['objects', 'columnar']:
+            data = DataSet('filtration_test.csv', storage=storage)
+            self.assertEqual([x.name for x in data.get_sorted_vacancies([('Название региона', 'Нет'), ('Оклад', 'Да')])],
+                             expected)
+
+    def test_order_is_cached(self):
+        data = DataSet('filtration_test.csv')
+        self.assertIs(data.get_sort_order('Оклад', 'Да'), data.get_sort_order([('Оклад', 'Да')]))
+        view = data.get_sorted_vacancies('Оклад', 'Да')
+        self.assertEqual([x.name for x in view[2:5]], [x.name for x in list(view)[2:5]])
+        data.filter('Название региона: Москва')
+        self.assertEqual(data.sort_orders, {})
+        self.assertEqual(len(data.get_sort_order('Оклад', 'Да')), data.length())
+
+
+class SortedWindowTests(TestCase):
+    def test_matches_full_sort(self):
+        for storage in ['objects', 'columnar', 'indexed']:
+            for filter_criteria in ['', 'Идентификатор валюты оклада: Рубли']:
+                for criterion in ['', 'Премиум-вакансия', 'Оклад', 'Название региона', 'Опыт работы']:
+                    for is_reversed in ['Да', 'Нет']:
+                        expected = DataSet('filtration_test.csv')
+                        if criterion != '':
+                            expected.sort(criterion, is_reversed)
+                        expected = [x.name for x in expected.get_filtered_vacancies(filter_criteria)]
+                        for start, stop in [(0, 3), (2, 7), (0, None), (4, 100), (10, 5), (-3, None)]:
+                            data = DataSet('filtration_test.csv', storage=storage)
+                            count, window = data.get_sorted_window(filter_criteria, criterion, is_reversed, start, stop)
+                            self.assertEqual(count, len(expected))
+                            self.assertEqual([x.name for x in window], expected[start:stop])
+
+    def test_indexed_reads_only_window(self):
+        for filter_criteria in ['', 'Идентификатор валюты оклада: Рубли']:
+            for criterion in ['', 'Оклад']:
+                data = DataSet('filtration_test.csv', storage='indexed')
+                with patch.object(VacancyRows, '__getitem__', autospec=True, side_effect=VacancyRows.__getitem__) as get:
+                    count, window = data.get_sorted_window(filter_criteria, criterion, 'Да', 2, 6)
+                self.assertEqual(len(window), 4)
+                self.assertLessEqual(get.call_count, 4)
+
+    def test_cached_ranks(self):
+        data = DataSet('filtration_test.csv')
+        expected = [x.name for x in data.get_sorted_vacancies('Опыт работы', 'Да')[1:6]]
+        self.assertEqual([x.name for x in data.get_sorted_window('', 'Опыт работы', 'Да', 1, 6)[1]], expected)
+
 
 if __name__ == '__main__':
     main()
@@ -1,7 +1,9 @@
 """Модуль, содержащий вспомогательные функции и словари, использующиеся в программме"""
+import heapq
 from itertools import islice
 import re
-from datetime import datetime
+import sys
+from datetime import date, datetime
 
 
 class Dicts:
@@ -46,9 +48,31 @@ class Dicts:
         'moreThan6': 7,
     }
 
+    plain_fields = ['experience_id', 'premium', 'salary_from', 'salary_to', 'salary_gross', 'salary_currency',
+                    'published_at']
+
+    lazy_fields = ['description']
+
+    periods = {
+        'year': 'Год',
+        'quarter': 'Квартал',
+        'month': 'Месяц',
+        'week': 'Неделя',
+    }
+
+    periods_dative = {
+        'year': 'годам',
+        'quarter': 'кварталам',
+        'month': 'месяцам',
+        'week': 'неделям',
+    }
+
 
 class Utils:
     """Класс, содержащий вспомогательные функции"""
+    html_tag = re.compile(r'<[^<>]*>')
+    epoch_ordinal = date(1970, 1, 1).toordinal()
+
     @staticmethod
     def cut_string(string):
         """
@@ -94,7 +118,38 @@ class Utils:
             dict: {'output': Строка формата DD.MM.YYYY, 'time': Объект DateTime}
         """
         return {'output': f'{string[8:10]}.{string[5:7]}.{string[0:4]}',
-                'time': datetime.strptime(string[:-5], "%Y-%m-%dT%H:%M:%S")}
+                'time': datetime(int(string[0:4]), int(string[5:7]), int(string[8:10]),
+                                 int(string[11:13]), int(string[14:16]), int(string[17:19]))}
+
+    @staticmethod
+    def parse_date(string):
+        """
+        Быстро разбирает строку фиксированного формата 'YYYY-mm-ddTHH:MM:SS+TZTZ' срезами, без strptime.
+        Смещение часового пояса учитывается при вычислении метки времени
+
+        Args:
+            string (str): Исходная строка в формате 'YYYY-mm-ddTHH:MM:SS+TZTZ'
+
+        Returns:
+            dict: {'timestamp': Число секунд с 01.01.1970 UTC, 'year': Год (по местному времени),
+                   'output': Строка формата DD.MM.YYYY (по местному времени)}
+
+        >>> Utils.parse_date('2022-07-05T18:19:30+0300')
+        {'timestamp': 1657034370, 'year': 2022, 'output': '05.07.2022'}
+        >>> Utils.parse_date('2022-01-01T01:00:00+0300')['timestamp'] < Utils.parse_date('2021-12-31T23:00:00+0000')['timestamp']
+        True
+        """
+        year = int(string[0:4])
+        days = date(year, int(string[5:7]), int(string[8:10])).toordinal() - Utils.epoch_ordinal
+        seconds = int(string[11:13]) * 3600 + int(string[14:16]) * 60 + int(string[17:19])
+        offset = 0
+        if len(string) >= 24:
+            offset = int(string[20:22]) * 3600 + int(string[22:24]) * 60
+            if string[19] == '-':
+                offset = -offset
+        return {'timestamp': days * 86400 + seconds - offset,
+                'year': year,
+                'output': f'{string[8:10]}.{string[5:7]}.{string[0:4]}'}
 
     @staticmethod
     def get_split_count(string, sep):
@@ -122,9 +177,38 @@ class Utils:
             string (str): Исходная строка
 
         Returns:
-            str: Строка, в которой записан год из исходной строки
+            int: Год из исходной строки
+        """
+        return int(string[0:4])
+
+    @staticmethod
+    def get_period(string, granularity):
+        """
+        Возвращает период, к которому относится дата строки формата 'YYYY-mm-ddTHH:MM:SS+TZTZ' (по местному времени)
+
+        Args:
+            string (str): Исходная строка
+            granularity (str): Размер периода: 'year', 'quarter', 'month' или 'week' (неделя ISO 8601)
+
+        Returns:
+            int | str: Год (int) или строка вида 'YYYY-Qq', 'YYYY-mm', 'YYYY-Www'. Строки периодов
+                упорядочиваются в хронологическом порядке при сортировке
+
+        >>> [Utils.get_period('2021-01-03T10:00:00+0300', x) for x in ['year', 'quarter', 'month', 'week']]
+        [2021, '2021-Q1', '2021-01', '2020-W53']
         """
-        return datetime.strptime(string[:-5], "%Y-%m-%dT%H:%M:%S").year
+        if granularity not in Dicts.periods:
+            raise ValueError(f'unknown granularity: {granularity}')
+        year = int(string[0:4])
+        if granularity == 'year':
+            return year
+        month = int(string[5:7])
+        if granularity == 'quarter':
+            return f'{year}-Q{(month - 1) // 3 + 1}'
+        if granularity == 'month':
+            return f'{year}-{month:02}'
+        week_year, week, _ = date(year, month, int(string[8:10])).isocalendar()
+        return f'{week_year}-W{week:02}'
 
     @staticmethod
     def format_string(input_string):
@@ -136,11 +220,45 @@ class Utils:
 
         Return:
             str: Отформатированная строка
+
+        >>> Utils.format_string(' <p>Python,\\n  SQL</p> ')
+        'Python,!crutch!! SQL'
         """
-        result = re.sub(r'<[^<>]*>', '', input_string)
-        result = re.sub(r'\n', '!crutch!!', result)
-        result = str.strip(re.sub(r'\s+', ' ', result))
-        return result
+        result = Utils.html_tag.sub('', input_string) if '<' in input_string else input_string
+        if '\n' in result:
+            result = result.replace('\n', '!crutch!!')
+        return ' '.join(result.split())
+
+    @staticmethod
+    def get_cleaners(labels):
+        """
+        Возвращает функции очистки для столбцов csv-файла: свободный текст очищается от html-тегов
+        и лишних пробелов, у полей из Dicts.plain_fields (числа, коды, даты) удаляются только крайние пробелы
+
+        Args:
+            labels (list[str]): Заголовки столбцов
+
+        Returns:
+            list[func]: Функции очистки в порядке столбцов
+
+        >>> [cleaner('  <b>x</b> ') for cleaner in Utils.get_cleaners(['name', 'salary_from'])]
+        ['x', '<b>x</b>']
+        """
+        return [str.strip if label in Dicts.plain_fields else Utils.format_string for label in labels]
+
+    @staticmethod
+    def intern(string):
+        """
+        Возвращает единственный экземпляр строки с таким значением, чтобы часто повторяющиеся значения
+        (коды, названия регионов) не хранились в памяти многократно
+
+        Args:
+            string (str | None): Исходная строка
+
+        Returns:
+            str | None: Строка из таблицы интернированных строк
+        """
+        return None if string is None else sys.intern(string)
 
     @staticmethod
     def cut_frac(string):
@@ -173,13 +291,12 @@ class Utils:
             dict[Any, list]: Словарь с парами 'Общий признак - список'
         """
         groups = {}
-        keys = []
         for element in original:
             key = key_getter(element)
-            if key not in keys:
-                keys.append(key)
-                groups[key] = list()
-            groups[key].append(element)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = []
+            group.append(element)
         return groups
 
     @staticmethod
@@ -199,4 +316,30 @@ class Utils:
             raise ValueError('index out of range')
         for key in list(islice(dictionary, n)):
             result[key] = dictionary[key]
-        return result
\ No newline at end of file
+        return result
+
+    @staticmethod
+    def get_top_items(dictionary, k=None, key=None):
+        """
+        Возвращает словарь из k пар с наибольшими значениями в порядке убывания. Отбор выполняется кучей
+        за O(n log k); при равных значениях пары следуют в порядке исходного словаря, как при устойчивой сортировке
+
+        Args:
+            dictionary (dict): Исходный словарь
+            k (int | None): Число нужных пар, при значении None - все пары
+            key (func | None): Функция, вычисляющая по значению величину для ранжирования, по умолчанию - само значение
+
+        Returns:
+            dict: Словарь из не более чем k пар
+
+        >>> Utils.get_top_items({'a': 1, 'b': 3, 'c': 2, 'd': 3}, 2)
+        {'b': 3, 'd': 3}
+        >>> Utils.get_top_items({'a': {'count': 1}, 'b': {'count': 5}}, 1, key=lambda x: x['count'])
+        {'b': {'count': 5}}
+        """
+        get_value = (lambda x: x[1]) if key is None else (lambda x: key(x[1]))
+        if k is None:
+            return dict(sorted(dictionary.items(), key=get_value, reverse=True))
+        if k < 0:
+            raise ValueError('index out of range')
+        return dict(heapq.nlargest(k, dictionary.items(), key=get_value))
\ No newline at end of file
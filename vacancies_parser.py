@@ -1,8 +1,20 @@
 """Модуль - парсер csv-файлов"""
 from utils import Dicts
 from utils import Utils
+from csv_reader import CsvReader, RowIndex
+from dataset_cache import DataSetCache
+from quantile_sketch import QuantileSketch
+from name_index import TrigramIndex
+from hash_index import HashIndex
+from interval_index import IntervalIndex
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, reduce
 import csv
+import heapq
 import math
+import operator
+import re
+import numpy as np
 
 
 class Salary:
@@ -10,11 +22,19 @@ class Salary:
     Класс, представляющий характеристики оклада
 
     Attributes:
-        salary_from (int): Нижняя граница оклада
-        salary_to (int): Верхняя граница оклада
+        salary_from (str): Нижняя граница оклада
+        salary_to (str): Верхняя граница оклада
         salary_gross (str): Приводится ли оклад до вычета налогов
         salary_currency (str): Валюта оклада
+        salary_from_value (int | None): Целая часть нижней границы оклада, вычисляется один раз при создании
+        salary_to_value (int | None): Целая часть верхней границы оклада
+        currency_code (int | None): Номер валюты в Salary.currencies, None для неизвестной валюты
+        mean_salary_in_rur (int | None): Целочисленный средний оклад в рублях, вычисляется один раз при создании
+            (None, если граница оклада или курс валюты неизвестны)
     """
+    __slots__ = ('salary_from', 'salary_to', 'salary_gross', 'salary_currency',
+                 'salary_from_value', 'salary_to_value', 'currency_code', 'mean_salary_in_rur')
+
     currency_to_rub = {
         "AZN": 35.68,
         "BYR": 23.91,
@@ -27,6 +47,8 @@ class Salary:
         "USD": 60.66,
         "UZS": 0.0055,
     }
+    currencies = list(currency_to_rub)
+    currency_codes = {currency: code for code, currency in enumerate(currency_to_rub)}
 
     def __init__(self, salary_from, salary_to, salary_gross, salary_currency):
         """
@@ -49,11 +71,21 @@ class Salary:
         'True'
         >>> Salary('10000.0', '20000.1', 'True', 'RUR').salary_currency
         'RUR'
+        >>> Salary('10000.0', '20000.1', 'True', 'RUR').salary_to_value
+        20000
+        >>> Salary('10000.0', '20000.1', 'True', 'USD').currency_code
+        8
         """
         self.salary_from = salary_from
         self.salary_to = salary_to
-        self.salary_gross = salary_gross
-        self.salary_currency = salary_currency
+        self.salary_gross = Utils.intern(salary_gross)
+        self.salary_currency = Utils.intern(salary_currency)
+        self.salary_from_value = None if salary_from is None else int(Utils.cut_frac(salary_from))
+        self.salary_to_value = None if salary_to is None else int(Utils.cut_frac(salary_to))
+        self.currency_code = Salary.currency_codes.get(salary_currency)
+        self.mean_salary_in_rur = None
+        if self.currency_code is not None and salary_from is not None and salary_to is not None:
+            self.mean_salary_in_rur = self.get_mean_salary_in_rur()
 
     def get_mean_salary(self):
         """
@@ -65,7 +97,21 @@ class Salary:
         >>> Salary('200', '300', 'True', 'EUR').get_mean_salary()
         250
         """
-        return int((int(Utils.cut_frac(self.salary_from)) + int(Utils.cut_frac(self.salary_to))) / 2)
+        return int((self.salary_from_value + self.salary_to_value) / 2)
+
+    def get_mean_salary_in_rur(self):
+        """
+        Вычисляет целочисленное среднее значение оклада в рублях по числовым полям, не создавая новых объектов.
+        Результат совпадает с get_salary_in_rur().get_mean_salary()
+
+        Returns:
+            int: среднее арифметическое оклада в рублях
+
+        >>> Salary('200', '300', 'True', 'EUR').get_mean_salary_in_rur()
+        14975
+        """
+        rate = Salary.currency_to_rub[self.salary_currency]
+        return int((math.trunc(self.salary_from_value * rate) + math.trunc(self.salary_to_value * rate)) / 2)
 
     def get_salary_in_rur(self):
         """
@@ -92,19 +138,51 @@ class Salary:
         >>> Salary('200', '300', 'True', 'RUR').get_salary_in_rur().salary_currency
         'RUR'
         """
-        return Salary(salary_from=str(float(Utils.cut_frac(self.salary_from)) * Salary.currency_to_rub[self.salary_currency]),
-                      salary_to=str(float(Utils.cut_frac(self.salary_to)) * Salary.currency_to_rub[self.salary_currency]),
+        return Salary(salary_from=str(float(self.salary_from_value) * Salary.currency_to_rub[self.salary_currency]),
+                      salary_to=str(float(self.salary_to_value) * Salary.currency_to_rub[self.salary_currency]),
                       salary_gross=self.salary_gross,
                       salary_currency='RUR')
 
 
+class LazyText:
+    """
+    Неочищенный текст поля, который очищается функцией Utils.format_string только при первом чтении поля
+
+    Attributes:
+        raw (str): Исходный текст ячейки csv-файла
+    """
+    __slots__ = ('raw',)
+
+    def __init__(self, raw):
+        """
+        Инициализация объекта
+
+        Args:
+            raw (str): Исходный текст ячейки csv-файла
+        """
+        self.raw = raw
+
+    @staticmethod
+    def resolve(value):
+        """
+        Возвращает очищенный текст для LazyText, остальные значения возвращает без изменений
+
+        Args:
+            value (str | LazyText | None): Значение поля
+
+        Returns:
+            str | None: Значение поля с очищенным текстом
+        """
+        return Utils.format_string(value.raw) if isinstance(value, LazyText) else value
+
+
 class Vacancy:
     """
     Класс, описывающий вакансию
 
     Attributes:
         name (str): Название вакансии
-        description (str): Описание вакансии
+        description (str): Описание вакансии. Если передан LazyText, текст очищается при первом чтении
         key_skills (list[str]): Основные навыки
         experience_id (str): Опыт работы
         premium (str):  Является ли вакансия премиум-вакансией
@@ -112,7 +190,13 @@ class Vacancy:
         salary (Salary): данные об окладе в объекте класса Salary
         area_name (str): Название региона
         published_at (str): Дата публикации
+        published_timestamp (int | None): Время публикации в секундах с 01.01.1970 UTC с учётом часового пояса
+        published_year (int | None): Год публикации
+        published_date (str | None): Дата публикации в формате DD.MM.YYYY
     """
+    __slots__ = ('name', '_description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary',
+                 'area_name', 'published_at', 'published_timestamp', 'published_year', 'published_date')
+
     def __init__(self,
                  name,
                  description,
@@ -131,7 +215,7 @@ class Vacancy:
 
         Args:
             name (str): Название вакансии
-            description (str): Описание вакансии
+            description (str | LazyText): Описание вакансии
             key_skills (list[str]): Основные навыки
             experience_id (str): Опыт работы
             premium (str):  Является ли вакансия премиум-вакансией
@@ -168,242 +252,1789 @@ class Vacancy:
         'NoneType'
         """
         self.name = name
-        self.description = description
+        self._description = description
         self.key_skills = key_skills
-        self.experience_id = experience_id
-        self.premium = premium
+        self.experience_id = Utils.intern(experience_id)
+        self.premium = Utils.intern(premium)
         self.employer_name = employer_name
         self.salary = Salary(salary_from, salary_to, salary_gross, salary_currency)
-        self.area_name = area_name
+        self.area_name = Utils.intern(area_name)
         self.published_at = published_at
+        if published_at is None:
+            self.published_timestamp = self.published_year = self.published_date = None
+        else:
+            published = Utils.parse_date(published_at)
+            self.published_timestamp = published['timestamp']
+            self.published_year = published['year']
+            self.published_date = Utils.intern(published['output'])
 
+    @property
+    def description(self):
+        """
+        Возвращает описание вакансии, очищая его при первом обращении
 
-class DataSet:
+        Returns:
+            str | None: Описание вакансии
+
+        >>> Vacancy('Инженер', LazyText('<p>Чё-то  там</p>'), None, None, None, None, '200', '300', 'True', 'EUR', 'Сочи', '2022-07-15T09:56:52+0300').description
+        'Чё-то там'
+        """
+        if isinstance(self._description, LazyText):
+            self._description = LazyText.resolve(self._description)
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        """
+        Устанавливает описание вакансии
+
+        Args:
+            value (str | LazyText | None): Описание вакансии
+        """
+        self._description = value
+
+
+class VacancyColumns:
     """
-    Класс, содержащий имя файла-списка вакансий, а также список объектов класса Vacancy, сформированный из данных файла
+    Колоночное представление списка вакансий на основе массивов NumPy
+
+    Числовые поля хранятся в массивах float, категориальные - в виде массивов кодов и списков категорий
+    (коды назначаются в порядке первого появления значения), объекты Vacancy создаются только по запросу.
+    Числовые значения и даты берутся из уже разобранных полей Vacancy и повторно не разбираются
 
     Attributes:
-        file_name (str): имя csv-файла
-        vacancies_objects (list[Vacancy]): список объектов класса Vacancy
+        size (int): Количество вакансий
+        text (dict[str, np.ndarray]): Текстовые поля (name, description, key_skills, published_at,
+            salary_from, salary_to) в исходном виде, массивы dtype=object
+        codes (dict[str, np.ndarray]): Коды категориальных полей
+        categories (dict[str, list]): Значения категорий для каждого категориального поля
+        numbers (dict[str, np.ndarray]): Числовые поля (float, NaN при отсутствии значения)
+        salary_from (np.ndarray): Целая часть нижней границы оклада
+        salary_to (np.ndarray): Целая часть верхней границы оклада
+        timestamp (np.ndarray): Время публикации в секундах с 01.01.1970 UTC
+        year (np.ndarray): Год публикации
+        mean_salary_in_rur (np.ndarray): Целочисленный средний оклад в рублях (вычисляется векторно при создании)
     """
-    sorting = {
-        'Название': lambda x: x.name,
-        'Описание': lambda x: x.description,
-        'Компания': lambda x: x.employer_name,
-        'Навыки': lambda x: len(x.key_skills),
-        'Опыт работы': lambda x: Dicts.experience_in_numbers[x.experience_id],
-        'Премиум-вакансия': lambda x: x.premium,
-        'Оклад': lambda x: x.salary.get_salary_in_rur().get_mean_salary(),
-        'Название региона': lambda x: x.area_name,
-        'Дата публикации вакансии': lambda x: Utils.format_date(x.published_at)['time'],
-        'Идентификатор валюты оклада': lambda x: x.salary.salary_currency,
-        'Оклад указан до вычета налогов': lambda x: x.salary.salary_gross
-    }
+    text_fields = ['name', 'description', 'key_skills', 'published_at', 'salary_from', 'salary_to']
+    categorical_fields = ['experience_id', 'premium', 'employer_name', 'salary_gross', 'salary_currency', 'area_name',
+                          'published_date']
+    numeric_fields = ['salary_from_value', 'salary_to_value', 'published_timestamp', 'published_year']
 
-    def __init__(self, file_name):
+    def __init__(self, text, codes, categories, numbers):
         """
-        Инициализирует объект, составляя список объектов Vacancy со свойствами, соответствующими значениям строк файла
+        Инициализация объекта
 
         Args:
-            file_name (str): Путь к csv-файлу
+            text (dict[str, np.ndarray]): Текстовые поля
+            codes (dict[str, np.ndarray]): Коды категориальных полей
+            categories (dict[str, list]): Значения категорий
+            numbers (dict[str, np.ndarray]): Числовые поля
+        """
+        self.text = text
+        self.codes = codes
+        self.categories = categories
+        self.numbers = numbers
+        self.size = len(text['name'])
+        self.salary_from = numbers['salary_from_value']
+        self.salary_to = numbers['salary_to_value']
+        self.timestamp = numbers['published_timestamp']
+        self.year = numbers['published_year']
+        self.mean_salary_in_rur = numbers['mean_salary_in_rur']
 
-        >>> type(DataSet('v.csv')).__name__
-        'DataSet'
-        >>> DataSet('v.csv').file_name
-        'v.csv'
-        >>> type(DataSet('v.csv').vacancies_objects).__name__
-        'list'
-        >>> type(DataSet('v.csv').vacancies_objects[0]).__name__
-        'Vacancy'
-        >>> type(DataSet('v.csv').vacancies_objects[0].key_skills).__name__
-        'list'
-        >>> DataSet('v.csv').vacancies_objects[0].key_skills
-        ['Организаторские навыки', 'Проведение презентаций', 'MS PowerPoint', 'Информационные технологии', 'Аналитическое мышление', 'Автоматизированное рабочее место (АРМ)', 'техническая грамотность']
-        >>> type(DataSet('test_partial.csv').vacancies_objects[0].key_skills).__name__
-        'NoneType'
-        >>> type(DataSet('test_partial.csv').vacancies_objects[0].description).__name__
-        'NoneType'
-        >>> type(DataSet('test_partial.csv').vacancies_objects[0].experience_id).__name__
-        'NoneType'
-        >>> type(DataSet('test_partial.csv').vacancies_objects[0].premium).__name__
-        'NoneType'
-        >>> type(DataSet('test_partial.csv').vacancies_objects[0].employer_name).__name__
-        'NoneType'
-        >>> type(DataSet('test_partial.csv').vacancies_objects[0].salary.salary_gross).__name__
-        'NoneType'
+    @classmethod
+    def from_vacancies(cls, vacancies):
         """
-        self.file_name = file_name
-        self.vacancies_objects = []
-        vacancies = []
-        labels = []
-        with open(file_name, encoding='utf-8-sig') as data:
-            reader = csv.reader(data, delimiter=',')
-            checker = 0
-            for row in reader:
-                if checker == 0:
-                    checker += 1
-                    labels = row
-                else:
-                    vacancies.append(row)
-        cleaned_rows = []
-        for row in vacancies:
-            if all(row) and len(labels) == len(row):
-                temp = []
-                for i in range(len(row)):
-                    temp.append(Utils.format_string(row[i]))
-                cleaned_rows.append(temp)
-        for row in cleaned_rows:
-            vacancy = {}
-            for i in range(len(labels)):
-                vacancy[labels[i]] = row[i]
-
-            def check_presence(vacancy, label):
-                """
-                Возвращает None, если искомого заголовка не существует
-
-                Args:
-                    vacancy (dict[str, str]) словарь  данными о вакансиях: 'Название характеристики - содержание'
-                    label (str) - проверяемый заголовок
-                """
-                return None if label not in vacancy.keys() else vacancy[label]
-
-            self.vacancies_objects.append(Vacancy(check_presence(vacancy, 'name'),
-                                                  check_presence(vacancy, 'description'),
-                                                  None if 'key_skills' not in vacancy.keys() else vacancy['key_skills'].split('!crutch!!'),
-                                                  check_presence(vacancy, 'experience_id'),
-                                                  check_presence(vacancy, 'premium'),
-                                                  check_presence(vacancy, 'employer_name'),
-                                                  check_presence(vacancy, 'salary_from'),
-                                                  check_presence(vacancy, 'salary_to'),
-                                                  check_presence(vacancy, 'salary_gross'),
-                                                  check_presence(vacancy, 'salary_currency'),
-                                                  check_presence(vacancy, 'area_name'),
-                                                  check_presence(vacancy, 'published_at')))
+        Создаёт колоночное представление из последовательности вакансий за один проход
 
-    def length(self):
+        Args:
+            vacancies (Iterable[Vacancy]): Вакансии
+
+        Returns:
+            VacancyColumns: Колоночное представление
+
+        >>> columns = VacancyColumns.from_vacancies(DataSet.iter_vacancies('sorting_test.csv'))
+        >>> columns.size
+        5
+        >>> columns.vacancy(1).name
+        'Senior Python Developer (Crypto)'
+        >>> columns.mean_salary_in_rur.tolist() == [x.salary.mean_salary_in_rur for x in DataSet.iter_vacancies('sorting_test.csv')]
+        True
         """
-        Возвращает длину списка вакансий
+        text = {field: [] for field in cls.text_fields}
+        codes = {field: [] for field in cls.categorical_fields}
+        numbers = {field: [] for field in cls.numeric_fields}
+        encodings = {field: {} for field in cls.categorical_fields}
+        for vacancy in vacancies:
+            values = cls.get_fields(vacancy)
+            for field in cls.text_fields:
+                text[field].append(values[field])
+            for field in cls.categorical_fields:
+                encoding = encodings[field]
+                codes[field].append(encoding.setdefault(values[field], len(encoding)))
+            for field in cls.numeric_fields:
+                numbers[field].append(values[field])
+        codes = {field: np.array(values, dtype=np.int32) for field, values in codes.items()}
+        categories = {field: list(encodings[field]) for field in cls.categorical_fields}
+        numbers = {field: np.array(values, dtype=np.float64) for field, values in numbers.items()}
+        numbers['mean_salary_in_rur'] = cls.get_mean_salaries_in_rur(numbers['salary_from_value'], numbers['salary_to_value'],
+                                                                     codes['salary_currency'], categories['salary_currency'])
+        return cls({field: cls.object_array(values) for field, values in text.items()}, codes, categories, numbers)
+
+    @staticmethod
+    def get_fields(vacancy):
+        """
+        Возвращает словарь значений полей вакансии, включая поля оклада и разобранные числовые значения
+
+        Args:
+            vacancy (Vacancy): Вакансия
 
         Returns:
-            int: Длина vacancies_objects
+            dict[str, Any]: Словарь 'поле - значение'
         """
-        return len(self.vacancies_objects)
+        salary = vacancy.salary
+        return {'name': vacancy.name,
+                'description': vacancy._description,
+                'key_skills': vacancy.key_skills,
+                'experience_id': vacancy.experience_id,
+                'premium': vacancy.premium,
+                'employer_name': vacancy.employer_name,
+                'salary_from': salary.salary_from,
+                'salary_to': salary.salary_to,
+                'salary_gross': salary.salary_gross,
+                'salary_currency': salary.salary_currency,
+                'area_name': vacancy.area_name,
+                'published_at': vacancy.published_at,
+                'published_date': vacancy.published_date,
+                'salary_from_value': np.nan if salary.salary_from_value is None else salary.salary_from_value,
+                'salary_to_value': np.nan if salary.salary_to_value is None else salary.salary_to_value,
+                'published_timestamp': np.nan if vacancy.published_timestamp is None else vacancy.published_timestamp,
+                'published_year': np.nan if vacancy.published_year is None else vacancy.published_year}
 
-    def sort(self, sorting_criteria, is_reversed):
+    @staticmethod
+    def object_array(values):
         """
-        Сортирует vacancies_objects данного объекта по критерию из клчей словаря sorting
+        Создаёт одномерный массив dtype=object (элементы-списки не превращаются в измерения массива)
 
         Args:
-            sorting_criteria (str): Критерий сортировки - название столбца - критерия
-            is_reversed (str): При значении 'Да' сортировка происходит по убыванию
+            values (list): Значения
 
-        >>> data = DataSet('sorting_test.csv')
-        >>> data.sort('Название', 'Нет')
-        >>> [x.name for x in data.vacancies_objects]
-        ['HTML-верстальщик', 'HTML-верстальщик (remote)', 'Information Security Policy Specialist (Methodology)', 'Senior Python Developer (Crypto)', 'Руководитель проекта по системам связи и информационным технологиям']
-        >>> data = DataSet('sorting_test.csv')
-        >>> data.sort('Навыки', 'Нет')
-        >>> [x.name for x in data.vacancies_objects]
-        ['Information Security Policy Specialist (Methodology)', 'Senior Python Developer (Crypto)', 'Руководитель проекта по системам связи и информационным технологиям', 'HTML-верстальщик (remote)', 'HTML-верстальщик']
-        >>> data = DataSet('sorting_test.csv')
-        >>> data.sort('Опыт работы', 'Нет')
-        >>> [x.name for x in data.vacancies_objects]
-        ['HTML-верстальщик', 'HTML-верстальщик (remote)', 'Руководитель проекта по системам связи и информационным технологиям', 'Senior Python Developer (Crypto)', 'Information Security Policy Specialist (Methodology)']
-        >>> data = DataSet('sorting_test.csv')
-        >>> data.sort('Оклад', 'Нет')
-        >>> [x.name for x in data.vacancies_objects]
-        ['Руководитель проекта по системам связи и информационным технологиям', 'HTML-верстальщик', 'HTML-верстальщик (remote)', 'Senior Python Developer (Crypto)', 'Information Security Policy Specialist (Methodology)']
-        >>> data = DataSet('sorting_test.csv')
-        >>> data.sort('Дата публикации вакансии', 'Нет')
-        >>> [x.name for x in data.vacancies_objects]
-        ['Senior Python Developer (Crypto)', 'HTML-верстальщик', 'HTML-верстальщик (remote)', 'Information Security Policy Specialist (Methodology)', 'Руководитель проекта по системам связи и информационным технологиям']
-        >>> data = DataSet('sorting_test.csv')
-        >>> data.sort('Название', 'Да')
-        >>> [x.name for x in data.vacancies_objects]
-        ['Руководитель проекта по системам связи и информационным технологиям', 'Senior Python Developer (Crypto)', 'Information Security Policy Specialist (Methodology)', 'HTML-верстальщик (remote)', 'HTML-верстальщик']
+        Returns:
+            np.ndarray: Массив значений
+        """
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+
+    def __len__(self):
+        """
+        Возвращает количество вакансий
+
+        Returns:
+            int: Количество вакансий
+        """
+        return self.size
+
+    def get_text(self, field):
+        """
+        Возвращает текстовый столбец, предварительно очищая отложенные значения LazyText
+
+        Args:
+            field (str): Название поля
+
+        Returns:
+            np.ndarray: Массив значений dtype=object
+        """
+        values = self.text[field]
+        for i, value in enumerate(values):
+            if isinstance(value, LazyText):
+                values[i] = LazyText.resolve(value)
+        return values
+
+    def take(self, indices):
         """
+        Возвращает колоночное представление, состоящее из вакансий с указанными номерами в указанном порядке
 
-        is_reversed = is_reversed == 'Да'
-        self.vacancies_objects.sort(key=self.sorting[sorting_criteria], reverse=is_reversed)
+        Args:
+            indices (np.ndarray): Номера вакансий
+
+        Returns:
+            VacancyColumns: Новое колоночное представление
+        """
+        return VacancyColumns({field: values[indices] for field, values in self.text.items()},
+                              {field: values[indices] for field, values in self.codes.items()},
+                              self.categories,
+                              {field: values[indices] for field, values in self.numbers.items()})
+
+    def vacancy(self, index):
+        """
+        Создаёт объект Vacancy для вакансии с указанным номером
+
+        Args:
+            index (int): Номер вакансии
+
+        Returns:
+            Vacancy: Вакансия
+        """
+        text = self.text
+        decoded = {field: self.categories[field][self.codes[field][index]] for field in self.categorical_fields}
+        return Vacancy(text['name'][index],
+                       text['description'][index],
+                       text['key_skills'][index],
+                       decoded['experience_id'],
+                       decoded['premium'],
+                       decoded['employer_name'],
+                       text['salary_from'][index],
+                       text['salary_to'][index],
+                       decoded['salary_gross'],
+                       decoded['salary_currency'],
+                       decoded['area_name'],
+                       text['published_at'][index])
 
     @staticmethod
-    def format_filter_criteria(filter_criteria):
+    def get_mean_salaries_in_rur(salary_from, salary_to, currency_codes, currencies):
         """
-        Возвращает словарь, содержащий название и значение параметра фильтрации
+        Векторно вычисляет средний оклад в рублях для всех вакансий с теми же округлениями, что и
+        Salary.get_salary_in_rur().get_mean_salary()
 
         Args:
-            filter_criteria (str): Критерий фильтрации - строка формата 'Название столбца: содержание ячейки'
+            salary_from (np.ndarray): Целая часть нижней границы оклада
+            salary_to (np.ndarray): Целая часть верхней границы оклада
+            currency_codes (np.ndarray): Коды валют
+            currencies (list[str]): Валюты, соответствующие кодам
+
         Returns:
-             dict: {'label': Название поля-критерия,
-                    'content': Подходящее значение поля-критерия}
+            np.ndarray: Массив средних окладов (float с целыми значениями, NaN при неизвестном курсе)
         """
-        filter_criteria = filter_criteria.split(': ')
-        return {
-            'label': filter_criteria[0] if filter_criteria[0] not in Dicts.dic_naming.keys() else Dicts.dic_naming[
-                filter_criteria[0]],
-            'content': '' if filter_criteria[0] == '' else (
-                filter_criteria[1] if filter_criteria[1] not in Dicts.dic_naming.keys() else Dicts.dic_naming[
-                    filter_criteria[1]])
-        }
+        rates = np.array([Salary.currency_to_rub.get(currency, np.nan) for currency in currencies], dtype=np.float64)
+        rate = rates[currency_codes]
+        return np.trunc((np.trunc(salary_from * rate) + np.trunc(salary_to * rate)) / 2)
 
-    def filter(self, filter_criteria):
+    def get_name_matches(self, profession):
         """
-        Фильтрует свойство vacancies_objects данного DataSet по критерию
+        Возвращает маску вакансий, в названии которых встречается профессия (без учёта регистра)
 
         Args:
-            filter_criteria (str): Критерий фильтрации - строка формата 'Название столбца: содержание ячейки'
+            profession (str): Название профессии
+
+        Returns:
+            np.ndarray: Булев массив
         """
-        filter_criteria = self.format_filter_criteria(filter_criteria)
-        filtering = {
-            '': lambda x: True,
-            'Название': lambda x: x.name == filter_criteria['content'],
-            'Описание': lambda x: x.description == filter_criteria['content'],
-            'Компания': lambda x: x.employer_name == filter_criteria['content'],
-            'Навыки': lambda x: set(filter_criteria['content'].split(', ')).issubset(x.key_skills),
-            'Опыт работы': lambda x: Dicts.dic_naming[x.experience_id] == filter_criteria['content'],
-            'Премиум-вакансия': lambda x: Dicts.dic_naming[x.premium] == filter_criteria['content'],
-            'Оклад': lambda x: int(Utils.cut_frac(x.salary.salary_from)) <= int(filter_criteria['content']) <= int(
-                Utils.cut_frac(x.salary.salary_to)),
-            'Название региона': lambda x: x.area_name == filter_criteria['content'],
-            'Дата публикации вакансии': lambda x: Utils.format_date(x.published_at)['output'] == filter_criteria[
-                'content'],
-            'Идентификатор валюты оклада': lambda x: Dicts.dic_naming[x.salary.salary_currency] == filter_criteria[
-                'content'],
-            'Оклад указан до вычета налогов': lambda x: Dicts.dic_naming[x.salary.salary_gross] == filter_criteria[
-                'content']
-        }
-        self.vacancies_objects = list(filter(filtering[filter_criteria['label']], self.vacancies_objects))
+        if profession == '':
+            return np.ones(self.size, dtype=bool)
+        profession = profession.lower()
+        return np.fromiter((profession in name.lower() for name in self.text['name']), dtype=bool, count=self.size)
 
-    def get_filtered_vacancies(self, filter_criteria):
+    def get_periods(self, granularity):
+        """
+        Возвращает период публикации каждой вакансии (см. Utils.get_period). Дни публикации вычисляются один раз
+        для каждой различной даты (категории published_date), периоды - векторно по массиву дней,
+        строки периодов создаются только для различных периодов
+
+        Args:
+            granularity (str): Размер периода: 'year', 'quarter', 'month' или 'week'
+
+        Returns:
+            np.ndarray: Массив периодов dtype=object (None для вакансий без даты публикации)
+
+        >>> columns = DataSet('sorting_test.csv', storage='columnar').columnar
+        >>> columns.get_periods('month').tolist() == [Utils.get_period(x, 'month') for x in columns.text['published_at']]
+        True
+        """
+        if granularity not in Dicts.periods:
+            raise ValueError(f'unknown granularity: {granularity}')
+        dates = self.categories['published_date']
+        days = np.array([f'{x[6:10]}-{x[3:5]}-{x[0:2]}' if x is not None else 'NaT' for x in dates],
+                        dtype='datetime64[D]')
+        missing = np.isnat(days)
+        days = np.where(missing, 0, days.astype(np.int64))
+        if granularity == 'week':
+            thursdays = days - (days + 3) % 7 + 3
+            years = thursdays.astype('datetime64[D]').astype('datetime64[Y]')
+            parts = (thursdays - years.astype('datetime64[D]').astype(np.int64)) // 7 + 1
+            years = years.astype(np.int64) + 1970
+        else:
+            months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+            years = months // 12 + 1970
+            parts = months % 12 + 1 if granularity == 'month' else (months % 12) // 3 + 1
+        formats = {'year': lambda year, part: year,
+                   'quarter': lambda year, part: f'{year}-Q{part}',
+                   'month': lambda year, part: f'{year}-{part:02}',
+                   'week': lambda year, part: f'{year}-W{part:02}'}
+        unique, inverse = np.unique(years * 100 + parts, return_inverse=True)
+        labels = self.object_array([formats[granularity](x // 100, x % 100) for x in unique.tolist()])
+        periods = labels[inverse]
+        periods[missing] = None
+        return periods[self.codes['published_date']]
+
+    def get_column(self, column):
         """
-        Возвращает отфильтрованное по критерию свойство vacancies_objects данного DataSet
+        Возвращает столбец колоночного представления для группировки и агрегирования
 
         Args:
-            filter_criteria (str): критерий сортировки - строка формата 'Название столбца: содержание ячейки'
+            column (str | Callable | np.ndarray): Название поля вакансии (для полей оклада допускается путь вида
+                'salary.mean_salary_in_rur'), функция от вакансии или уже вычисленный массив
 
         Returns:
-            list[Vacancy]: отфильтрованный список вакансий
+            tuple[np.ndarray, list | None, bool]: Массив значений (для категориальных полей - коды), список категорий
+                для кодов (None для остальных полей) и признак целочисленности значений
         """
-        filter_criteria = self.format_filter_criteria(filter_criteria)
-        filtering = {
-            '': lambda x: True,
-            'Название': lambda x: x.name == filter_criteria['content'],
-            'Описание': lambda x: x.description == filter_criteria['content'],
-            'Компания': lambda x: x.employer_name == filter_criteria['content'],
-            'Навыки': lambda x: set(filter_criteria['content'].split(', ')).issubset(x.key_skills),
-            'Опыт работы': lambda x: Dicts.dic_naming[x.experience_id] == filter_criteria['content'],
-            'Премиум-вакансия': lambda x: Dicts.dic_naming[x.premium] == filter_criteria['content'],
-            'Оклад': lambda x: int(Utils.cut_frac(x.salary.salary_from)) <= int(filter_criteria['content']) <= int(
-                Utils.cut_frac(x.salary.salary_to)),
-            'Название региона': lambda x: x.area_name == filter_criteria['content'],
-            'Дата публикации вакансии': lambda x: Utils.format_date(x.published_at)['output'] == filter_criteria[
-                'content'],
-            'Идентификатор валюты оклада': lambda x: Dicts.dic_naming[x.salary.salary_currency] == filter_criteria[
-                'content'],
-            'Оклад указан до вычета налогов': lambda x: Dicts.dic_naming[x.salary.salary_gross] == filter_criteria[
-                'content']
-        }
-        return list(filter(filtering[filter_criteria['label']], self.vacancies_objects))
+        if isinstance(column, np.ndarray):
+            return column, None, column.dtype.kind in 'biu'
+        if callable(column):
+            values = [column(self.vacancy(i)) for i in range(self.size)]
+            if any(x is not None for x in values) and all(isinstance(x, (int, float)) or x is None for x in values):
+                array = np.array([np.nan if x is None else x for x in values], dtype=np.float64)
+                return array, None, all(isinstance(x, int) or x is None for x in values)
+            return self.object_array(values), None, False
+        name = column.split('.')[-1]
+        if name in self.numbers:
+            return self.numbers[name], None, True
+        if name in self.codes:
+            return self.codes[name], self.categories[name], False
+        if name in self.text:
+            return self.get_text(name), None, False
+        raise KeyError(column)
+
+    def group_by_sets(self, groupings):
+        """
+        Векторный вариант DataSet.group_by_sets: группы нумеруются функцией first_seen_groups,
+        суммы и количества вычисляются через np.bincount, минимумы и максимумы - через np.minimum.at и np.maximum.at
+
+        Args:
+            groupings (dict[str, tuple]): Группировки в формате DataSet.group_by_sets
+
+        Returns:
+            dict[str, dict]: Результаты группировок в формате DataSet.group_by_sets
+        """
+        results = {}
+        for name, (key, aggregations) in groupings.items():
+            values, categories, _ = self.get_column(key)
+            keys, groups = self.first_seen_groups(values)
+            if categories is not None:
+                keys = [categories[x] for x in keys]
+            else:
+                keys = [int(x) if isinstance(x, float) and x.is_integer() else x for x in keys.tolist()]
+            columns = {output: DataSet.parse_aggregation(spec) for output, spec in aggregations.items()}
+            computed = {output: self.aggregate_groups(groups, len(keys), *spec) for output, spec in columns.items()}
+            results[name] = {key: {output: computed[output][i] for output in columns} for i, key in enumerate(keys)}
+        return results
+
+    def aggregate_groups(self, groups, size, operation, value, condition):
+        """
+        Вычисляет агрегат по группам
+
+        Args:
+            groups (np.ndarray): Номер группы каждой вакансии
+            size (int): Количество групп
+            operation (str): Агрегат: 'count', 'sum', 'mean', 'min', 'max' или 'sketch'
+            value (str | Callable | np.ndarray | None): Агрегируемое поле
+            condition (Callable | np.ndarray | None): Условие отбора вакансий
+
+        Returns:
+            list: Значения агрегата для каждой группы
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if condition is not None:
+            mask = condition if isinstance(condition, np.ndarray) else self.get_column(condition)[0].astype(bool)
+        if operation == 'count':
+            return np.bincount(groups[mask], minlength=size).tolist()
+        values, categories, integral = self.get_column(value)
+        if categories is not None or values.dtype == object:
+            raise ValueError(f'{value} can not be aggregated with {operation}')
+        values = values.astype(np.float64)
+        mask = mask & ~np.isnan(values)
+        groups = groups[mask]
+        values = values[mask]
+        convert = int if integral else float
+        counts = np.bincount(groups, minlength=size)
+        if operation in ('sum', 'mean'):
+            sums = np.bincount(groups, weights=values, minlength=size)
+            if operation == 'sum':
+                return [convert(x) for x in sums]
+            return [float(x) / int(count) if count else None for x, count in zip(sums, counts)]
+        if operation in ('min', 'max'):
+            extremes = np.full(size, np.inf if operation == 'min' else -np.inf)
+            (np.minimum if operation == 'min' else np.maximum).at(extremes, groups, values)
+            return [convert(x) if count else None for x, count in zip(extremes, counts)]
+        if operation == 'sketch':
+            sketches = [QuantileSketch() for _ in range(size)]
+            order = np.argsort(groups, kind='stable')
+            bounds = np.concatenate(([0], np.cumsum(counts)))
+            sorted_values = values[order].astype(np.int64) if integral else values[order]
+            for i, sketch in enumerate(sketches):
+                sketch.extend(sorted_values[bounds[i]:bounds[i + 1]].tolist())
+            return sketches
+        raise ValueError(f'unknown aggregation: {operation}')
+
+    @staticmethod
+    def first_seen_groups(values):
+        """
+        Группирует значения массива, нумеруя группы в порядке первого появления значения. Массивы объектов
+        группируются через словарь, поэтому значения могут быть несравнимыми (например, строки и None)
+
+        Args:
+            values (np.ndarray): Значения признака группировки
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Значения групп в порядке появления и номер группы каждого элемента
+
+        >>> keys, groups = VacancyColumns.first_seen_groups(np.array([2022, 2007, 2022, 2010]))
+        >>> keys.tolist(), groups.tolist()
+        ([2022, 2007, 2010], [0, 1, 0, 2])
+        """
+        if values.dtype == object:
+            index = {}
+            groups = np.fromiter((index.setdefault(x, len(index)) for x in values), dtype=np.int64, count=len(values))
+            return VacancyColumns.object_array(list(index)), groups
+        keys, first_index, inverse = np.unique(values, return_index=True, return_inverse=True)
+        order = np.argsort(first_index, kind='stable')
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        return keys[order], ranks[inverse.reshape(-1)]
+
+
+class VacancyColumnsView:
+    """
+    Последовательность вакансий колоночного представления: объекты Vacancy создаются при обращении к элементу
+
+    Attributes:
+        columns (VacancyColumns): Колоночное представление
+    """
+    def __init__(self, columns):
+        """
+        Инициализация объекта
+
+        Args:
+            columns (VacancyColumns): Колоночное представление
+        """
+        self.columns = columns
+
+    def __len__(self):
+        """
+        Возвращает количество вакансий
+
+        Returns:
+            int: Количество вакансий
+        """
+        return len(self.columns)
+
+    def __getitem__(self, index):
+        """
+        Возвращает вакансию или список вакансий среза
+
+        Args:
+            index (int | slice): Номер вакансии или срез
+
+        Returns:
+            Vacancy | list[Vacancy]: Вакансия или список вакансий
+        """
+        if isinstance(index, slice):
+            return [self.columns.vacancy(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('index out of range')
+        return self.columns.vacancy(index)
+
+    def __iter__(self):
+        """
+        Возвращает итератор по вакансиям
+
+        Returns:
+            Iterator[Vacancy]: Генератор вакансий
+        """
+        return (self.columns.vacancy(i) for i in range(len(self)))
+
+
+class VacancyPermutation:
+    """
+    Последовательность вакансий в порядке перестановки (например, отсортированная) без копирования
+    и без изменения исходной последовательности
+
+    Attributes:
+        vacancies (list[Vacancy] | VacancyColumnsView | VacancyRows): Исходная последовательность с произвольным
+            доступом
+        order (np.ndarray): Номера вакансий исходной последовательности в порядке перестановки
+    """
+    def __init__(self, vacancies, order):
+        """
+        Инициализация объекта
+
+        Args:
+            vacancies (list[Vacancy] | VacancyColumnsView | VacancyRows): Исходная последовательность
+            order (np.ndarray): Перестановка номеров вакансий
+        """
+        self.vacancies = vacancies
+        self.order = order
+
+    def __len__(self):
+        """
+        Возвращает количество вакансий
+
+        Returns:
+            int: Количество вакансий
+        """
+        return len(self.order)
+
+    def __getitem__(self, index):
+        """
+        Возвращает вакансию или список вакансий среза
+
+        Args:
+            index (int | slice): Номер вакансии в порядке перестановки или срез
+
+        Returns:
+            Vacancy | list[Vacancy]: Вакансия или список вакансий
+        """
+        if isinstance(index, slice):
+            return [self.vacancies[i] for i in self.order[index].tolist()]
+        return self.vacancies[int(self.order[index])]
+
+    def __iter__(self):
+        """
+        Возвращает итератор по вакансиям
+
+        Returns:
+            Iterator[Vacancy]: Генератор вакансий
+        """
+        return (self.vacancies[i] for i in self.order.tolist())
+
+
+class VacancyRows:
+    """
+    Последовательность вакансий csv-файла с произвольным доступом по индексу записей RowIndex:
+    при обращении к элементу или срезу разбираются только нужные записи файла
+
+    Attributes:
+        file_name (str): имя csv-файла
+        row_index (RowIndex): индекс корректных записей файла
+        columns (list[str] | None): названия загружаемых столбцов
+    """
+    def __init__(self, file_name, row_index, columns=None):
+        """
+        Инициализация объекта
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            row_index (RowIndex): Индекс корректных записей файла
+            columns (list[str] | None): Названия загружаемых столбцов, None - все столбцы
+        """
+        self.file_name = file_name
+        self.row_index = row_index
+        self.columns = columns
+
+    def __len__(self):
+        """
+        Возвращает количество вакансий
+
+        Returns:
+            int: Количество вакансий
+        """
+        return len(self.row_index)
+
+    def read(self, first, last):
+        """
+        Разбирает вакансии с номерами из диапазона [first, last)
+
+        Args:
+            first (int): Номер первой вакансии
+            last (int): Номер вакансии, следующей за последней
+
+        Returns:
+            list[Vacancy]: Вакансии диапазона
+        """
+        rows = self.row_index.read_rows(self.file_name, first, last)
+        return list(DataSet.parse_rows(self.row_index.labels, rows, self.columns))
+
+    def __getitem__(self, index):
+        """
+        Возвращает вакансию или список вакансий среза
+
+        Args:
+            index (int | slice): Номер вакансии или срез
+
+        Returns:
+            Vacancy | list[Vacancy]: Вакансия или список вакансий
+        """
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+            if len(indices) == 0:
+                return []
+            first, last = min(indices[0], indices[-1]), max(indices[0], indices[-1]) + 1
+            vacancies = self.read(first, last)
+            return [vacancies[i - first] for i in indices]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('index out of range')
+        return self.read(index, index + 1)[0]
+
+    def __iter__(self):
+        """
+        Возвращает итератор по вакансиям. Файл читается последовательно одним проходом
+
+        Returns:
+            Iterator[Vacancy]: Генератор вакансий
+        """
+        return DataSet.parse_rows(self.row_index.labels, self.row_index.read_rows(self.file_name, 0, len(self)),
+                                  self.columns)
+
+
+class VacancyStream:
+    """
+    Повторно итерируемый ленивый поток вакансий csv-файла. Каждый проход заново читает файл,
+    поэтому в памяти одновременно находится только текущая вакансия
+
+    Attributes:
+        file_name (str): имя csv-файла
+        workers (int): число процессов для разбора файла
+        columns (list[str] | None): названия загружаемых столбцов
+    """
+    def __init__(self, file_name, workers=1, columns=None):
+        """
+        Инициализация объекта
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            workers (int): Число процессов для разбора файла
+            columns (list[str] | None): Названия загружаемых столбцов, None - все столбцы
+        """
+        self.file_name = file_name
+        self.workers = workers
+        self.columns = columns
+        self._length = None
+
+    def __iter__(self):
+        """
+        Возвращает новый проход по вакансиям файла
+
+        Returns:
+            Iterator[Vacancy]: Генератор вакансий
+        """
+        return DataSet.iter_vacancies(self.file_name, self.workers, self.columns)
+
+    def __len__(self):
+        """
+        Возвращает количество вакансий в файле. Подсчёт выполняется один раз отдельным проходом
+
+        Returns:
+            int: Количество вакансий
+        """
+        if self._length is None:
+            self._length = sum(1 for _ in self)
+        return self._length
+
+
+class FilterQuery:
+    """
+    Составной запрос фильтрации: критерии 'Название столбца: содержание ячейки', объединённые операторами
+    AND, OR и NOT (приоритет NOT > AND > OR, скобки не поддерживаются). Операторы записываются заглавными
+    буквами и отделяются пробелами: 'Название региона: Москва AND NOT Опыт работы: Нет опыта OR Оклад: 100000'
+
+    Запрос разбирается один раз в дизъюнкцию групп критериев, для каждого критерия один раз строится
+    функция проверки вакансии. Критерии группы упорядочены по стоимости проверки, чтобы дорогие проверки
+    выполнялись только для вакансий, прошедших дешёвые. Из функций критериев один раз собирается функция
+    проверки всего запроса
+
+    Attributes:
+        query (str): Текст запроса
+        groups (list[list[dict]]): Группы критериев, объединённые OR. Критерий - словарь {'label': название
+            поля, 'content': значение, 'negated': признак NOT, 'predicate': функция проверки вакансии без учёта NOT}
+        matches (func): Функция, принимающая вакансию и возвращающая True, если вакансия удовлетворяет запросу
+    """
+    costs = {'': 0, 'Опыт работы': 1, 'Премиум-вакансия': 1, 'Идентификатор валюты оклада': 1,
+             'Оклад указан до вычета налогов': 1, 'Компания': 1, 'Название региона': 1,
+             'Дата публикации вакансии': 1, 'Оклад': 2, 'Название': 3, 'Описание': 3, 'Навыки': 4}
+    equal_fields = {'Название': 'name', 'Описание': 'description', 'Компания': 'employer_name',
+                    'Название региона': 'area_name', 'Дата публикации вакансии': 'published_date'}
+    named_fields = {'Опыт работы': 'experience_id', 'Премиум-вакансия': 'premium',
+                    'Идентификатор валюты оклада': 'salary.salary_currency',
+                    'Оклад указан до вычета налогов': 'salary.salary_gross'}
+
+    def __init__(self, query):
+        """
+        Инициализация объекта, разбор запроса и построение функций проверки
+
+        Args:
+            query (str): Текст запроса. Пустая строка соответствует всем вакансиям
+        """
+        self.query = query
+        self.groups = []
+        for group in self.parse(query):
+            clauses = []
+            for criterion, negated in group:
+                clause = DataSet.format_filter_criteria(criterion)
+                clause['negated'] = negated
+                clause['predicate'] = self.get_predicate(clause['label'], clause['content'])
+                clauses.append(clause)
+            self.groups.append(sorted(clauses, key=lambda x: self.costs[x['label']]))
+        self.matches = self.get_matcher(self.groups)
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def compile(query):
+        """
+        Возвращает разобранный запрос, разбирая каждый текст запроса один раз
+
+        Args:
+            query (str): Текст запроса
+
+        Returns:
+            FilterQuery: Запрос
+        """
+        return FilterQuery(query)
+
+    @staticmethod
+    def parse(query):
+        """
+        Разбивает текст запроса на группы критериев. Оператор AND или OR разделяет критерии, только если
+        за ним (и за возможными NOT) следует название поля - слова без операторов - и ': ', поэтому значения,
+        содержащие эти слова (например, названия компаний), остаются частью критерия. Названия полей здесь
+        не проверяются: неизвестное поле приводит к KeyError при построении функции проверки
+
+        Args:
+            query (str): Текст запроса
+
+        Returns:
+            list[list[tuple[str, bool]]]: Группы, объединённые OR, из критериев, объединённых AND,
+                с признаком отрицания
+
+        >>> FilterQuery.parse('Премиум-вакансия: Да AND NOT Оклад: 100 OR Навыки: Git')
+        [[('Премиум-вакансия: Да', False), ('Оклад: 100', True)], [('Навыки: Git', False)]]
+        >>> FilterQuery.parse('Компания: ROGA AND KOPYTA OR Навыки: Git')
+        [[('Компания: ROGA AND KOPYTA', False)], [('Навыки: Git', False)]]
+        >>> FilterQuery.parse('Название региона: Москва AND Зарплата: 100')
+        [[('Название региона: Москва', False), ('Зарплата: 100', False)]]
+        """
+        word = r'(?!(?:AND|OR|NOT)\b)[\w-]+'
+        field = r'(?=(?:NOT\s+)*{0}(?: {0})*: )'.format(word)
+        groups = []
+        for group in re.split(r'\s+OR\s+' + field, query):
+            criteria = []
+            for criterion in re.split(r'\s+AND\s+' + field, group):
+                negated = False
+                while criterion.startswith('NOT '):
+                    negated = not negated
+                    criterion = criterion[4:].lstrip()
+                criteria.append((criterion, negated))
+            groups.append(criteria)
+        return groups
+
+    @staticmethod
+    def get_predicate(label, content):
+        """
+        Строит функцию проверки вакансии по одному критерию
+
+        Args:
+            label (str): Название поля
+            content (str): Значение поля (для оклада - значение или диапазон 'от - до')
+
+        Returns:
+            func: Функция, принимающая вакансию и возвращающая bool
+        """
+        if label == '':
+            return lambda x: True
+        if label in FilterQuery.equal_fields:
+            get = operator.attrgetter(FilterQuery.equal_fields[label])
+            return lambda x: get(x) == content
+        if label in FilterQuery.named_fields:
+            get = operator.attrgetter(FilterQuery.named_fields[label])
+            values = {key for key, name in Dicts.dic_naming.items() if name == content}
+            return lambda x: get(x) in values
+        if label == 'Навыки':
+            skills = set(content.split(', '))
+            return lambda x: skills.issubset(x.key_skills)
+        if label == 'Оклад':
+            low, high = DataSet.parse_salary_range(content)
+            return lambda x: max(x.salary.salary_from_value, low) <= min(x.salary.salary_to_value, high)
+        raise KeyError(label)
+
+    @staticmethod
+    def get_matcher(groups):
+        """
+        Собирает функцию проверки запроса из функций критериев. Запрос из одного критерия без NOT проверяется
+        функцией критерия напрямую, поэтому при проверке вакансии не выполняются обращения к словарям критериев
+        и обходы групп
+
+        Args:
+            groups (list[list[dict]]): Группы критериев в формате FilterQuery.groups
+
+        Returns:
+            func: Функция, принимающая вакансию и возвращающая bool
+        """
+        def negate(predicate):
+            """
+            Возвращает отрицание функции проверки
+
+            Args:
+                predicate (func): Функция проверки вакансии
+
+            Returns:
+                func: Функция проверки вакансии
+            """
+            return lambda x: not predicate(x)
+
+        def both(first, second):
+            """
+            Возвращает конъюнкцию функций проверки, вторая функция вызывается, только если выполнена первая
+
+            Args:
+                first (func): Первая функция проверки
+                second (func): Вторая функция проверки
+
+            Returns:
+                func: Функция проверки вакансии
+            """
+            return lambda x: first(x) and second(x)
+
+        def either(first, second):
+            """
+            Возвращает дизъюнкцию функций проверки, вторая функция вызывается, только если не выполнена первая
+
+            Args:
+                first (func): Первая функция проверки
+                second (func): Вторая функция проверки
+
+            Returns:
+                func: Функция проверки вакансии
+            """
+            return lambda x: first(x) or second(x)
+
+        return reduce(either, [reduce(both, [negate(x['predicate']) if x['negated'] else x['predicate'] for x in group])
+                               for group in groups])
+
+
+class DataSet:
+    """
+    Класс, содержащий имя файла-списка вакансий, а также список объектов класса Vacancy, сформированный из данных файла
+
+    Attributes:
+        file_name (str): имя csv-файла
+        vacancies_objects (list[Vacancy] | VacancyStream | VacancyColumnsView | VacancyRows): список объектов
+            класса Vacancy, поток вакансий, последовательность вакансий колоночного представления или
+            последовательность с произвольным доступом к записям файла
+        columnar (VacancyColumns | None): колоночное представление вакансий (только для storage='columnar')
+        name_index (TrigramIndex | None): триграммный индекс названий, строится методом get_name_index
+        indexes (dict[str, HashIndex | IntervalIndex]): индексы полей для фильтрации (для вилки оклада - индекс
+            интервалов), строятся методом get_index
+        sort_keys (dict[str, np.ndarray]): ранги ключей сортировки по критериям, вычисляются методом get_sort_keys
+        sort_orders (dict[tuple, np.ndarray]): перестановки сортировки по критериям и направлениям,
+            вычисляются методом get_sort_order
+        cache (DataSetCache | None): кэш разобранных файлов
+        reordered (bool): изменялся ли порядок или состав вакансий после загрузки (сортировкой или фильтрацией)
+    """
+    sorting = {
+        'Название': lambda x: x.name,
+        'Описание': lambda x: x.description,
+        'Компания': lambda x: x.employer_name,
+        'Навыки': lambda x: len(x.key_skills),
+        'Опыт работы': lambda x: Dicts.experience_in_numbers[x.experience_id],
+        'Премиум-вакансия': lambda x: x.premium,
+        'Оклад': lambda x: x.salary.mean_salary_in_rur,
+        'Название региона': lambda x: x.area_name,
+        'Дата публикации вакансии': lambda x: x.published_timestamp,
+        'Идентификатор валюты оклада': lambda x: x.salary.salary_currency,
+        'Оклад указан до вычета налогов': lambda x: x.salary.salary_gross
+    }
+    indexed_fields = {
+        'Компания': 'employer_name',
+        'Навыки': 'key_skills',
+        'Опыт работы': 'experience_id',
+        'Премиум-вакансия': 'premium',
+        'Оклад': 'salary',
+        'Название региона': 'area_name',
+        'Дата публикации вакансии': 'published_date',
+        'Идентификатор валюты оклада': 'salary_currency',
+        'Оклад указан до вычета налогов': 'salary_gross'
+    }
+    named_fields = ['Опыт работы', 'Премиум-вакансия', 'Идентификатор валюты оклада', 'Оклад указан до вычета налогов']
+
+    def __init__(self, file_name, streaming=False, workers=1, storage='objects', cache_dir=None, columns=None,
+                 byte_range=None):
+        """
+        Инициализирует объект, составляя список объектов Vacancy со свойствами, соответствующими значениям строк файла
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            streaming (bool): При значении True вакансии не загружаются в память целиком: vacancies_objects - поток
+                VacancyStream, который при каждом проходе заново читает файл
+            workers (int): Число процессов для разбора файла. При значении больше 1 файл делится на части
+                по границам записей, части разбираются параллельно и объединяются в исходном порядке
+            storage (str): Способ хранения: 'objects' - список объектов Vacancy, 'columnar' - массивы NumPy
+                (VacancyColumns), для которых сортировка, фильтрация и статистика вычисляются векторно,
+                'indexed' - последовательность VacancyRows: строится только индекс записей файла, вакансии
+                разбираются при обращении к ним
+            cache_dir (str | None): Каталог кэша разобранных файлов. Если указан, результат разбора сохраняется
+                на диск и при следующем открытии неизменённого файла загружается из кэша без разбора
+                (для storage='indexed' сохраняется индекс записей)
+            columns (list[str] | None): Проекция - названия загружаемых столбцов файла. Остальные столбцы
+                не очищаются и не хранятся, соответствующие поля вакансий равны None. При None загружаются все столбцы
+            byte_range (tuple[int, int] | None): Байтовый диапазон файла, выровненный по границам записей
+                (см. CsvReader.split). Если указан, загружаются только записи диапазона, кэш не используется
+
+        >>> type(DataSet('v.csv')).__name__
+        'DataSet'
+        >>> DataSet('v.csv').file_name
+        'v.csv'
+        >>> type(DataSet('v.csv').vacancies_objects).__name__
+        'list'
+        >>> type(DataSet('v.csv').vacancies_objects[0]).__name__
+        'Vacancy'
+        >>> type(DataSet('v.csv').vacancies_objects[0].key_skills).__name__
+        'list'
+        >>> DataSet('v.csv').vacancies_objects[0].key_skills
+        ['Организаторские навыки', 'Проведение презентаций', 'MS PowerPoint', 'Информационные технологии', 'Аналитическое мышление', 'Автоматизированное рабочее место (АРМ)', 'техническая грамотность']
+        >>> type(DataSet('test_partial.csv').vacancies_objects[0].key_skills).__name__
+        'NoneType'
+        >>> type(DataSet('test_partial.csv').vacancies_objects[0].description).__name__
+        'NoneType'
+        >>> type(DataSet('test_partial.csv').vacancies_objects[0].experience_id).__name__
+        'NoneType'
+        >>> type(DataSet('test_partial.csv').vacancies_objects[0].premium).__name__
+        'NoneType'
+        >>> type(DataSet('test_partial.csv').vacancies_objects[0].employer_name).__name__
+        'NoneType'
+        >>> type(DataSet('test_partial.csv').vacancies_objects[0].salary.salary_gross).__name__
+        'NoneType'
+        >>> type(DataSet('sorting_test.csv', streaming=True).vacancies_objects).__name__
+        'VacancyStream'
+        >>> DataSet('sorting_test.csv', streaming=True).length()
+        5
+        >>> type(DataSet('sorting_test.csv', storage='columnar').vacancies_objects).__name__
+        'VacancyColumnsView'
+        >>> type(DataSet('sorting_test.csv', columns=['name', 'area_name']).vacancies_objects[0].description).__name__
+        'NoneType'
+        >>> DataSet('sorting_test.csv', storage='indexed').vacancies_objects[3:5][1].name
+        'Information Security Policy Specialist (Methodology)'
+        >>> [DataSet('sorting_test.csv', byte_range=x).length() for x in CsvReader.split('sorting_test.csv', 2)]
+        [2, 3]
+        """
+        if storage not in ('objects', 'columnar', 'indexed'):
+            raise ValueError(f'unknown storage: {storage}')
+        if streaming and storage != 'objects':
+            raise ValueError(f'{storage} storage can not be streamed')
+        if byte_range is not None and (streaming or storage == 'indexed'):
+            raise ValueError('byte range can be loaded only into objects or columnar storage')
+        self.file_name = file_name
+        self.columnar = None
+        self.name_index = None
+        self.indexes = {}
+        self.sort_keys = {}
+        self.sort_orders = {}
+        self.cache = DataSetCache(cache_dir) if cache_dir is not None and byte_range is None else None
+        self.reordered = False
+        if streaming:
+            self.vacancies_objects = VacancyStream(file_name, workers, columns)
+            return
+        if storage == 'indexed':
+            self.vacancies_objects = VacancyRows(file_name, self.get_row_index(file_name, cache_dir), columns)
+            return
+        cache = self.cache
+        variant = storage if columns is None else f'{storage}:{",".join(sorted(columns))}'
+        loaded = cache.load(file_name, variant) if cache is not None else None
+        if loaded is None:
+            if byte_range is None:
+                vacancies = self.iter_vacancies(file_name, workers, columns)
+            else:
+                vacancies = self.parse_rows(CsvReader.read_header(file_name), CsvReader.read_rows(file_name, *byte_range),
+                                            columns)
+            loaded = VacancyColumns.from_vacancies(vacancies) if storage == 'columnar' else list(vacancies)
+            if cache is not None:
+                cache.save(file_name, variant, loaded)
+        if storage == 'columnar':
+            self.set_columnar(loaded)
+        else:
+            self.vacancies_objects = loaded
+
+    def set_columnar(self, columnar):
+        """
+        Заменяет колоночное представление вакансий и соответствующую ему последовательность vacancies_objects
+
+        Args:
+            columnar (VacancyColumns): Колоночное представление
+        """
+        self.columnar = columnar
+        self.vacancies_objects = VacancyColumnsView(columnar)
+
+    def get_name_index(self):
+        """
+        Возвращает триграммный индекс названий вакансий, строя его при первом обращении. Пока порядок вакансий
+        совпадает с порядком в файле, индекс сохраняется в кэше (если он задан) и загружается из него
+        при следующих открытиях неизменённого файла. Сортировка и фильтрация сбрасывают индекс
+
+        Returns:
+            TrigramIndex: Индекс названий
+
+        >>> DataSet('sorting_test.csv').get_name_index().find('html').tolist()
+        [2, 3]
+        """
+        if self.name_index is None:
+            persistent = self.cache is not None and not self.reordered
+            if persistent:
+                self.name_index = self.cache.load(self.file_name, 'name_index')
+            if self.name_index is None:
+                names = self.columnar.get_text('name') if self.columnar is not None else \
+                    (x.name for x in self.vacancies_objects)
+                self.name_index = TrigramIndex(names)
+                if persistent:
+                    self.cache.save(self.file_name, 'name_index', self.name_index)
+        return self.name_index
+
+    def get_index(self, field):
+        """
+        Возвращает индекс поля вакансий, строя его при первом обращении. Для категориальных полей
+        колоночного представления индекс строится по кодам, для навыков - инвертированный индекс
+        'навык - вакансии', для вилки оклада ('salary') - индекс интервалов. Сортировка и фильтрация
+        сбрасывают индексы
+
+        Args:
+            field (str): Поле из DataSet.indexed_fields
+
+        Returns:
+            HashIndex | IntervalIndex: Индекс
+
+        >>> DataSet('sorting_test.csv').get_index('key_skills').find_all(['HTML5', 'CSS3']).tolist()
+        [2, 3]
+        """
+        if field not in self.indexes:
+            if field == 'salary' and self.columnar is not None:
+                index = IntervalIndex(self.columnar.salary_from, self.columnar.salary_to)
+            elif field == 'salary':
+                index = IntervalIndex([x.salary.salary_from_value for x in self.vacancies_objects],
+                                      [x.salary.salary_to_value for x in self.vacancies_objects])
+            elif self.columnar is None:
+                get = operator.attrgetter(f'salary.{field}' if field in ('salary_currency', 'salary_gross') else field)
+                index = HashIndex.from_values((get(x) for x in self.vacancies_objects), multi=field == 'key_skills')
+            elif field == 'key_skills':
+                index = HashIndex.from_values(self.columnar.text['key_skills'], multi=True)
+            else:
+                index = HashIndex.from_codes(self.columnar.codes[field], self.columnar.categories[field])
+            self.indexes[field] = index
+        return self.indexes[field]
+
+    def find_indexed(self, filter_criteria):
+        """
+        Находит вакансии, удовлетворяющие критерию фильтрации, по индексу поля: равенство значения - поиск
+        в хэш-индексе, критерий по навыкам - пересечение списков вакансий всех навыков, критерий по окладу -
+        поиск вилок, содержащих значение или пересекающихся с диапазоном
+
+        Args:
+            filter_criteria (dict): Критерий фильтрации - результат format_filter_criteria
+
+        Returns:
+            np.ndarray | None: Номера вакансий в исходном порядке или None, если для критерия или способа
+                хранения индекс не применяется (поток вакансий и VacancyRows просматриваются целиком)
+        """
+        label = filter_criteria['label']
+        content = filter_criteria['content']
+        if label not in self.indexed_fields or (self.columnar is None and not isinstance(self.vacancies_objects, list)):
+            return None
+        index = self.get_index(self.indexed_fields[label])
+        if label == 'Навыки':
+            return index.find_all(content.split(', '))
+        if label == 'Оклад':
+            return index.find_overlapping(*self.parse_salary_range(content))
+        if label in self.named_fields:
+            return index.find_any(x for x in index.postings if Dicts.dic_naming.get(x) == content)
+        return index.find(content)
+
+    @staticmethod
+    def parse_salary_range(content):
+        """
+        Разбирает содержание критерия фильтрации по окладу: одно значение или диапазон 'от - до'
+
+        Args:
+            content (str): Значение оклада или диапазон
+
+        Returns:
+            tuple[int, int]: Границы диапазона (для одного значения границы совпадают)
+
+        >>> DataSet.parse_salary_range('50000')
+        (50000, 50000)
+        >>> DataSet.parse_salary_range('50000 - 80000')
+        (50000, 80000)
+        """
+        bounds = content.split('-')
+        if len(bounds) > 2:
+            raise ValueError(f'Некорректный диапазон оклада: {content}')
+        return int(bounds[0]), int(bounds[-1])
+
+    def reset_indexes(self):
+        """Сбрасывает индексы, ключи и перестановки сортировки после изменения порядка или состава вакансий"""
+        self.name_index = None
+        self.indexes = {}
+        self.sort_keys = {}
+        self.sort_orders = {}
+        self.reordered = True
+
+    @staticmethod
+    def get_row_index(file_name, cache_dir=None):
+        """
+        Возвращает индекс корректных записей файла. Индекс строится одним проходом: границы записей находятся
+        по байтам файла, записи проверяются так же, как в parse_rows. Если указан каталог кэша, индекс
+        сохраняется и при следующем открытии неизменённого файла загружается без чтения записей
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            cache_dir (str | None): Каталог кэша
+
+        Returns:
+            RowIndex: Индекс записей, из которых создаются вакансии
+
+        >>> len(DataSet.get_row_index('test_partial.csv')) == DataSet('test_partial.csv').length()
+        True
+        """
+        cache = DataSetCache(cache_dir) if cache_dir is not None else None
+        row_index = cache.load(file_name, 'row_index') if cache is not None else None
+        if row_index is None:
+            labels = CsvReader.read_header(file_name)
+            starts, ends = CsvReader.get_record_bounds(file_name)
+            rows = RowIndex(labels, starts, ends).read_rows(file_name, 0, len(starts))
+            valid = np.fromiter((all(row) and len(labels) == len(row) for row in rows), dtype=bool, count=len(starts))
+            row_index = RowIndex(labels, starts[valid], ends[valid])
+            if cache is not None:
+                cache.save(file_name, 'row_index', row_index)
+        return row_index
+
+    @staticmethod
+    def iter_vacancies(file_name, workers=1, columns=None):
+        """
+        Лениво читает csv-файл, возвращая объекты Vacancy по одному: чтение, проверка, очистка и создание объекта
+        выполняются для каждой строки сразу, промежуточные списки строк не создаются
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            workers (int): Число процессов для разбора файла
+            columns (list[str] | None): Названия загружаемых столбцов, None - все столбцы
+
+        Yields:
+            Vacancy: Вакансия, соответствующая очередной корректной строке файла
+
+        >>> [x.name for x in DataSet.iter_vacancies('sorting_test.csv')][:2]
+        ['Руководитель проекта по системам связи и информационным технологиям', 'Senior Python Developer (Crypto)']
+        """
+        if workers > 1:
+            yield from DataSet.iter_vacancies_parallel(file_name, workers, columns)
+            return
+        with open(file_name, encoding='utf-8-sig') as data:
+            reader = csv.reader(data, delimiter=',')
+            labels = next(reader, [])
+            yield from DataSet.parse_rows(labels, reader, columns)
+
+    @staticmethod
+    def iter_vacancies_parallel(file_name, workers, columns=None):
+        """
+        Разбирает файл в пуле процессов: файл делится на байтовые диапазоны по границам записей
+        (с учётом многострочных полей в кавычках), результаты возвращаются в исходном порядке
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            workers (int): Число процессов
+            columns (list[str] | None): Названия загружаемых столбцов, None - все столбцы
+
+        Yields:
+            Vacancy: Вакансия, соответствующая очередной корректной строке файла
+        """
+        labels = CsvReader.read_header(file_name)
+        tasks = [(file_name, labels, columns, start, end) for start, end in CsvReader.split(file_name, workers * 4)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for vacancies in executor.map(DataSet.parse_chunk, tasks):
+                yield from vacancies
+
+    @staticmethod
+    def parse_chunk(task):
+        """
+        Разбирает байтовый диапазон файла в список вакансий. Выполняется в процессе пула
+
+        Args:
+            task (tuple[str, list[str], list[str] | None, int, int]): Путь к файлу, заголовки столбцов,
+                загружаемые столбцы, начало и конец диапазона
+
+        Returns:
+            list[Vacancy]: Вакансии диапазона
+        """
+        file_name, labels, columns, start, end = task
+        return list(DataSet.parse_rows(labels, CsvReader.read_rows(file_name, start, end), columns))
+
+    @staticmethod
+    def parse_rows(labels, rows, columns=None):
+        """
+        Проверяет и очищает строки csv-файла, создавая по ним вакансии. Проверка выполняется по всем столбцам,
+        очищаются только загружаемые; поля из Dicts.lazy_fields сохраняются как LazyText и очищаются при чтении
+
+        Args:
+            labels (list[str]): Заголовки столбцов
+            rows (Iterable[list[str]]): Строки файла без заголовков
+            columns (list[str] | None): Названия загружаемых столбцов, None - все столбцы
+
+        Yields:
+            Vacancy: Вакансия, соответствующая очередной корректной строке
+        """
+        kept = [i for i, label in enumerate(labels) if columns is None or label in columns]
+        kept_labels = [labels[i] for i in kept]
+        cleaners = [LazyText if label in Dicts.lazy_fields else clean
+                    for label, clean in zip(kept_labels, Utils.get_cleaners(kept_labels))]
+        for row in rows:
+            if all(row) and len(labels) == len(row):
+                yield DataSet.make_vacancy(kept_labels, [clean(row[i]) for i, clean in zip(kept, cleaners)])
+
+    @staticmethod
+    def make_vacancy(labels, row):
+        """
+        Создаёт объект Vacancy из очищенной строки csv-файла
+
+        Args:
+            labels (list[str]): Заголовки столбцов
+            row (list[str | LazyText]): Очищенные значения ячеек строки
+
+        Returns:
+            Vacancy: Вакансия. Поля, для которых нет столбца в файле, равны None
+        """
+        vacancy = dict(zip(labels, row))
+        return Vacancy(vacancy.get('name'),
+                       vacancy.get('description'),
+                       None if 'key_skills' not in vacancy else vacancy['key_skills'].split('!crutch!!'),
+                       vacancy.get('experience_id'),
+                       vacancy.get('premium'),
+                       vacancy.get('employer_name'),
+                       vacancy.get('salary_from'),
+                       vacancy.get('salary_to'),
+                       vacancy.get('salary_gross'),
+                       vacancy.get('salary_currency'),
+                       vacancy.get('area_name'),
+                       vacancy.get('published_at'))
+
+    def group_by(self, key, aggregations):
+        """
+        Группирует вакансии по ключу и вычисляет агрегаты для каждой группы за один проход.
+        Группы хранятся в словаре (в колоночном представлении - нумеруются массивом), поэтому время работы
+        линейно по числу вакансий; ключи групп следуют в порядке первого появления
+
+        Args:
+            key (str | Callable): Название поля вакансии (поля оклада - через 'salary.', например
+                'salary.salary_currency') или функция от вакансии
+            aggregations (dict[str, tuple]): Пары 'название результата - (агрегат, поле)' или
+                'название результата - (агрегат, поле, условие)'. Агрегаты: 'count', 'sum', 'mean', 'min', 'max',
+                'sketch' (QuantileSketch значений поля); поле задаётся так же, как ключ (для 'count' - None); условие - функция от вакансии, вакансии,
+                для которых она ложна, не учитываются в агрегате. Значения None пропускаются
+
+        Returns:
+            dict[Any, dict[str, Any]]: Словарь 'ключ - {название результата: значение}'. Среднее, минимум и максимум
+                пустой группы равны None
+
+        >>> data = DataSet('sorting_test.csv')
+        >>> data.group_by('salary.salary_currency', {'count': ('count', None), 'max': ('max', 'published_year')})
+        {'RUR': {'count': 2, 'max': 2022}, 'EUR': {'count': 2, 'max': 2022}, 'BYR': {'count': 1, 'max': 2022}}
+        """
+        return self.group_by_sets({None: (key, aggregations)})[None]
+
+    def group_by_sets(self, groupings):
+        """
+        Выполняет несколько группировок за один проход по вакансиям
+
+        Args:
+            groupings (dict[str, tuple]): Пары 'название группировки - (ключ, агрегаты)' в формате group_by.
+                Ключ, поле и условие могут быть также массивами NumPy, значения которых соответствуют вакансиям
+
+        Returns:
+            dict[str, dict]: Результаты group_by для каждой группировки
+        """
+        if self.columnar is not None:
+            return self.columnar.group_by_sets(groupings)
+        return self.group_vacancies(self.vacancies_objects, groupings)
+
+    @staticmethod
+    def parse_aggregation(spec):
+        """
+        Приводит описание агрегата к виду (агрегат, поле, условие)
+
+        Args:
+            spec (tuple): (агрегат, поле) или (агрегат, поле, условие)
+
+        Returns:
+            tuple: (агрегат, поле, условие или None)
+        """
+        operation, value, condition = spec if len(spec) == 3 else (*spec, None)
+        if operation not in ('count', 'sum', 'mean', 'min', 'max', 'sketch'):
+            raise ValueError(f'unknown aggregation: {operation}')
+        if operation != 'count' and value is None:
+            raise ValueError(f'{operation} requires a value')
+        return operation, value, condition
+
+    @staticmethod
+    def group_vacancies(vacancies, groupings):
+        """
+        Выполняет группировки group_by_sets для последовательности объектов Vacancy. Каждое поле и условие
+        вычисляется один раз для вакансии, даже если используется в нескольких агрегатах. Поля и условия могут
+        быть и массивами NumPy, значения которых соответствуют вакансиям по порядку
+
+        Args:
+            vacancies (Iterable[Vacancy]): Вакансии
+            groupings (dict[str, tuple]): Группировки в формате group_by_sets
+
+        Returns:
+            dict[str, dict]: Результаты группировок
+        """
+        columns = []
+        indices = {}
+
+        def get_index(column):
+            """
+            Регистрирует поле или условие и возвращает его номер. Одинаковые поля получают один номер,
+            поэтому вычисляются для вакансии один раз
+
+            Args:
+                column (str | func | np.ndarray | None): Поле, функция или массив значений
+
+            Returns:
+                int | None: Номер поля в списке columns или None, если поле не задано
+            """
+            if column is None:
+                return None
+            key = id(column) if isinstance(column, np.ndarray) else column
+            if key not in indices:
+                indices[key] = len(columns)
+                columns.append(column)
+            return indices[key]
+
+        plans = []
+        for name, (key, aggregations) in groupings.items():
+            operations = []
+            for output, spec in aggregations.items():
+                operation, value, condition = DataSet.parse_aggregation(spec)
+                operations.append((output, operation, get_index(value), get_index(condition)))
+            plans.append((name, get_index(key), operations, {}))
+        arrays = [(i, column.tolist()) for i, column in enumerate(columns) if isinstance(column, np.ndarray)]
+        getters = [(lambda x: None) if isinstance(column, np.ndarray) else column if callable(column)
+                   else operator.attrgetter(column) for column in columns]
+        initial = {'count': 0, 'sum': 0, 'min': None, 'max': None}
+
+        for position, vacancy in enumerate(vacancies):
+            values = [get(vacancy) for get in getters]
+            for i, array in arrays:
+                values[i] = array[position]
+            for name, key, operations, groups in plans:
+                states = groups.get(values[key])
+                if states is None:
+                    states = groups[values[key]] = [[0, 0] if operation == 'mean' else
+                                                    QuantileSketch() if operation == 'sketch' else initial[operation]
+                                                    for _, operation, _, _ in operations]
+                for i, (_, operation, value, condition) in enumerate(operations):
+                    if condition is not None and not values[condition]:
+                        continue
+                    if operation == 'count':
+                        states[i] += 1
+                        continue
+                    value = values[value]
+                    if value is None:
+                        continue
+                    if operation == 'sum':
+                        states[i] += value
+                    elif operation == 'mean':
+                        states[i][0] += value
+                        states[i][1] += 1
+                    elif operation == 'sketch':
+                        states[i].update(value)
+                    elif operation == 'min':
+                        if states[i] is None or value < states[i]:
+                            states[i] = value
+                    elif states[i] is None or value > states[i]:
+                        states[i] = value
+
+        results = {}
+        for name, key, operations, groups in plans:
+            results[name] = {
+                group: {output: (None if state[1] == 0 else state[0] / state[1]) if operation == 'mean' else state
+                        for (output, operation, _, _), state in zip(operations, states)}
+                for group, states in groups.items()}
+        return results
+
+    def length(self):
+        """
+        Возвращает длину списка вакансий
+
+        Returns:
+            int: Длина vacancies_objects
+        """
+        return len(self.vacancies_objects)
+
+    def sort(self, sorting_criteria, is_reversed):
+        """
+        Сортирует vacancies_objects данного объекта по критерию из клчей словаря sorting. Вакансии
+        VacancyRows сортируются целиком, поэтому записи файла разбираются одним последовательным проходом,
+        а не по одной
+
+        Args:
+            sorting_criteria (str): Критерий сортировки - название столбца - критерия
+            is_reversed (str): При значении 'Да' сортировка происходит по убыванию
+
+        >>> data = DataSet('sorting_test.csv')
+        >>> data.sort('Название', 'Нет')
+        >>> [x.name for x in data.vacancies_objects]
+        ['HTML-верстальщик', 'HTML-верстальщик (remote)', 'Information Security Policy Specialist (Methodology)', 'Senior Python Developer (Crypto)', 'Руководитель проекта по системам связи и информационным технологиям']
+        >>> data = DataSet('sorting_test.csv')
+        >>> data.sort('Навыки', 'Нет')
+        >>> [x.name for x in data.vacancies_objects]
+        ['Information Security Policy Specialist (Methodology)', 'Senior Python Developer (Crypto)', 'Руководитель проекта по системам связи и информационным технологиям', 'HTML-верстальщик (remote)', 'HTML-верстальщик']
+        >>> data = DataSet('sorting_test.csv')
+        >>> data.sort('Опыт работы', 'Нет')
+        >>> [x.name for x in data.vacancies_objects]
+        ['HTML-верстальщик', 'HTML-верстальщик (remote)', 'Руководитель проекта по системам связи и информационным технологиям', 'Senior Python Developer (Crypto)', 'Information Security Policy Specialist (Methodology)']
+        >>> data = DataSet('sorting_test.csv')
+        >>> data.sort('Оклад', 'Нет')
+        >>> [x.name for x in data.vacancies_objects]
+        ['Руководитель проекта по системам связи и информационным технологиям', 'HTML-верстальщик', 'HTML-верстальщик (remote)', 'Senior Python Developer (Crypto)', 'Information Security Policy Specialist (Methodology)']
+        >>> data = DataSet('sorting_test.csv')
+        >>> data.sort('Дата публикации вакансии', 'Нет')
+        >>> [x.name for x in data.vacancies_objects]
+        ['Senior Python Developer (Crypto)', 'HTML-верстальщик', 'HTML-верстальщик (remote)', 'Information Security Policy Specialist (Methodology)', 'Руководитель проекта по системам связи и информационным технологиям']
+        >>> data = DataSet('sorting_test.csv')
+        >>> data.sort('Название', 'Да')
+        >>> [x.name for x in data.vacancies_objects]
+        ['Руководитель проекта по системам связи и информационным технологиям', 'Senior Python Developer (Crypto)', 'Information Security Policy Specialist (Methodology)', 'HTML-верстальщик (remote)', 'HTML-верстальщик']
+        """
+
+        order = self.get_sort_order(sorting_criteria, is_reversed)
+        if self.columnar is not None:
+            self.set_columnar(self.columnar.take(order))
+        else:
+            vacancies = self.get_random_access()
+            if isinstance(vacancies, VacancyRows):
+                vacancies = list(vacancies)
+            self.vacancies_objects = [vacancies[i] for i in order.tolist()]
+        self.reset_indexes()
+
+    def get_sorted_vacancies(self, sorting_criteria, is_reversed='Нет'):
+        """
+        Возвращает вакансии в порядке сортировки, не изменяя vacancies_objects. Перестановка вычисляется
+        один раз для каждого критерия и направления
+
+        Args:
+            sorting_criteria (str | list[tuple[str, str]]): Критерий сортировки или список пар
+                (критерий, 'Да' / 'Нет' - по убыванию ли) для сортировки по нескольким ключам
+            is_reversed (str): При значении 'Да' сортировка по одному критерию происходит по убыванию
+
+        Returns:
+            VacancyPermutation: Вакансии в порядке сортировки
+
+        >>> data = DataSet('sorting_test.csv')
+        >>> [x.name for x in data.get_sorted_vacancies([('Опыт работы', 'Нет'), ('Оклад', 'Да')])][:3]
+        ['HTML-верстальщик (remote)', 'HTML-верстальщик', 'Руководитель проекта по системам связи и информационным технологиям']
+        >>> data.vacancies_objects[0].name
+        'Руководитель проекта по системам связи и информационным технологиям'
+        """
+        order = self.get_sort_order(sorting_criteria, is_reversed)
+        if self.columnar is not None:
+            return VacancyPermutation(self.vacancies_objects, order)
+        return VacancyPermutation(self.get_random_access(), order)
+
+    def get_random_access(self):
+        """
+        Возвращает вакансии в виде последовательности с произвольным доступом. Поток вакансий для этого
+        однократно загружается в список
+
+        Returns:
+            list[Vacancy] | VacancyColumnsView | VacancyRows: Вакансии
+        """
+        if isinstance(self.vacancies_objects, VacancyStream):
+            self.vacancies_objects = list(self.vacancies_objects)
+        return self.vacancies_objects
+
+    def get_sort_order(self, sorting_criteria, is_reversed='Нет'):
+        """
+        Возвращает перестановку вакансий, упорядочивающую их по одному или нескольким ключам. Сортировка
+        устойчивая: вакансии с равными ключами (в том числе при сортировке по убыванию) сохраняют исходный порядок
+
+        Args:
+            sorting_criteria (str | list[tuple[str, str]]): Критерий сортировки или список пар
+                (критерий, 'Да' / 'Нет' - по убыванию ли)
+            is_reversed (str): При значении 'Да' сортировка по одному критерию происходит по убыванию
+
+        Returns:
+            np.ndarray: Номера вакансий в порядке сортировки
+        """
+        if isinstance(sorting_criteria, str):
+            sorting_criteria = [(sorting_criteria, is_reversed)]
+        criteria = tuple((criterion, reverse == 'Да') for criterion, reverse in sorting_criteria)
+        if criteria not in self.sort_orders:
+            keys = [-self.get_sort_keys(x) if reverse else self.get_sort_keys(x) for x, reverse in reversed(criteria)]
+            self.sort_orders[criteria] = np.lexsort(keys) if keys else np.arange(self.length(), dtype=np.int64)
+        return self.sort_orders[criteria]
+
+    def get_sort_keys(self, sorting_criteria):
+        """
+        Возвращает целочисленные ранги ключей сортировки, вычисляя их один раз для критерия: для колоночного
+        представления - методом get_sort_ranks, для объектов - по функциям из словаря sorting
+
+        Args:
+            sorting_criteria (str): Критерий сортировки - название столбца - критерия
+
+        Returns:
+            np.ndarray: Массив рангов
+        """
+        if sorting_criteria not in self.sort_keys:
+            if self.columnar is not None:
+                ranks = self.get_sort_ranks(sorting_criteria)
+            else:
+                key = self.sorting[sorting_criteria]
+                keys = [key(x) for x in self.get_random_access()]
+                order = sorted(range(len(keys)), key=keys.__getitem__)
+                ranks = [0] * len(keys)
+                rank = 0
+                for position, i in enumerate(order):
+                    if position and keys[i] != keys[order[position - 1]]:
+                        rank += 1
+                    ranks[i] = rank
+                ranks = np.array(ranks, dtype=np.int64)
+            self.sort_keys[sorting_criteria] = ranks
+        return self.sort_keys[sorting_criteria]
+
+    def get_sorted_window(self, filter_criteria, sorting_criteria, is_reversed, start, stop):
+        """
+        Возвращает отфильтрованные вакансии с номерами [start, stop) в порядке сортировки, не сортируя все
+        вакансии. Результат совпадает со срезом полной устойчивой сортировки (включая порядок равных ключей):
+        для колоночного представления и уже вычисленных рангов границы окна находятся np.partition за O(n)
+        и сортируются только вакансии с ключом не больше k-го, для объектов k первых пар (ключ, номер)
+        выбираются кучей за O(n log k). Ключи вычисляются одним последовательным проходом по вакансиям,
+        по номерам запрашиваются только вакансии окна (для VacancyRows - только их записи файла)
+
+        Args:
+            filter_criteria (str): Запрос фильтрации (см. FilterQuery)
+            sorting_criteria (str): Критерий сортировки, пустая строка - без сортировки
+            is_reversed (str): При значении 'Да' сортировка происходит по убыванию
+            start (int | None): Номер первой вакансии окна в отсортированной последовательности
+            stop (int | None): Номер вакансии, следующей за последней, None - до конца
+
+        Returns:
+            tuple[int, list[Vacancy]]: Число отфильтрованных вакансий и вакансии окна
+
+        >>> count, window = DataSet('sorting_test.csv').get_sorted_window('', 'Оклад', 'Да', 0, 2)
+        >>> count, [x.name for x in window]
+        (5, ['Information Security Policy Specialist (Methodology)', 'Senior Python Developer (Crypto)'])
+        """
+        vacancies = self.get_random_access()
+        if filter_criteria == '':
+            positions = np.arange(len(vacancies), dtype=np.int64)
+        else:
+            query = FilterQuery.compile(filter_criteria)
+            positions = self.find_matching(query)
+            if positions is None:
+                positions = np.array([i for i, x in enumerate(vacancies) if query.matches(x)], dtype=np.int64)
+        rows = range(len(positions))[start:stop]
+        if len(rows) == 0:
+            return len(positions), []
+        if sorting_criteria == '':
+            if filter_criteria == '':
+                return len(positions), vacancies[rows.start:rows.stop]
+            order = positions[rows.start:rows.stop]
+        elif self.columnar is not None or sorting_criteria in self.sort_keys:
+            keys = self.get_sort_keys(sorting_criteria)[positions]
+            if is_reversed == 'Да':
+                keys = -keys
+            candidates = np.arange(len(keys))
+            if rows.stop < len(keys):
+                candidates = np.flatnonzero(~(keys > np.partition(keys, rows.stop - 1)[rows.stop - 1]))
+            order = positions[candidates[np.argsort(keys[candidates], kind='stable')][rows.start:rows.stop]]
+        else:
+            key = self.sorting[sorting_criteria]
+            selected = np.zeros(len(vacancies), dtype=bool)
+            selected[positions] = True
+            items = ((key(x), i) for i, x in enumerate(vacancies) if selected[i])
+            if is_reversed == 'Да':
+                top = heapq.nlargest(rows.stop, items, key=lambda x: (x[0], -x[1]))
+            else:
+                top = heapq.nsmallest(rows.stop, items)
+            order = [i for _, i in top[rows.start:]]
+        return len(positions), [vacancies[i] for i in np.asarray(order).tolist()]
+
+    def get_sort_ranks(self, sorting_criteria):
+        """
+        Вычисляет для колоночного представления целочисленные ранги ключей сортировки: равным ключам
+        соответствуют равные ранги, порядок рангов совпадает с порядком ключей из словаря sorting
+
+        Args:
+            sorting_criteria (str): Критерий сортировки - название столбца - критерия
+
+        Returns:
+            np.ndarray: Массив рангов (int64)
+        """
+        columns = self.columnar
+        fields = {
+            'Компания': 'employer_name',
+            'Премиум-вакансия': 'premium',
+            'Название региона': 'area_name',
+            'Идентификатор валюты оклада': 'salary_currency',
+            'Оклад указан до вычета налогов': 'salary_gross'
+        }
+        if sorting_criteria == 'Оклад':
+            return columns.mean_salary_in_rur
+        if sorting_criteria == 'Дата публикации вакансии':
+            return columns.timestamp
+        if sorting_criteria == 'Навыки':
+            return np.array([len(x) for x in columns.text['key_skills']], dtype=np.int64)
+        if sorting_criteria == 'Опыт работы':
+            experience = [Dicts.experience_in_numbers[x] for x in columns.categories['experience_id']]
+            return np.array(experience, dtype=np.int64)[columns.codes['experience_id']]
+        if sorting_criteria in fields:
+            field = fields[sorting_criteria]
+            categories = columns.categories[field]
+            order = sorted(range(len(categories)), key=lambda i: categories[i])
+            ranks = np.empty(len(categories), dtype=np.int64)
+            ranks[order] = np.arange(len(categories))
+            return ranks[columns.codes[field]]
+        field = 'name' if sorting_criteria == 'Название' else 'description'
+        return np.unique(columns.get_text(field), return_inverse=True)[1].reshape(-1).astype(np.int64)
+
+    @staticmethod
+    def format_filter_criteria(filter_criteria):
+        """
+        Возвращает словарь, содержащий название и значение параметра фильтрации
+
+        Args:
+            filter_criteria (str): Критерий фильтрации - строка формата 'Название столбца: содержание ячейки'
+        Returns:
+             dict: {'label': Название поля-критерия,
+                    'content': Подходящее значение поля-критерия}
+        """
+        filter_criteria = filter_criteria.split(': ')
+        return {
+            'label': filter_criteria[0] if filter_criteria[0] not in Dicts.dic_naming.keys() else Dicts.dic_naming[
+                filter_criteria[0]],
+            'content': '' if filter_criteria[0] == '' else (
+                filter_criteria[1] if filter_criteria[1] not in Dicts.dic_naming.keys() else Dicts.dic_naming[
+                    filter_criteria[1]])
+        }
+
+    def filter(self, filter_criteria):
+        """
+        Фильтрует свойство vacancies_objects данного DataSet по запросу
+
+        Args:
+            filter_criteria (str): Запрос фильтрации - критерии формата 'Название столбца: содержание ячейки',
+                объединённые операторами AND, OR и NOT (см. FilterQuery)
+        """
+        query = FilterQuery.compile(filter_criteria)
+        positions = self.find_matching(query)
+        self.reset_indexes()
+        if self.columnar is not None:
+            self.set_columnar(self.columnar.take(positions))
+        elif positions is not None:
+            self.vacancies_objects = [self.vacancies_objects[i] for i in positions.tolist()]
+        else:
+            self.vacancies_objects = list(filter(query.matches, self.vacancies_objects))
+
+    def find_matching(self, query):
+        """
+        Находит вакансии, удовлетворяющие запросу. В каждой группе критериев сначала пересекаются результаты
+        поиска по индексам (начиная с самого короткого), затем оставшиеся критерии в порядке стоимости
+        проверяются только для уцелевших вакансий: в колоночном представлении - булевыми масками,
+        для списка объектов - функциями проверки. Результаты групп объединяются
+
+        Args:
+            query (FilterQuery): Запрос
+
+        Returns:
+            np.ndarray | None: Номера вакансий в исходном порядке или None для потока вакансий и VacancyRows,
+                которые проверяются целиком функцией FilterQuery.matches
+        """
+        if self.columnar is None and not isinstance(self.vacancies_objects, list):
+            return None
+        size = len(self.columnar) if self.columnar is not None else len(self.vacancies_objects)
+        found = []
+        for group in query.groups:
+            indexed = []
+            scanned = []
+            for clause in group:
+                positions = self.find_indexed(clause)
+                if positions is None:
+                    scanned.append(clause)
+                else:
+                    indexed.append((positions, clause['negated']))
+            included = sorted((x for x, negated in indexed if not negated), key=len)
+            positions = included[0] if included else np.arange(size, dtype=np.int64)
+            for x in included[1:]:
+                positions = np.intersect1d(positions, x, assume_unique=True)
+            for x, negated in indexed:
+                if negated:
+                    positions = np.setdiff1d(positions, x, assume_unique=True)
+            for clause in scanned:
+                if len(positions) == 0:
+                    break
+                if self.columnar is not None:
+                    matched = self.get_filter_mask(clause)[positions]
+                else:
+                    matched = np.fromiter((clause['predicate'](self.vacancies_objects[i]) for i in positions.tolist()),
+                                          dtype=bool, count=len(positions))
+                positions = positions[matched != clause['negated']]
+            found.append(positions)
+        return found[0] if len(found) == 1 else np.unique(np.concatenate(found))
+
+    def get_filter_mask(self, filter_criteria):
+        """
+        Вычисляет для колоночного представления булеву маску вакансий, удовлетворяющих критерию фильтрации
+
+        Args:
+            filter_criteria (dict): Критерий фильтрации - результат format_filter_criteria
+
+        Returns:
+            np.ndarray: Булев массив
+        """
+        columns = self.columnar
+        label = filter_criteria['label']
+        content = filter_criteria['content']
+        text_fields = {'Название': 'name', 'Описание': 'description'}
+        equal_fields = {'Компания': 'employer_name', 'Название региона': 'area_name',
+                        'Дата публикации вакансии': 'published_date'}
+        named_fields = {
+            'Опыт работы': 'experience_id',
+            'Премиум-вакансия': 'premium',
+            'Идентификатор валюты оклада': 'salary_currency',
+            'Оклад указан до вычета налогов': 'salary_gross'
+        }
+        if label == '':
+            return np.ones(len(columns), dtype=bool)
+        if label in text_fields:
+            return columns.get_text(text_fields[label]) == content
+        if label in equal_fields:
+            field = equal_fields[label]
+            return np.isin(columns.codes[field], [i for i, x in enumerate(columns.categories[field]) if x == content])
+        if label in named_fields:
+            field = named_fields[label]
+            matching = [i for i, x in enumerate(columns.categories[field]) if Dicts.dic_naming[x] == content]
+            return np.isin(columns.codes[field], matching)
+        if label == 'Навыки':
+            skills = set(content.split(', '))
+            return np.fromiter((skills.issubset(x) for x in columns.text['key_skills']), dtype=bool, count=len(columns))
+        if label == 'Оклад':
+            low, high = self.parse_salary_range(content)
+            return np.maximum(columns.salary_from, low) <= np.minimum(columns.salary_to, high)
+        raise KeyError(label)
+
+    def get_filtered_vacancies(self, filter_criteria):
+        """
+        Возвращает отфильтрованное по запросу свойство vacancies_objects данного DataSet
+
+        Args:
+            filter_criteria (str): Запрос фильтрации - критерии формата 'Название столбца: содержание ячейки',
+                объединённые операторами AND, OR и NOT (см. FilterQuery)
+
+        Returns:
+            list[Vacancy] | VacancyColumnsView | VacancyRows: отфильтрованный список вакансий. Без критерия
+                последовательность VacancyRows возвращается как есть, чтобы не разбирать весь файл
+
+        >>> [x.name for x in DataSet('filtration_test.csv').get_filtered_vacancies(
+        ...     'Премиум-вакансия: Да OR Опыт работы: Более 6 лет AND NOT Навыки: Python')]
+        ['Information Security Policy Specialist (Methodology)', 'Reporting and Visualization Analyst (BI)', 'Node.js backend разработчик']
+        """
+        if filter_criteria == '' and isinstance(self.vacancies_objects, VacancyRows):
+            return self.vacancies_objects
+        query = FilterQuery.compile(filter_criteria)
+        positions = self.find_matching(query)
+        if self.columnar is not None:
+            return VacancyColumnsView(self.columnar.take(positions))
+        if positions is not None:
+            return [self.vacancies_objects[i] for i in positions.tolist()]
+        return list(filter(query.matches, self.vacancies_objects))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+"""Модуль, отвечающий за разбиение csv-файла вакансий на файлы по годам и параллельный подсчёт статистики по ним"""
+import csv
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from dataset_cache import DataSetCache
+from stats_processor import Stats
+from utils import Utils
+from vacancies_parser import DataSet
+
+
+class YearShards:
+    """
+    Класс, содержащий функции разбиения файла вакансий на файлы по годам публикации (шарды) и вычисления
+    статистики по шардам в пуле процессов (map - частичные агрегаты шарда, reduce - их сложение)
+
+    Описание разбиения (манифест) сохраняется в кэше каталога шардов, поэтому файл разбивается один раз,
+    пока он не изменится
+    """
+    @staticmethod
+    def split(file_name, directory):
+        """
+        Разбивает файл на шарды по годам за один потоковый проход. В шарды попадают только корректные строки
+        (те же, что в DataSet), порядок строк внутри года сохраняется
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            directory (str): Каталог для файлов шардов
+
+        Returns:
+            dict: Манифест {'shards': {год: путь к шарду}, 'areas': список регионов в порядке первого появления}.
+                Годы следуют в порядке первого появления
+        """
+        os.makedirs(directory, exist_ok=True)
+        shards = {}
+        writers = {}
+        areas = {}
+        with open(file_name, encoding='utf-8-sig') as data:
+            reader = csv.reader(data, delimiter=',')
+            labels = next(reader, [])
+            if 'published_at' not in labels or 'area_name' not in labels:
+                return {'shards': {}, 'areas': []}
+            published_at = labels.index('published_at')
+            area_name = labels.index('area_name')
+            clean_date, clean_area = Utils.get_cleaners(['published_at', 'area_name'])
+            try:
+                for row in reader:
+                    if not (all(row) and len(labels) == len(row)):
+                        continue
+                    year = Utils.get_year(clean_date(row[published_at]))
+                    writer = writers.get(year)
+                    if writer is None:
+                        shards[year] = os.path.join(directory, f'{year}.csv')
+                        file = open(shards[year], 'w', encoding='utf-8-sig', newline='')
+                        writer = writers[year] = (file, csv.writer(file))
+                        writer[1].writerow(labels)
+                    writer[1].writerow(row)
+                    areas.setdefault(clean_area(row[area_name]), None)
+            finally:
+                for file, _ in writers.values():
+                    file.close()
+        return {'shards': shards, 'areas': list(areas)}
+
+    @staticmethod
+    def get_manifest(file_name, directory):
+        """
+        Возвращает манифест разбиения файла, разбивая файл только если сохранённый манифест отсутствует,
+        устарел или какой-либо из его шардов удалён. Шарды каждого файла хранятся в собственном подкаталоге,
+        имя которого - хэш пути к файлу, поэтому разбиение одного файла не перезаписывает шарды другого
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            directory (str): Каталог шардов, общий для разных файлов
+
+        Returns:
+            dict: Манифест в формате YearShards.split
+        """
+        cache = DataSetCache(directory)
+        manifest = cache.load(file_name, 'year_shards')
+        if manifest is None or not all(os.path.exists(x) for x in manifest['shards'].values()):
+            source = hashlib.sha1(os.path.abspath(file_name).encode('utf-8')).hexdigest()[:16]
+            manifest = YearShards.split(file_name, os.path.join(directory, source))
+            cache.save(file_name, 'year_shards', manifest)
+        return manifest
+
+    @staticmethod
+    def aggregate_shard(task):
+        """
+        Вычисляет частичные агрегаты статистики одного шарда. Выполняется в процессе пула
+
+        Args:
+            task (tuple[str, str, bool, str]): Путь к шарду, название профессии, признак построения скетчей квантилей
+                и размер периодов динамики
+
+        Returns:
+            dict: Агрегаты в формате Stats.aggregate
+        """
+        shard, profession, quantiles, granularity = task
+        return Stats.aggregate(DataSet(shard, columns=Stats.required_columns), profession, quantiles, granularity)
+
+    @staticmethod
+    def get_stats(file_name, profession, directory, workers=1, quantiles=False, granularity='year', window=None):
+        """
+        Вычисляет статистику файла по шардам. Результат совпадает со
+        Stats(DataSet(file_name), profession, quantiles, granularity, window)
+
+        Args:
+            file_name (str): Путь к csv-файлу
+            profession (str): Название профессии
+            directory (str): Каталог шардов
+            workers (int): Число процессов. При значении 1 шарды обрабатываются последовательно
+            quantiles (bool): При значении True строятся скетчи квантилей зарплат (см. Stats)
+            granularity (str): Размер периодов динамики. Недели на границе лет складываются из двух шардов
+            window (int | None): Число периодов скользящего окна для динамики уровня зарплат (см. Stats)
+
+        Returns:
+            Stats: Статистика
+        """
+        manifest = YearShards.get_manifest(file_name, directory)
+        tasks = [(shard, profession, quantiles, granularity) for shard in manifest['shards'].values()]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                partials = list(executor.map(YearShards.aggregate_shard, tasks))
+        else:
+            partials = [YearShards.aggregate_shard(task) for task in tasks]
+        aggregates = reduce(Stats.merge_aggregates, partials,
+                            {'years': {}, 'areas': {}, 'total': 0, 'quantiles': quantiles, 'granularity': granularity})
+        aggregates['areas'] = {area: aggregates['areas'][area] for area in manifest['areas']
+                               if area in aggregates['areas']}
+        return Stats.from_aggregates(profession, aggregates, window)